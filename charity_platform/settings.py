@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',  # Middleware zabezpieczeń
+    'donations.middleware.QueryBudgetMiddleware',  # Middleware budżetu zapytań (włączany QUERY_BUDGET_ENABLED)
     'django.contrib.sessions.middleware.SessionMiddleware',  # Middleware sesji
     'django.middleware.common.CommonMiddleware',  # Middleware wspólnych operacji
     'django.middleware.csrf.CsrfViewMiddleware',  # Middleware ochrony przed CSRF
@@ -73,6 +74,68 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Lokalnie używany jest LocMemCache, w produkcji memcached, np.:
+# CACHE_BACKEND=django.core.cache.backends.memcached.PyMemcacheCache, CACHE_LOCATION=127.0.0.1:11211
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),  # Backend cache
+        'LOCATION': config('CACHE_LOCATION', default='charity-platform'),  # Lokalizacja cache
+    }
+}
+
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=600, cast=int)  # Czas życia zapisanych stron publicznych (s)
+
+# Budżet zapytań do bazy danych na żądanie (middleware donations.middleware.QueryBudgetMiddleware)
+QUERY_BUDGET_ENABLED = config('QUERY_BUDGET_ENABLED', default=False, cast=bool)  # Włączenie liczenia zapytań
+QUERY_BUDGET_RAISE = config('QUERY_BUDGET_RAISE', default=DEBUG, cast=bool)  # Zgłaszanie wyjątku zamiast logowania
+QUERY_BUDGET_DEFAULT = None  # Domyślny budżet dla widoków spoza QUERY_BUDGETS (None - bez limitu)
+QUERY_BUDGET_N_PLUS_ONE_THRESHOLD = 5  # Liczba powtórzeń zapytania o tym samym kształcie uznawana za N+1
+QUERY_BUDGETS = {
+    'donations:index': 5,
+    'donations:institution_section': 4,
+    'donations:institution_search': 3,
+    'donations:add_donation': 20,
+    'donations:user_profile': 6,
+}
+
+# Lista darowizn w panelu administracyjnym
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=100000,
+                                         cast=int)  # Liczba wierszy, od której liczba wyników jest szacowana
+ADMIN_FACET_CACHE_TIMEOUT = config('ADMIN_FACET_CACHE_TIMEOUT', default=60,
+                                   cast=int)  # Czas życia zapisanych liczników filtrów i hierarchii dat (s)
+
+# Czas ważności tokenów aktywacji konta i resetowania hasła (s)
+EMAIL_VERIFICATION_TIMEOUT = config('EMAIL_VERIFICATION_TIMEOUT', default=3 * 24 * 60 * 60, cast=int)
+PASSWORD_RESET_TIMEOUT = config('PASSWORD_RESET_TIMEOUT', default=60 * 60, cast=int)
+# Tokeny w linkach: 'database' (tabele tokenów) lub 'signed' (bezstanowy podpis HMAC, bez zapisu w bazie danych)
+ACCOUNT_TOKEN_MODE = config('ACCOUNT_TOKEN_MODE', default='database')
+
+# Sesje: 'db' (tabela sesji), 'cached_db' (odczyt z cache, zapis także do bazy danych)
+# lub 'signed_cookies' (dane sesji w podpisanym ciasteczku, bez tabeli sesji)
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[config('SESSION_MODE', default='db')]
+
+# Uwierzytelnianie z cache obiektu zalogowanego użytkownika (0 - bez cache; wymaga wspólnego cache, np. memcached).
+# ModelBackend obsługuje sesje zapisane przed wprowadzeniem CachedModelBackend (nowe logowania go nie używają)
+AUTHENTICATION_BACKENDS = ['donations.auth.CachedModelBackend', 'django.contrib.auth.backends.ModelBackend']
+USER_CACHE_TIMEOUT = config('USER_CACHE_TIMEOUT', default=0, cast=int)  # Czas przechowywania użytkownika w cache (s)
+
+# Ograniczanie liczby prób logowania i rejestracji (donations.throttle): zakres -> (limit prób, okno w sekundach)
+THROTTLE_ENABLED = config('THROTTLE_ENABLED', default=True, cast=bool)
+THROTTLE_RATES = {
+    'login_ip': (30, 300),
+    'login_email': (10, 300),
+    'register_ip': (10, 3600),
+    'register_email': (3, 3600),
+}
+
 # Walidacja haseł
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -112,6 +175,26 @@ STATICFILES_DIRS = [
 
 STATIC_ROOT = BASE_DIR / 'staticfiles'  # Główny katalog dla plików statycznych
 
+# W produkcji STATICFILES_STORAGE=donations.storage.CompressedManifestStaticFilesStorage: collectstatic minifikuje
+# pliki CSS/JS, nadaje nazwy z odciskiem treści i zapisuje warianty .gz i .br (szablony wymagają wtedy manifestu)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},  # Pliki mediów
+    'staticfiles': {  # Pliki statyczne
+        'BACKEND': config('STATICFILES_STORAGE', default='django.contrib.staticfiles.storage.StaticFilesStorage'),
+    },
+}
+
+STATIC_SERVE = config('STATIC_SERVE', default=False, cast=bool)  # Wysyłanie plików statycznych przez Django
+
+# Pliki przesyłane i generowane (zrzuty ekranu zgłoszeń, pliki eksportów)
+MEDIA_URL = '/media/'  # URL dla plików mediów
+
+MEDIA_ROOT = config('MEDIA_ROOT', default=str(BASE_DIR / 'media'))  # Katalog plików mediów
+
+# Czas (w sekundach) bez sygnału życia workera, po którym wykonywany eksport uznawany jest za przerwany
+# i pobierany ponownie przez polecenie run_export_jobs
+EXPORT_JOB_TIMEOUT = config('EXPORT_JOB_TIMEOUT', default=600, cast=int)
+
 # Domyślny typ pola klucza głównego
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -1,5 +1,10 @@
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from donations.storage import serve_static
 
 
 urlpatterns = [
@@ -7,3 +12,6 @@ urlpatterns = [
     path('', include('donations.urls')),
 
 ]
+
+if settings.STATIC_SERVE:  # Pliki statyczne wysyłane przez Django, gdy nie robi tego serwer WWW
+    urlpatterns.insert(0, re_path(rf'^{re.escape(settings.STATIC_URL.lstrip("/"))}(?P<path>.+)$', serve_static))
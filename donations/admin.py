@@ -1,35 +1,226 @@
-from django.contrib import admin
+import hashlib
+
+from django.conf import settings
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin as DefaultUserAdmin
-from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, PermissionDenied, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Count, Max, OuterRef, QuerySet, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.db.models.signals import pre_delete, post_save
 from django.dispatch import receiver
-from django.http import HttpResponse
-import csv
-from datetime import datetime
-
-from .models import Category, Institution, Donation, EmailVerificationToken, PasswordResetToken, ContactMessage, ProblemReport
+from django.forms.models import BaseInlineFormSet
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from datetime import datetime, time
+
+from .models import Category, Institution, Donation, EmailVerificationToken, PasswordResetToken, ContactMessage, ProblemReport, \
+    OutgoingEmail, ExportJob
+from .bulk import STATUS_TRANSITIONS, assign_courier, set_taken_by_courier, transition_status
+from .export import XLSX_SYNC_MAX_ROWS, export_response
+from .export_jobs import queue_export_job
+from .pagination import EstimatedCountPaginator, estimated_count
+
+
+# Funkcje do eksportowania danych (CSV, JSON Lines, XLSX)
+def _export(modeladmin, queryset, export_format):
+    """
+    Zwraca strumieniowy eksport zaznaczonych obiektów; pola z export_exclude admina są pomijane.
+    """
+    return export_response(queryset, export_format, exclude=getattr(modeladmin, 'export_exclude', ()))
 
 
-# Funkcja do eksportowania danych w formacie CSV
 def export_as_csv(modeladmin, request, queryset):
     """
     Funkcja eksportująca dane modelu do pliku CSV.
     """
-    model = modeladmin.model
-    field_names = [field.name for field in model._meta.get_fields() if field.concrete and not field.many_to_many]
+    return _export(modeladmin, queryset, 'csv')
+
+export_as_csv.short_description = "Eksportuj zaznaczone (CSV)"
+
+
+def export_as_jsonl(modeladmin, request, queryset):
+    """
+    Funkcja eksportująca dane modelu do pliku JSON Lines.
+    """
+    return _export(modeladmin, queryset, 'jsonl')
+
+export_as_jsonl.short_description = "Eksportuj zaznaczone (JSON Lines)"
+
+
+def _exceeds_xlsx_sync_limit(queryset):
+    """
+    Sprawdza, czy eksport ma więcej niż XLSX_SYNC_MAX_ROWS wierszy (szacunek planisty PostgreSQL dla dużych
+    tabel, a w pozostałych przypadkach liczenie ograniczone do XLSX_SYNC_MAX_ROWS + 1 wierszy).
+    """
+    estimate = estimated_count(queryset, XLSX_SYNC_MAX_ROWS)
+    if estimate is not None:
+        return estimate > XLSX_SYNC_MAX_ROWS
+    return queryset.order_by().values('pk')[:XLSX_SYNC_MAX_ROWS + 1].count() > XLSX_SYNC_MAX_ROWS
+
+
+def export_as_xlsx(modeladmin, request, queryset):
+    """
+    Funkcja eksportująca dane modelu do pliku XLSX. Eksport większy niż XLSX_SYNC_MAX_ROWS wierszy
+    zlecany jest w tle, aby nie blokować workera HTTP do czasu zbudowania całego pliku.
+    """
+    if _exceeds_xlsx_sync_limit(queryset):
+        modeladmin.message_user(request, f'Eksport XLSX ponad {XLSX_SYNC_MAX_ROWS} wierszy jest wykonywany w tle.',
+                                messages.WARNING)
+        _queue_export(modeladmin, request, queryset, 'xlsx')
+        return None
+    return _export(modeladmin, queryset, 'xlsx')
+
+export_as_xlsx.short_description = "Eksportuj zaznaczone (XLSX)"
+
+
+# Funkcje do zlecania eksportu w tle (polecenie run_export_jobs)
+def _queue_export(modeladmin, request, queryset, export_format):
+    """
+    Zleca eksport zaznaczonych obiektów w tle i informuje, gdzie pojawi się plik.
+    """
+    job = queue_export_job(request, queryset, export_format)
+    url = reverse('admin:donations_exportjob_change', args=[job.pk])
+    modeladmin.message_user(request, format_html(
+        'Zlecono eksport w tle. Plik będzie dostępny w <a href="{}">zadaniu eksportu #{}</a>.', url, job.pk))
+
+
+def export_in_background_csv(modeladmin, request, queryset):
+    """
+    Funkcja zlecająca eksport danych modelu do pliku CSV w tle.
+    """
+    _queue_export(modeladmin, request, queryset, 'csv')
+
+export_in_background_csv.short_description = "Eksportuj w tle (CSV)"
+
+
+def export_in_background_jsonl(modeladmin, request, queryset):
+    """
+    Funkcja zlecająca eksport danych modelu do pliku JSON Lines w tle.
+    """
+    _queue_export(modeladmin, request, queryset, 'jsonl')
+
+export_in_background_jsonl.short_description = "Eksportuj w tle (JSON Lines)"
+
+
+def export_in_background_xlsx(modeladmin, request, queryset):
+    """
+    Funkcja zlecająca eksport danych modelu do pliku XLSX w tle.
+    """
+    _queue_export(modeladmin, request, queryset, 'xlsx')
+
+export_in_background_xlsx.short_description = "Eksportuj w tle (XLSX)"
+
+EXPORT_ACTIONS = [export_as_csv, export_as_jsonl, export_as_xlsx,
+                  export_in_background_csv, export_in_background_jsonl, export_in_background_xlsx]
+
+
+# Formularz akcji listy darowizn z polem kuriera dla akcji przypisania kuriera
+class DonationActionForm(ActionForm):
+    """
+    Formularz akcji listy zmian darowizn, rozszerzony o nazwę użytkownika kuriera.
+    """
+    courier = forms.CharField(required=False, label='Kurier (nazwa użytkownika)')
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename={model._meta}.csv'
-    writer = csv.writer(response)
 
-    writer.writerow(field_names)
-    for obj in queryset:
-        writer.writerow([getattr(obj, field) for field in field_names])
+# Funkcje do zbiorczej zmiany darowizn (jedno zapytanie UPDATE na partię wierszy)
+def _bulk_queryset(queryset):
+    """
+    Zwraca zwykły queryset darowizn z warunkami querysetu akcji, bez cache agregacji listy zmian
+    (partie aktualizacji muszą odpowiadać bieżącym danym).
+    """
+    plain = Donation.objects.all()
+    plain.query = queryset.query.chain()
+    return plain
 
-    return response
 
-export_as_csv.short_description = "Eksportuj zaznaczone"
+def _transition(modeladmin, request, queryset, status):
+    """
+    Zmienia status zaznaczonych darowizn i informuje, ile darowizn zmieniono.
+    """
+    updated = transition_status(_bulk_queryset(queryset), status)
+    labels = dict(Donation.STATUS_CHOICES)
+    sources = ', '.join(labels[source] for source in STATUS_TRANSITIONS[status])
+    modeladmin.message_user(request, f'Zmieniono status {updated} darowizn na "{labels[status]}". '
+                                     f'Pominięto darowizny w statusie innym niż: {sources}.')
+
+
+@admin.action(permissions=['change'], description='Oznacz jako w trakcie realizacji')
+def mark_in_progress(modeladmin, request, queryset):
+    """
+    Funkcja zmieniająca status oczekujących darowizn na "W trakcie realizacji".
+    """
+    _transition(modeladmin, request, queryset, 'in_progress')
+
+
+@admin.action(permissions=['change'], description='Oznacz jako zrealizowane')
+def mark_completed(modeladmin, request, queryset):
+    """
+    Funkcja zmieniająca status darowizn w trakcie realizacji na "Zrealizowane".
+    """
+    _transition(modeladmin, request, queryset, 'completed')
+
+
+@admin.action(permissions=['change'], description='Przywróć jako oczekujące')
+def mark_pending(modeladmin, request, queryset):
+    """
+    Funkcja przywracająca status "Oczekujące" darowiznom w trakcie realizacji.
+    """
+    _transition(modeladmin, request, queryset, 'pending')
+
+
+@admin.action(permissions=['change'], description='Przypisz kuriera (podanego w polu obok)')
+def assign_courier_action(modeladmin, request, queryset):
+    """
+    Funkcja przypisująca kuriera, podanego nazwą użytkownika w formularzu akcji, niezrealizowanym darowiznom.
+    """
+    username = request.POST.get('courier', '').strip()
+    courier = User.objects.filter(username=username).first() if username else None
+    if courier is None:
+        modeladmin.message_user(request, f'Nie znaleziono kuriera "{username}".', messages.ERROR)
+        return
+    updated = assign_courier(_bulk_queryset(queryset), courier)
+    modeladmin.message_user(request, f'Przypisano kuriera {courier} do {updated} darowizn. Pominięto darowizny '
+                                     f'zrealizowane, już odebrane przez kuriera lub przypisane do tego kuriera.')
+
+
+@admin.action(permissions=['change'], description='Usuń przypisanie kuriera')
+def unassign_courier_action(modeladmin, request, queryset):
+    """
+    Funkcja usuwająca przypisanie kuriera niezrealizowanym darowiznom, których kurier jeszcze nie odebrał.
+    """
+    updated = assign_courier(_bulk_queryset(queryset), None)
+    modeladmin.message_user(request, f'Usunięto przypisanie kuriera z {updated} darowizn.')
+
+
+@admin.action(permissions=['change'], description='Oznacz jako zabrane przez kuriera')
+def mark_taken_by_courier(modeladmin, request, queryset):
+    """
+    Funkcja oznaczająca darowizny z przypisanym kurierem jako zabrane przez kuriera.
+    """
+    updated = set_taken_by_courier(_bulk_queryset(queryset), True)
+    modeladmin.message_user(request, f'Oznaczono {updated} darowizn jako zabrane przez kuriera. '
+                                     f'Pominięto darowizny bez przypisanego kuriera.')
+
+
+@admin.action(permissions=['change'], description='Oznacz jako niezabrane przez kuriera')
+def mark_not_taken_by_courier(modeladmin, request, queryset):
+    """
+    Funkcja usuwająca oznaczenie "zabrane przez kuriera".
+    """
+    updated = set_taken_by_courier(_bulk_queryset(queryset), False)
+    modeladmin.message_user(request, f'Oznaczono {updated} darowizn jako niezabrane przez kuriera.')
+
+DONATION_ACTIONS = [mark_in_progress, mark_completed, mark_pending, assign_courier_action, unassign_courier_action,
+                    mark_taken_by_courier, mark_not_taken_by_courier]
 
 
 # Filtr zakresu dat
@@ -56,14 +247,198 @@ class DateRangeFilter(admin.SimpleListFilter):
         return queryset
 
 
+# Filtr instytucji z wyszukiwaniem podczas pisania
+class InstitutionSearchFilter(admin.SimpleListFilter):
+    """
+    Filtr instytucji dla dużych list: zamiast wczytywać wszystkie instytucje, wyświetla pole wyszukiwania
+    podpowiadające instytucje z widoku institution_search (katalog w pamięci workera, bez zapytań do bazy).
+    """
+    title = 'Instytucja'
+    parameter_name = 'institution__id__exact'
+    template = 'admin/donations/institution_filter.html'
+
+    def lookups(self, request, model_admin):
+        value = self.value()
+        if value and value.isdigit():
+            return Institution.objects.filter(id=value).values_list('id', 'name')  # Tylko wybrana instytucja
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if not value:
+            return queryset
+        if not value.isdigit():
+            raise IncorrectLookupParameters(value)
+        return queryset.filter(institution_id=value)
+
+    @property
+    def search_url(self):
+        return reverse('donations:institution_search')
+
+
+# Filtr pory odbioru
+class PickUpTimeFilter(admin.SimpleListFilter):
+    """
+    Filtr pory dnia odbioru darowizny. Zastępuje filtr wszystkich wartości pola pick_up_time, który wymagał
+    SELECT DISTINCT po całej tabeli i wyświetlał tysiące pozycji (a liczniki filtrów - tysiące kolumn).
+    """
+    title = 'Pora odbioru'
+    parameter_name = 'pick_up_time_range'
+
+    RANGES = {
+        'morning': (time(0, 0), time(12, 0)),
+        'afternoon': (time(12, 0), time(17, 0)),
+        'evening': (time(17, 0), None),
+    }
+
+    def lookups(self, request, model_admin):
+        return (
+            ('morning', 'Rano (do 12:00)'),
+            ('afternoon', 'Popołudnie (12:00-17:00)'),
+            ('evening', 'Wieczór (od 17:00)'),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() not in self.RANGES:
+            return queryset
+        start, end = self.RANGES[self.value()]
+        queryset = queryset.filter(pick_up_time__gte=start)
+        return queryset.filter(pick_up_time__lt=end) if end else queryset
+
+
+# QuerySet listy zmian z cache agregacji
+class CachedAggregatesQuerySet(QuerySet):
+    """
+    QuerySet listy zmian, który zapisuje w cache na ADMIN_FACET_CACHE_TIMEOUT sekund wyniki agregacji
+    (liczniki filtrów, zakres dat hierarchii) i listy dat hierarchii dat - zapytania przeglądające całą tabelę.
+    """
+
+    def _cached(self, name, queryset, compute):
+        """
+        Zwraca wynik compute() zapisany w cache pod kluczem wyliczonym z SQL querysetu opisującego obliczenie.
+        """
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return compute()
+        digest = hashlib.md5(f'{name}|{sql}'.encode()).hexdigest()
+        return cache.get_or_set(f'donations:admin:{name}:{digest}', compute, settings.ADMIN_FACET_CACHE_TIMEOUT)
+
+    def aggregate(self, *args, **kwargs):
+        # Klucz z SQL adnotacji tymi samymi agregatami (podzapytania w warunkach agregatów nie są wykonywane)
+        return self._cached('aggregate', self.order_by().annotate(*args, **kwargs),
+                            lambda: super(CachedAggregatesQuerySet, self).aggregate(*args, **kwargs))
+
+    def dates(self, field_name, kind, order='ASC'):
+        queryset = super().dates(field_name, kind, order)
+        return self._cached('dates', queryset, lambda: list(queryset))
+
+
+class CachedAggregatesChangeList(ChangeList):
+    """
+    Lista zmian korzystająca z CachedAggregatesQuerySet.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        cached = CachedAggregatesQuerySet(model=queryset.model, query=queryset.query, using=queryset._db,
+                                          hints=queryset._hints)
+        cached._prefetch_related_lookups = queryset._prefetch_related_lookups
+        return cached
+
+
+# Zestaw formularzy inline wyświetlający jedną stronę obiektów
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """
+    Zestaw formularzy inline zawierający tylko jedną stronę obiektów powiązanych, zamiast wszystkich.
+    Numer strony (page_number) i parametry adresu (request_params) ustawia PaginatedInline.get_formset.
+    """
+    per_page = 20
+    page_number = 1
+    request_params = None
+
+    def get_queryset(self):
+        if not hasattr(self, '_page'):
+            paginator = Paginator(super().get_queryset(), self.per_page)
+            self._page = paginator.get_page(self.page_number)
+        return self._page.object_list
+
+    @property
+    def page(self):
+        self.get_queryset()
+        return self._page
+
+    @property
+    def page_links(self):
+        """
+        Zwraca odnośniki do stron (z pominięciem odległych stron) z zachowaniem pozostałych parametrów adresu.
+        """
+        links = []
+        for number in self.page.paginator.get_elided_page_range(self.page.number):
+            params = self.request_params.copy()
+            params[f'{self.prefix}-page'] = number
+            links.append({'number': number, 'url': f'?{params.urlencode()}', 'current': number == self.page.number,
+                          'ellipsis': number == self.page.paginator.ELLIPSIS})
+        return links
+
+
 # Klasa inline dla darowizn
 class DonationInline(admin.TabularInline):
     """
-    Klasa inline dla modelu darowizn, wyświetlana w modelach powiązanych.
+    Klasa inline dla modelu darowizn, wyświetlana w modelach powiązanych. Wyświetla darowizny stronami,
+    tylko do odczytu, z odnośnikiem do edycji każdej darowizny.
     """
     model = Donation
-    extra = 1
-    readonly_fields = ('created_at', 'updated_at',)
+    formset = PaginatedInlineFormSet
+    template = 'admin/donations/paginated_tabular.html'
+    fields = ('pick_up_date', 'pick_up_time', 'quantity', 'user', 'courier', 'city', 'status', 'is_taken_by_user',
+              'is_taken_by_courier', 'created_at')
+    extra = 0
+    can_delete = False
+    show_change_link = True
+    per_page = 20
+
+    def get_readonly_fields(self, request, obj=None):
+        return self.fields  # Edycja darowizny na jej własnej stronie
+
+    def has_add_permission(self, request, obj=None):
+        return False  # Darowizny dodawane są na ich własnej stronie
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related('institution', 'user', 'courier')
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        page_number = request.GET.get(f'{formset.get_default_prefix()}-page', 1)
+        return type(formset.__name__, (formset,), {
+            'per_page': self.per_page,
+            'page_number': page_number,
+            'request_params': request.GET.copy(),
+        })
+
+
+class UserDonationInline(DonationInline):
+    """
+    Darowizny przekazane przez użytkownika.
+    """
+    fk_name = 'user'
+    fields = ('pick_up_date', 'pick_up_time', 'quantity', 'institution', 'courier', 'city', 'status',
+              'is_taken_by_user', 'is_taken_by_courier', 'created_at')
+    verbose_name_plural = 'Darowizny użytkownika'
+
+
+class CourierDonationInline(DonationInline):
+    """
+    Darowizny przypisane do użytkownika jako kuriera.
+    """
+    fk_name = 'courier'
+    fields = ('pick_up_date', 'pick_up_time', 'quantity', 'institution', 'user', 'city', 'status',
+              'is_taken_by_user', 'is_taken_by_courier', 'created_at')
+    verbose_name_plural = 'Darowizny kuriera'
 
 
 # Admin dla kategorii
@@ -75,7 +450,7 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name',)
     search_fields = ('name',)
     readonly_fields = ('name',)
-    actions = [export_as_csv]
+    actions = EXPORT_ACTIONS
     list_per_page = 30
 
 
@@ -85,7 +460,7 @@ class InstitutionAdmin(admin.ModelAdmin):
     """
     Admin dla modelu instytucji.
     """
-    list_display = ('name', 'description', 'type', 'created_at')
+    list_display = ('name', 'description', 'type', 'donation_count', 'total_bags', 'last_donation_at', 'created_at')
     search_fields = ('name', 'description', 'type',)
     list_filter = ('type',)
     readonly_fields = ('created_at',)
@@ -98,13 +473,31 @@ class InstitutionAdmin(admin.ModelAdmin):
             'fields': ('categories',),
         }),
     )
-    actions = [export_as_csv]
+    actions = EXPORT_ACTIONS
     inlines = [DonationInline]
     list_per_page = 30
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        return queryset.prefetch_related('categories', 'donations')
+        # Agregaty darowizn liczone w bazie podzapytaniami skorelowanymi - tylko dla instytucji na bieżącej stronie
+        donations = Donation.objects.filter(institution=OuterRef('pk')).order_by().values('institution')
+        return queryset.annotate(
+            donation_count=Coalesce(Subquery(donations.annotate(value=Count('id')).values('value')), 0),
+            total_bags=Coalesce(Subquery(donations.annotate(value=Sum('quantity')).values('value')), 0),
+            last_donation_at=Subquery(donations.annotate(value=Max('created_at')).values('value')),
+        )
+
+    @admin.display(description='Liczba darowizn', ordering='donation_count')
+    def donation_count(self, obj):
+        return obj.donation_count
+
+    @admin.display(description='Oddanych worków', ordering='total_bags')
+    def total_bags(self, obj):
+        return obj.total_bags
+
+    @admin.display(description='Ostatnia darowizna', ordering='last_donation_at', empty_value='-')
+    def last_donation_at(self, obj):
+        return obj.last_donation_at
 
 
 # Admin dla darowizn
@@ -117,8 +510,11 @@ class DonationAdmin(admin.ModelAdmin):
         'quantity', 'institution', 'address', 'city', 'zip_code', 'pick_up_date', 'pick_up_time', 'user',
         'is_taken_by_user', 'is_taken_by_courier', 'courier', 'status', 'created_at', 'updated_at')
     search_fields = ('institution__name', 'address', 'city', 'zip_code', 'user__username',)
-    list_filter = ('pick_up_date', 'pick_up_time', 'institution', 'is_taken_by_user', 'is_taken_by_courier', 'status', DateRangeFilter)
+    list_filter = ('pick_up_date', PickUpTimeFilter, InstitutionSearchFilter,
+                   'is_taken_by_user', 'is_taken_by_courier', 'status', DateRangeFilter)
     date_hierarchy = 'pick_up_date'
+    paginator = EstimatedCountPaginator  # Szacowana liczba wyników dla dużej tabeli
+    show_full_result_count = False  # Bez dodatkowego COUNT(*) całej tabeli
     readonly_fields = ('created_at', 'updated_at',)
     fieldsets = (
         (None, {
@@ -130,12 +526,20 @@ class DonationAdmin(admin.ModelAdmin):
             'fields': ('categories', 'pick_up_comment'),
         }),
     )
-    actions = [export_as_csv]
+    actions = DONATION_ACTIONS + EXPORT_ACTIONS
+    action_form = DonationActionForm
+    export_exclude = ('search_document',)
     list_per_page = 30
 
+    class Media:
+        js = ('js/admin_institution_filter.js',)
+
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        return queryset.select_related('institution', 'user').prefetch_related('categories')
+        return queryset.select_related('institution', 'user', 'courier')  # Kolumny listy bez zapytań N+1
+
+    def get_changelist(self, request, **kwargs):
+        return CachedAggregatesChangeList
 
 
 # Admin dla tokenu weryfikacji email
@@ -144,7 +548,7 @@ class EmailVerificationTokenAdmin(admin.ModelAdmin):
     """
     Admin dla modelu tokenu weryfikacji email.
     """
-    list_display = ('user', 'token', 'created_at')
+    list_display = ('user', 'token', 'created_at', 'expires_at')
     search_fields = ('user__username', 'token')
     readonly_fields = ('created_at',)
     list_filter = (DateRangeFilter,)
@@ -157,7 +561,7 @@ class PasswordResetTokenAdmin(admin.ModelAdmin):
     """
     Admin dla modelu tokenu resetu hasła.
     """
-    list_display = ('user', 'token', 'created_at')
+    list_display = ('user', 'token', 'created_at', 'expires_at')
     search_fields = ('user__username', 'token')
     readonly_fields = ('created_at',)
     list_filter = (DateRangeFilter,)
@@ -189,7 +593,7 @@ class CustomUserAdmin(DefaultUserAdmin):
     Niestandardowy admin dla modelu użytkowników, z dodatkowymi akcjami i polami inline.
     """
     actions = [delete_superuser]
-    inlines = [DonationInline]
+    inlines = [UserDonationInline, CourierDonationInline]
     list_display = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'is_superuser')
     search_fields = ('username', 'email', 'first_name', 'last_name')
     list_filter = ('is_staff', 'is_superuser', 'is_active', DateRangeFilter)
@@ -234,7 +638,7 @@ class ContactMessageAdmin(admin.ModelAdmin):
     list_display = ('name', 'surname', 'email', 'created_at')
     search_fields = ('name', 'surname', 'email',)
     readonly_fields = ('created_at',)
-    actions = [export_as_csv]
+    actions = EXPORT_ACTIONS
     list_per_page = 30
 
 
@@ -248,5 +652,62 @@ class ProblemReportAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'topic',)
     list_filter = ('topic', DateRangeFilter)
     readonly_fields = ('created_at',)
-    actions = [export_as_csv]
+    actions = EXPORT_ACTIONS
+    list_per_page = 30
+
+
+# Admin dla skrzynki nadawczej
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """
+    Admin dla modelu wiadomości w skrzynce nadawczej.
+    """
+    list_display = ('subject', 'recipients', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    search_fields = ('subject',)
+    list_filter = ('status', DateRangeFilter)
+    readonly_fields = ('created_at', 'sent_at', 'claimed_at', 'last_error')
     list_per_page = 30
+
+
+# Admin dla eksportów danych
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """
+    Admin dla modelu zadań eksportu danych, ze statusem zadania i odnośnikiem do pobrania pliku.
+    """
+    list_display = ('model_label', 'export_format', 'status', 'rows', 'created_by', 'created_at', 'finished_at',
+                    'download_link')
+    list_filter = ('status', 'export_format', 'model_label')
+    readonly_fields = ('model_label', 'export_format', 'query_string', 'selected_ids', 'status', 'created_by', 'rows',
+                       'error', 'created_at', 'started_at', 'finished_at', 'download_link')
+    exclude = ('file',)
+    list_per_page = 30
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related('created_by')
+
+    def has_add_permission(self, request):
+        return False  # Eksporty zlecane są akcjami na listach innych modeli
+
+    def get_urls(self):
+        return [
+            path('<int:job_id>/download/', self.admin_site.admin_view(self.download_view),
+                 name='donations_exportjob_download'),
+        ] + super().get_urls()
+
+    @admin.display(description='Plik')
+    def download_link(self, obj):
+        if obj.status != ExportJob.DONE or not obj.file:
+            return '-'
+        return format_html('<a href="{}">Pobierz</a>', reverse('admin:donations_exportjob_download', args=[obj.pk]))
+
+    def download_view(self, request, job_id):
+        """
+        Widok pobierania pliku eksportu; plik dostępny jest dla zlecającego i superużytkowników.
+        """
+        job = get_object_or_404(ExportJob, pk=job_id, status=ExportJob.DONE)
+        if not self.has_view_permission(request, job) or (
+                job.created_by_id != request.user.id and not request.user.is_superuser):
+            raise PermissionDenied
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=job.file.name.rsplit('/', 1)[-1])
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+
+
+def user_cache_key(user_id):
+    """
+    Zwraca klucz cache obiektu zalogowanego użytkownika (wspólny dla wszystkich jego sesji).
+    """
+    return f'donations:session_user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """
+    Usuwa z cache obiekt użytkownika, np. po zapisie użytkownika lub zmianie hasła.
+    """
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    Backend uwierzytelniania, który przechowuje w cache (przez USER_CACHE_TIMEOUT sekund) obiekt użytkownika
+    wczytywany przy każdym żądaniu zalogowanego użytkownika, zamiast pobierać go z bazy danych.
+    Skrót hasła z obiektu w cache nadal jest porównywany ze skrótem zapisanym w sesji, a sygnały zapisu
+    i usunięcia użytkownika usuwają obiekt z cache. Wymaga wspólnego cache (np. memcached) dla wszystkich procesów.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username=username, password=password, **kwargs)
+        if user is None:
+            # Kolejny backend (ModelBackend dla starych sesji) sprawdziłby hasło ponownie - przerwanie uwierzytelniania
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        if not settings.USER_CACHE_TIMEOUT:
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
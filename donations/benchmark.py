@@ -0,0 +1,194 @@
+import json
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from .middleware import QueryCounter
+from .models import Category, Donation, Institution
+from .pagination import keyset_page
+from .views import PROFILE_DONATION_ORDERING, PROFILE_DONATIONS_PER_PAGE
+
+# Domyślny dopuszczalny wzrost czasu odpowiedzi i zużycia pamięci względem wyników bazowych (20%)
+DEFAULT_TOLERANCE = 0.2
+
+
+class Scenario:
+    """
+    Scenariusz benchmarku: jedno żądanie wykonywane wielokrotnie przez klienta testowego Django.
+
+    Atrybuty:
+        name (str): Nazwa scenariusza w wynikach.
+        client (Client): Klient testowy (anonimowy lub zalogowany).
+        method (str): Metoda HTTP ('get' lub 'post').
+        path (str): Adres żądania.
+        data (dict | str): Dane żądania.
+        content_type (str): Typ treści żądania POST.
+        headers (dict): Dodatkowe nagłówki żądania.
+        expected_status (int): Oczekiwany kod odpowiedzi.
+    """
+
+    def __init__(self, name, client, method, path, data=None, content_type=None, headers=None, expected_status=200):
+        self.name = name
+        self.client = client
+        self.method = method
+        self.path = path
+        self.data = data
+        self.content_type = content_type
+        self.headers = headers or {}
+        self.expected_status = expected_status
+
+    def request(self):
+        kwargs = {'headers': self.headers}
+        if self.content_type:
+            kwargs['content_type'] = self.content_type
+        return getattr(self.client, self.method)(self.path, self.data, **kwargs)
+
+
+def benchmark_donation():
+    """
+    Zwraca darowiznę, której dotyczą scenariusze profilu użytkownika (pierwsza darowizna z użytkownikiem), lub None.
+    """
+    return Donation.objects.filter(user__isnull=False).order_by('id').first()
+
+
+def build_scenarios():
+    """
+    Buduje listę scenariuszy dla bieżących danych w bazie: strona główna, formularz darowizny (GET i POST),
+    profil użytkownika (wyszukiwanie, filtr, paginacja, przełączanie odbioru) oraz listy w panelu administracyjnym.
+    """
+    donation = benchmark_donation()
+    admin_user = User.objects.filter(is_superuser=True, is_active=True).order_by('id').first()
+    if donation is None or admin_user is None:
+        raise ValueError('Benchmark wymaga darowizn z użytkownikiem i aktywnego superużytkownika (populate_db).')
+    user = donation.user
+
+    anonymous = Client()
+    donor = Client()
+    donor.force_login(user)
+    admin = Client()
+    admin.force_login(admin_user)
+
+    profile_url = reverse('donations:user_profile')
+    deep_page = keyset_page(Donation.objects.filter(user=user), PROFILE_DONATION_ORDERING,
+                            PROFILE_DONATIONS_PER_PAGE * 5)  # Kursor szóstej strony profilu
+    search_term = donation.city.lower()
+    donation_form = {
+        'categories': list(Category.objects.values_list('id', flat=True)[:2]),
+        'bags': 3,
+        'organization': donation.institution_id,
+        'address': 'ul. Testowa 1',
+        'city': 'Warszawa',
+        'postcode': '00-001',
+        'phone': '+48123456789',
+        'date': (date.today() + timedelta(days=7)).isoformat(),
+        'time': '12:00',
+        'more_info': 'benchmark',
+    }
+
+    return [
+        Scenario('index', anonymous, 'get', reverse('donations:index')),
+        Scenario('index_authenticated', donor, 'get', reverse('donations:index')),
+        Scenario('add_donation_get', donor, 'get', reverse('donations:add_donation')),
+        Scenario('add_donation_post', donor, 'post', reverse('donations:add_donation'), donation_form,
+                 expected_status=302),
+        Scenario('user_profile', donor, 'get', profile_url),
+        Scenario('user_profile_search', donor, 'get', profile_url, {'search': search_term}),
+        Scenario('user_profile_filter', donor, 'get', profile_url, {'status': 'pending'}),
+        Scenario('user_profile_page', donor, 'get', profile_url, {'after': deep_page['next_cursor'] or ''}),
+        Scenario('user_profile_toggle', donor, 'post', profile_url, json.dumps({'donation_id': donation.id}),
+                 content_type='application/json'),
+        Scenario('admin_donations', admin, 'get', reverse('admin:donations_donation_changelist')),
+        Scenario('admin_donations_search', admin, 'get', reverse('admin:donations_donation_changelist'),
+                 {'q': search_term}),
+        Scenario('admin_donations_filter', admin, 'get', reverse('admin:donations_donation_changelist'),
+                 {'status__exact': 'pending'}),
+        Scenario('admin_institutions', admin, 'get', reverse('admin:donations_institution_changelist')),
+        Scenario('admin_users', admin, 'get', reverse('admin:auth_user_changelist')),
+    ]
+
+
+def _timed_request(scenario):
+    """
+    Wykonuje żądanie scenariusza, zwracając krotkę (odpowiedź, czas w milisekundach, liczba zapytań).
+    """
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        start = time.perf_counter()
+        response = scenario.request()
+        elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code != scenario.expected_status:
+        raise AssertionError(f'{scenario.name}: kod odpowiedzi {response.status_code}, '
+                             f'oczekiwano {scenario.expected_status}')
+    return response, elapsed, counter.count
+
+
+def run_scenario(scenario, iterations, warmup):
+    """
+    Wykonuje scenariusz warmup razy bez pomiaru, a następnie iterations razy z pomiarem czasu i liczby zapytań.
+    Szczytowe zużycie pamięci mierzone jest w osobnym żądaniu, aby tracemalloc nie zawyżał czasów odpowiedzi.
+    """
+    for _ in range(warmup):
+        _timed_request(scenario)
+
+    timings, query_counts = [], []
+    for _ in range(iterations):
+        _, elapsed, queries = _timed_request(scenario)
+        timings.append(elapsed)
+        query_counts.append(queries)
+
+    tracemalloc.start()
+    try:
+        _timed_request(scenario)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive') if len(timings) > 1 else timings * 99
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentiles[49], 3),
+        'p95_ms': round(percentiles[94], 3),
+        'p99_ms': round(percentiles[98], 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries': max(query_counts),
+        'peak_memory_kb': round(peak_memory / 1024, 1),
+    }
+
+
+def dataset_summary():
+    """
+    Zwraca rozmiar danych, na których wykonano benchmark.
+    """
+    return {
+        'donations': Donation.objects.count(),
+        'institutions': Institution.objects.count(),
+        'users': User.objects.count(),
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Porównuje wyniki scenariuszy z wynikami bazowymi. Zwraca listę opisów regresji: wzrost p95 lub szczytowej
+    pamięci ponad tolerancję albo jakikolwiek wzrost liczby zapytań (która nie zależy od obciążenia maszyny).
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in ('p95_ms', 'peak_memory_kb'):
+            if base[metric] and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f'{name}: {metric} {result[metric]} (bazowo {base[metric]}, '
+                                   f'+{(result[metric] / base[metric] - 1) * 100:.0f}%)')
+        if result['queries'] > base['queries']:
+            regressions.append(f'{name}: queries {result["queries"]} (bazowo {base["queries"]})')
+    return regressions
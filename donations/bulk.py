@@ -0,0 +1,119 @@
+from django.db import connections, transaction
+from django.utils import timezone
+
+# Liczba wierszy zmienianych jednym zapytaniem UPDATE (w jednej transakcji) w operacjach zbiorczych
+BULK_BATCH_SIZE = 5000
+
+# Dozwolone przejścia statusu darowizny: status docelowy -> statusy, z których można go ustawić
+STATUS_TRANSITIONS = {
+    'pending': ('in_progress',),
+    'in_progress': ('pending',),
+    'completed': ('in_progress',),
+}
+
+# Statusy darowizn, którym można przypisać lub odebrać kuriera
+COURIER_ASSIGNABLE_STATUSES = ('pending', 'in_progress')
+
+
+def update_returning(model, filters, **values):
+    """
+    Ustawia values w wierszach modelu spełniających filters (słownik warunków: pole=wartość lub pole__in=lista)
+    i zwraca listę kluczy głównych zmienionych wierszy. Na PostgreSQL i SQLite wykonuje jedno zapytanie
+    UPDATE ... RETURNING, budowane z nazw kolumn modelu i parametrów przygotowanych przez pola modelu.
+    Na pozostałych bazach (np. MariaDB, która nie obsługuje UPDATE ... RETURNING) blokuje pasujące wiersze
+    i aktualizuje je z tymi samymi warunkami, w jednej transakcji.
+    """
+    manager = model._base_manager
+    connection = connections[manager.db]
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        queryset = manager.filter(**filters)
+        with transaction.atomic(using=manager.db):
+            ids = list(queryset.select_for_update().values_list('pk', flat=True))
+            queryset.filter(pk__in=ids).update(**values)
+        return ids
+
+    quote = connection.ops.quote_name
+    assignments, conditions, params = [], [], []
+    for name, value in values.items():
+        field = model._meta.get_field(name)
+        assignments.append(f'{quote(field.column)} = %s')
+        params.append(field.get_db_prep_save(value, connection))
+    for lookup, value in filters.items():
+        name, _, operator = lookup.partition('__')
+        field = model._meta.get_field(name)
+        if operator == 'in':
+            value = list(value)
+            if not value:
+                return []
+            conditions.append(f'{quote(field.column)} IN ({", ".join(["%s"] * len(value))})')
+            params.extend(field.get_db_prep_value(item, connection) for item in value)
+        elif not operator:
+            conditions.append(f'{quote(field.column)} = %s')
+            params.append(field.get_db_prep_value(value, connection))
+        else:
+            raise ValueError(f'Nieobsługiwany warunek: {lookup}')
+
+    pk_column = quote(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {quote(model._meta.db_table)} SET {", ".join(assignments)} '
+            f'WHERE {" AND ".join(conditions) or "1 = 1"} RETURNING {pk_column}',
+            params,
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def batched_update(queryset, batch_size=BULK_BATCH_SIZE, **values):
+    """
+    Aktualizuje wiersze querysetu partiami po batch_size kolejnych pasujących kluczy głównych (stronicowanie
+    po pk > ostatni klucz partii), jednym zapytaniem UPDATE ... WHERE pk IN (...) z warunkami querysetu
+    na partię. Każda partia jest osobną transakcją, dzięki czemu blokady wierszy trzymane są krótko.
+    Zwraca liczbę zmienionych wierszy.
+    """
+    queryset = queryset.order_by()
+    updated, last = 0, None
+    while True:
+        batch = queryset if last is None else queryset.filter(pk__gt=last)
+        with transaction.atomic(using=queryset.db):
+            ids = list(batch.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            # Warunki querysetu powtórzone, aby pominąć wiersze zmienione od pobrania identyfikatorów
+            updated += queryset.filter(pk__in=ids).update(**values)
+        if len(ids) < batch_size:
+            break
+        last = ids[-1]
+    return updated
+
+
+def transition_status(queryset, status, batch_size=BULK_BATCH_SIZE):
+    """
+    Zmienia status darowizn querysetu na status, tylko dla darowizn w statusach, z których to przejście
+    jest dozwolone (STATUS_TRANSITIONS). Zwraca liczbę zmienionych darowizn.
+    """
+    if status not in STATUS_TRANSITIONS:
+        raise ValueError(f'Nieznany status darowizny: {status}')
+    return batched_update(queryset.filter(status__in=STATUS_TRANSITIONS[status]), batch_size,
+                          status=status, updated_at=timezone.now())
+
+
+def assign_courier(queryset, courier, batch_size=BULK_BATCH_SIZE):
+    """
+    Przypisuje kuriera (None - odbiera przypisanie) darowiznom querysetu, które nie zostały jeszcze
+    zrealizowane ani odebrane przez kuriera. Zwraca liczbę zmienionych darowizn.
+    """
+    queryset = queryset.filter(status__in=COURIER_ASSIGNABLE_STATUSES, is_taken_by_courier=False)
+    return batched_update(queryset.exclude(courier=courier), batch_size, courier=courier,
+                          updated_at=timezone.now())
+
+
+def set_taken_by_courier(queryset, is_taken_by_courier, batch_size=BULK_BATCH_SIZE):
+    """
+    Ustawia oznaczenie "zabrane przez kuriera" darowiznom querysetu. Jako zabrane można oznaczyć tylko
+    darowizny z przypisanym kurierem. Zwraca liczbę zmienionych darowizn.
+    """
+    queryset = queryset.filter(is_taken_by_courier=not is_taken_by_courier)
+    if is_taken_by_courier:
+        queryset = queryset.filter(courier__isnull=False)
+    return batched_update(queryset, batch_size, is_taken_by_courier=is_taken_by_courier,
+                          updated_at=timezone.now())
@@ -0,0 +1,102 @@
+import hashlib
+import re
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+# Klucze cache przechowujące wersję stron publicznych (licznik) i czas ich ostatniej zmiany
+PAGE_CACHE_VERSION_KEY = 'donations:page_cache_version'
+PAGE_CACHE_MODIFIED_KEY = 'donations:page_cache_modified'
+
+# Znacznik wstawiany do zapisanej strony w miejsce tokenu CSRF
+CSRF_PLACEHOLDER = '__csrf_token_placeholder__'
+CSRF_INPUT_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+def get_page_cache_version():
+    """
+    Zwraca krotkę: bieżąca wersja stron publicznych (licznik w kluczach cache i nagłówku ETag),
+    czas ostatniej zmiany stron (nagłówek Last-Modified, nigdy późniejszy niż bieżący czas).
+    """
+    now = int(time.time())
+    values = cache.get_many([PAGE_CACHE_VERSION_KEY, PAGE_CACHE_MODIFIED_KEY])
+    version, modified = values.get(PAGE_CACHE_VERSION_KEY), values.get(PAGE_CACHE_MODIFIED_KEY)
+    if version is None:
+        # Licznik zaczyna od bieżącego czasu w milisekundach, aby po wyczyszczeniu cache nie powtórzył
+        # wcześniejszych ETagów
+        initial = int(time.time() * 1000)
+        cache.add(PAGE_CACHE_VERSION_KEY, initial, None)
+        version = cache.get(PAGE_CACHE_VERSION_KEY, initial)
+    if modified is None:
+        cache.add(PAGE_CACHE_MODIFIED_KEY, now, None)
+        modified = cache.get(PAGE_CACHE_MODIFIED_KEY, now)
+    return version, min(modified, now)
+
+
+def invalidate_page_cache():
+    """
+    Unieważnia wszystkie zapisane strony publiczne przez atomowe podbicie wersji w kluczach cache
+    i zapisuje czas zmiany stron.
+    """
+    try:
+        cache.incr(PAGE_CACHE_VERSION_KEY)
+    except ValueError:  # Brak licznika - zostanie utworzony przy następnym żądaniu
+        pass
+    cache.set(PAGE_CACHE_MODIFIED_KEY, int(time.time()), None)
+
+
+def _is_cacheable_request(request):
+    """
+    Sprawdza, czy żądanie może zostać obsłużone z cache (anonimowe żądanie GET/HEAD bez oczekujących komunikatów).
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    return not len(get_messages(request))
+
+
+def cache_anonymous_page(view_func):
+    """
+    Dekorator zapisujący w cache całą stronę renderowaną dla anonimowych użytkowników.
+    Klucz obejmuje ścieżkę i parametry zapytania, a token CSRF formularza kontaktowego jest podmieniany
+    przy każdym żądaniu. Odpowiedzi zawierają nagłówki ETag i Last-Modified, dzięki czemu przeglądarka
+    może tanio zweryfikować aktualność strony.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not _is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        version, last_modified = get_page_cache_version()
+        path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        cache_key = f'donations:page:{version}:{path_hash}'
+        etag = f'W/"{version}-{path_hash}"'
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            content = cache.get(cache_key)
+            if content is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200 or response.cookies or getattr(response, 'streaming', False):
+                    return response
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+                content = CSRF_INPUT_RE.sub(rf'\g<1>{CSRF_PLACEHOLDER}\g<2>', response.content.decode(response.charset))
+                cache.set(cache_key, content, settings.PAGE_CACHE_TIMEOUT)
+            response = HttpResponse(content.replace(CSRF_PLACEHOLDER, get_token(request)))
+
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    return wrapper
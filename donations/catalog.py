@@ -0,0 +1,187 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.core.cache import cache
+
+from .models import Category, Institution
+
+# Klucze cache przechowujące wersję i zawartość katalogu formularza darowizny
+CATALOG_VERSION_KEY = 'donations:catalog_version'
+CATALOG_KEY = 'donations:catalog:{version}'
+
+# Kopia katalogu w pamięci procesu (workera)
+_local_catalog = {'version': None, 'catalog': None, 'search_index': None}
+_local_lock = threading.Lock()
+
+
+def _initial_version():
+    """
+    Zwraca początkową wersję katalogu: bieżący czas w milisekundach, większy od wersji sprzed usunięcia klucza
+    z cache, dzięki czemu procesy nie uznają swojej kopii katalogu w pamięci za aktualną.
+    """
+    return int(time.time() * 1000)
+
+
+def get_catalog_version():
+    """
+    Zwraca bieżącą wersję katalogu, inicjalizując ją przy pierwszym użyciu (także po wyczyszczeniu cache).
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        initial = _initial_version()
+        cache.add(CATALOG_VERSION_KEY, initial, None)
+        version = cache.get(CATALOG_VERSION_KEY, initial)
+    return version
+
+
+def invalidate_catalog():
+    """
+    Unieważnia katalog przez podbicie jego wersji; kolejne odczyty zbudują go od nowa.
+    """
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, _initial_version(), None)
+
+
+def build_catalog(version=None):
+    """
+    Buduje katalog formularza darowizny: listę kategorii, listę instytucji wraz z identyfikatorami
+    ich kategorii oraz mapowanie kategoria -> instytucje. Wymaga trzech zapytań niezależnie od liczby rekordów.
+    """
+    categories = [{'id': pk, 'name': name} for pk, name in Category.objects.values_list('id', 'name')]
+
+    institution_categories = {}
+    category_institutions = {category['id']: [] for category in categories}
+    for institution_id, category_id in Institution.categories.through.objects.values_list(
+            'institution_id', 'category_id').order_by('institution_id', 'category_id'):
+        institution_categories.setdefault(institution_id, []).append(category_id)
+        category_institutions.setdefault(category_id, []).append(institution_id)
+
+    institutions = []
+    for pk, name, description, institution_type in Institution.objects.values_list(
+            'id', 'name', 'description', 'type'):
+        category_ids = institution_categories.get(pk, [])
+        institutions.append({
+            'id': pk,
+            'name': name,
+            'description': description,
+            'type': institution_type,
+            'category_ids': category_ids,
+            'category_ids_csv': ','.join(str(category_id) for category_id in category_ids),
+        })
+
+    return {
+        'version': version,
+        'categories': categories,
+        'institutions': institutions,
+        'category_institutions': category_institutions,
+    }
+
+
+def get_catalog():
+    """
+    Zwraca katalog formularza darowizny. W stanie ustalonym katalog pochodzi z pamięci workera
+    (jedno sprawdzenie wersji w cache), a po zmianie wersji z cache lub - w ostateczności - z bazy danych.
+    """
+    version = get_catalog_version()
+    if _local_catalog['version'] == version:
+        return _local_catalog['catalog']
+
+    with _local_lock:
+        if _local_catalog['version'] == version:
+            return _local_catalog['catalog']
+
+        catalog = cache.get(CATALOG_KEY.format(version=version))
+        if catalog is None:
+            catalog = build_catalog(version)
+            cache.set(CATALOG_KEY.format(version=version), catalog, None)
+
+        _local_catalog['version'] = version
+        _local_catalog['catalog'] = catalog
+        _local_catalog['search_index'] = None
+    return catalog
+
+
+def build_search_index(catalog):
+    """
+    Buduje indeks odwrócony katalogu: kategoria -> posortowana tablica identyfikatorów instytucji
+    oraz posortowaną listę nazw instytucji do wyszukiwania po prefiksie.
+    """
+    # Kolejność nazw ustalana w Pythonie, aby wyszukiwanie binarne nie zależało od collation bazy danych
+    institutions = sorted(catalog['institutions'], key=lambda institution: institution['name'].casefold())
+    return {
+        'version': catalog['version'],
+        'category_institutions': {
+            category_id: array('q', sorted(institution_ids))
+            for category_id, institution_ids in catalog['category_institutions'].items()
+        },
+        'names': [institution['name'].casefold() for institution in institutions],
+        'name_rank': {institution['id']: rank for rank, institution in enumerate(institutions)},
+        'institutions': institutions,
+    }
+
+
+def get_search_index():
+    """
+    Zwraca indeks odwrócony dla bieżącej wersji katalogu, budując go w pamięci workera po zmianie katalogu.
+    """
+    catalog = get_catalog()
+    index = _local_catalog['search_index']
+    if index is None or index['version'] != catalog['version']:
+        index = build_search_index(catalog)
+        _local_catalog['search_index'] = index
+    return index
+
+
+def _intersect_sorted(left, right):
+    """
+    Zwraca część wspólną dwóch posortowanych tablic identyfikatorów (scalanie liniowe).
+    """
+    result = array('q')
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left[i] == right[j]:
+            result.append(left[i])
+            i += 1
+            j += 1
+        elif left[i] < right[j]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def search_institutions(category_ids=(), prefix=''):
+    """
+    Zwraca instytucje (posortowane według nazwy) obsługujące wszystkie podane kategorie
+    i których nazwa zaczyna się od podanego prefiksu.
+    """
+    index = get_search_index()
+    institutions = index['institutions']
+
+    if prefix:
+        prefix = prefix.casefold()
+        start = bisect_left(index['names'], prefix)
+        end = bisect_left(index['names'], prefix + '\U0010ffff', lo=start)
+        candidates = range(start, end)
+    else:
+        candidates = range(len(institutions))
+
+    if not category_ids:
+        return [institutions[rank] for rank in candidates]
+
+    postings = sorted((index['category_institutions'].get(category_id, array('q')) for category_id in set(category_ids)),
+                      key=len)
+    matched = postings[0]
+    for posting in postings[1:]:
+        if not matched:
+            break
+        matched = _intersect_sorted(matched, posting)
+
+    ranks = sorted(index['name_rank'][institution_id] for institution_id in matched)
+    if prefix:
+        ranks = [rank for rank in ranks if start <= rank < end]
+    return [institutions[rank] for rank in ranks]
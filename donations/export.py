@@ -0,0 +1,154 @@
+import csv
+import json
+import tempfile
+from datetime import datetime
+from itertools import chain
+from uuid import UUID
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # Eksport XLSX jest niedostępny bez openpyxl (silnika XLSX biblioteki tablib)
+    Workbook = None
+
+# Liczba wierszy pobieranych z bazy danych w jednej partii
+EXPORT_CHUNK_SIZE = 2000
+
+# Rozmiar fragmentu odpowiedzi (w bajtach), po którego zapełnieniu dane wysyłane są do klienta
+STREAM_BUFFER_SIZE = 64 * 1024
+
+# Maksymalna liczba wierszy eksportu XLSX wysyłanego w odpowiedzi na żądanie; plik XLSX powstaje w całości
+# przed wysłaniem pierwszego bajtu, więc większe eksporty wykonywane są w tle (run_export_jobs)
+XLSX_SYNC_MAX_ROWS = 10000
+
+# Pola modeli powiązanych używane jako czytelna wartość klucza obcego (pierwsze istniejące)
+RELATED_LABEL_FIELDS = ('name', 'username', 'subject')
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def export_columns(model, exclude=()):
+    """
+    Zwraca listę par (nagłówek, ścieżka pola dla values_list) dla pól modelu. Klucze obce eksportowane są
+    jako czytelna wartość modelu powiązanego pobierana złączeniem (JOIN), a nie osobnym zapytaniem na wiersz.
+    """
+    columns = []
+    for field in model._meta.get_fields():
+        if not field.concrete or field.many_to_many or field.name in exclude:
+            continue
+        lookup = field.name
+        if field.is_relation:
+            related_fields = {related_field.name for related_field in field.related_model._meta.concrete_fields}
+            label = next((name for name in RELATED_LABEL_FIELDS if name in related_fields), None)
+            lookup = f'{field.name}__{label}' if label else field.attname
+        columns.append((field.name, lookup))
+    return columns
+
+
+def export_rows(queryset, lookups, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Zwraca iterator krotek wartości pobieranych partiami (na PostgreSQL kursorem po stronie serwera),
+    dzięki czemu pamięć nie rośnie wraz z liczbą eksportowanych wierszy.
+    """
+    return queryset.prefetch_related(None).values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """
+    Obiekt plikopodobny, którego metoda write zwraca zapisany tekst (csv.writer zwraca wtedy gotowy wiersz).
+    """
+
+    def write(self, value):
+        return value
+
+
+def _buffered(lines):
+    """
+    Łączy kolejne fragmenty tekstu w porcje o rozmiarze około STREAM_BUFFER_SIZE wysyłane do klienta.
+    """
+    parts, size = [], 0
+    for line in lines:
+        parts.append(line)
+        size += len(line)
+        if size >= STREAM_BUFFER_SIZE:
+            yield ''.join(parts)
+            parts, size = [], 0
+    if parts:
+        yield ''.join(parts)
+
+
+def stream_csv(headers, rows, include_headers=True):
+    """
+    Generuje plik CSV fragmentami (bez wiersza nagłówków dla include_headers=False, np. dla kolejnych części pliku).
+    """
+    writer = csv.writer(_Echo())
+    header_lines = [writer.writerow(headers)] if include_headers else []
+    yield from _buffered(chain(header_lines, (writer.writerow(row) for row in rows)))
+
+
+def stream_jsonl(headers, rows):
+    """
+    Generuje plik JSON Lines (jeden obiekt JSON na wiersz) fragmentami.
+    """
+    yield from _buffered(json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+                         for row in rows)
+
+
+def _excel_value(value):
+    """
+    Konwertuje wartość na typ obsługiwany przez arkusz XLSX (Excel nie obsługuje stref czasowych ani UUID).
+    """
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    if isinstance(value, (UUID, list, dict)):
+        return str(value)
+    return value
+
+
+def stream_xlsx(headers, rows):
+    """
+    Generuje plik XLSX. Arkusz w trybie write-only zapisuje wiersze na bieżąco do pliku tymczasowego,
+    a gotowy plik wysyłany jest fragmentami dopiero po zapisaniu wszystkich wierszy (patrz XLSX_SYNC_MAX_ROWS).
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    for row in rows:
+        sheet.append([_excel_value(value) for value in row])
+    with tempfile.TemporaryFile() as file:
+        workbook.save(file)
+        file.seek(0)
+        while chunk := file.read(STREAM_BUFFER_SIZE):
+            yield chunk
+
+
+STREAMS = {
+    'csv': stream_csv,
+    'jsonl': stream_jsonl,
+    'xlsx': stream_xlsx,
+}
+
+
+def export_response(queryset, export_format, exclude=()):
+    """
+    Zwraca odpowiedź strumieniową z eksportem wierszy querysetu w podanym formacie (csv, jsonl, xlsx).
+    """
+    if export_format == 'xlsx' and Workbook is None:
+        raise ImproperlyConfigured('Eksport XLSX wymaga biblioteki openpyxl.')
+    model = queryset.model
+    columns = export_columns(model, exclude)
+    headers = [header for header, _ in columns]
+    rows = export_rows(queryset, [lookup for _, lookup in columns])
+
+    response = StreamingHttpResponse(STREAMS[export_format](headers, rows),
+                                     content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename={model._meta}.{export_format}'
+    return response
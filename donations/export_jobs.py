@@ -0,0 +1,202 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core.exceptions import PermissionDenied
+from django.core.files import File
+from django.db import connections, transaction
+from django.db.models import Max, Min, Q
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from .export import STREAMS, export_columns, export_rows, stream_csv
+from .models import ExportJob
+
+# Formaty, których pliki można skleić z części eksportowanych równolegle (XLSX jest archiwum ZIP)
+MERGEABLE_FORMATS = {'csv', 'jsonl'}
+
+# Odstęp (w sekundach) pomiędzy kolejnymi sygnałami życia (heartbeat_at) wykonywanego eksportu
+HEARTBEAT_INTERVAL = 30
+
+# Liczba wierszy eksportowanych pomiędzy sprawdzeniami, czy należy zapisać sygnał życia
+HEARTBEAT_CHECK_ROWS = 1000
+
+
+def queue_export_job(request, queryset, export_format):
+    """
+    Zapisuje zadanie eksportu zaznaczonych obiektów (lub wszystkich pasujących do filtrów listy zmian,
+    gdy zaznaczono wszystkie) do wykonania w tle przez polecenie run_export_jobs.
+    """
+    select_across = request.POST.get('select_across') == '1'
+    return ExportJob.objects.create(
+        model_label=queryset.model._meta.label_lower,
+        export_format=export_format,
+        query_string=request.GET.urlencode(),
+        selected_ids=None if select_across else request.POST.getlist(ACTION_CHECKBOX_NAME),
+        created_by=request.user,
+    )
+
+
+def claim_job():
+    """
+    Pobiera najstarsze oczekujące zadanie eksportu (lub wykonywane, którego worker nie dał sygnału życia
+    przez EXPORT_JOB_TIMEOUT sekund, czyli przerwane) i oznacza je jako wykonywane. Na PostgreSQL wiersz
+    blokowany jest z SKIP LOCKED, dzięki czemu kilka workerów nie pobierze tego samego zadania.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+    with transaction.atomic():
+        job = (ExportJob.objects.select_for_update(skip_locked=True)
+               .filter(Q(status=ExportJob.PENDING) | Q(status=ExportJob.RUNNING, heartbeat_at__lt=stale))
+               .order_by('created_at', 'id').first())
+        if job is not None:
+            job.status = ExportJob.RUNNING
+            job.started_at = job.heartbeat_at = now
+            job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+    return job
+
+
+def _heartbeat(job_id):
+    """
+    Zapisuje sygnał życia wykonywanego zadania eksportu (bieżący czas w heartbeat_at).
+    """
+    ExportJob.objects.filter(pk=job_id, status=ExportJob.RUNNING).update(heartbeat_at=timezone.now())
+
+
+def job_queryset(job):
+    """
+    Odtwarza queryset eksportu z parametrów listy zmian zapisanych w zadaniu, stosując filtry, wyszukiwanie
+    i uprawnienia admina modelu tak, jak w chwili zlecenia. Zwraca krotkę (queryset, pola pomijane w eksporcie).
+    """
+    model = apps.get_model(job.model_label)
+    modeladmin = admin.site._registry[model]
+    url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+    request = RequestFactory().get(f'{url}?{job.query_string}')
+    request.user = job.created_by
+    if not modeladmin.has_view_or_change_permission(request):
+        raise PermissionDenied(f'Użytkownik {job.created_by} nie ma dostępu do listy {job.model_label}.')
+
+    queryset = model._default_manager.all()
+    queryset.query = modeladmin.get_changelist_instance(request).queryset.query  # Bez cache agregacji listy zmian
+    if job.selected_ids is not None:
+        queryset = queryset.filter(pk__in=job.selected_ids)
+    return queryset, getattr(modeladmin, 'export_exclude', ())
+
+
+def _write_file(path, stream):
+    """
+    Dopisuje do pliku kolejne fragmenty (tekstowe lub binarne) generowanego eksportu.
+    """
+    with open(path, 'ab') as file:
+        for chunk in stream:
+            file.write(chunk.encode() if isinstance(chunk, str) else chunk)
+
+
+def _counted(rows, counter, job_id):
+    """
+    Przekazuje dalej wiersze, zliczając je w counter[0] i co HEARTBEAT_INTERVAL sekund zapisując
+    sygnał życia zadania job_id.
+    """
+    last_heartbeat = time.monotonic()
+    for row in rows:
+        counter[0] += 1
+        if counter[0] % HEARTBEAT_CHECK_ROWS == 0 and time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL:
+            _heartbeat(job_id)
+            last_heartbeat = time.monotonic()
+        yield row
+
+
+def _export_part(job_id, model_label, query, export_format, headers, lookups, lower, upper, path):
+    """
+    Eksportuje w procesie roboczym część wierszy o kluczach głównych z zakresu [lower, upper) do pliku path.
+    Queryset odtwarzany jest z przekazanego obiektu zapytania (Query), bez ponownego przeliczania filtrów admina.
+    """
+    model = apps.get_model(model_label)
+    queryset = model._default_manager.all()
+    queryset.query = query
+    counter = [0]
+    rows = _counted(export_rows(queryset.filter(pk__gte=lower, pk__lt=upper).order_by('pk'), lookups), counter, job_id)
+    stream = (stream_csv(headers, rows, include_headers=False) if export_format == 'csv'
+              else STREAMS[export_format](headers, rows))
+    try:
+        _write_file(path, stream)
+    finally:
+        connections.close_all()
+    return counter[0]
+
+
+def _export_parallel(job_id, queryset, export_format, headers, lookups, path, workers):
+    """
+    Dzieli eksport na workers zakresów kluczy głównych eksportowanych równolegle w osobnych procesach,
+    a następnie skleja pliki części w kolejności zakresów. Wiersze uporządkowane są według klucza głównego.
+    """
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    if export_format == 'csv':
+        _write_file(path, stream_csv(headers, []))  # Wiersz nagłówków tylko raz, na początku pliku
+    if bounds['low'] is None:
+        return 0
+
+    step = (bounds['high'] - bounds['low']) // workers + 1
+    ranges = [(bounds['low'] + i * step, bounds['low'] + (i + 1) * step) for i in range(workers)]
+    part_paths = [f'{path}.part{i}' for i in range(workers)]
+
+    connections.close_all()  # Procesy potomne nie mogą współdzielić połączenia z bazą danych rodzica
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as executor:
+        futures = [
+            executor.submit(_export_part, job_id, queryset.model._meta.label_lower, queryset.query, export_format,
+                            headers, lookups, lower, upper, part_path)
+            for (lower, upper), part_path in zip(ranges, part_paths)
+        ]
+        rows = sum(future.result() for future in futures)
+
+    with open(path, 'ab') as file:
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                with open(part_path, 'rb') as part:
+                    shutil.copyfileobj(part, file)
+    return rows
+
+
+def run_job(job, workers=1):
+    """
+    Wykonuje zadanie eksportu: generuje plik partiami (przy workers > 1 równolegle dla formatów, które można
+    skleić) i zapisuje go w magazynie plików mediów. Błąd eksportu zapisywany jest w zadaniu.
+    """
+    try:
+        queryset, exclude = job_queryset(job)
+        columns = export_columns(queryset.model, exclude)
+        headers = [header for header, _ in columns]
+        lookups = [lookup for _, lookup in columns]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export')
+            if (workers > 1 and job.export_format in MERGEABLE_FORMATS
+                    and 'fork' in multiprocessing.get_all_start_methods()):
+                rows = _export_parallel(job.id, queryset, job.export_format, headers, lookups, path, workers)
+            else:
+                counter = [0]
+                _write_file(path, STREAMS[job.export_format](headers, _counted(export_rows(queryset, lookups),
+                                                                               counter, job.id)))
+                rows = counter[0]
+            _heartbeat(job.id)  # Przed zapisem pliku w magazynie mediów
+            with open(path, 'rb') as file:
+                job.file.save(f'{queryset.model._meta.model_name}-{job.id}.{job.export_format}', File(file),
+                              save=False)
+    except Exception as e:
+        job.status = ExportJob.FAILED
+        job.error = f"{type(e).__name__}: {e}"
+    else:
+        job.status = ExportJob.DONE
+        job.rows = rows
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'rows', 'file', 'finished_at'])
+    return job
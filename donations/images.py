@@ -0,0 +1,99 @@
+import json
+import os
+from functools import lru_cache
+
+from django.contrib.staticfiles import finders
+from PIL import Image
+
+try:
+    import pillow_avif  # noqa: F401 - rejestruje format AVIF w starszych wersjach Pillow
+except ImportError:  # Bez wtyczki AVIF jest zapisywany tylko przez Pillow z wbudowaną obsługą
+    pillow_avif = None
+
+# Obrazy strony głównej (ścieżki względem katalogu static) i szerokości ich wariantów w pikselach;
+# warianty nie są powiększane, a największy ma szerokość oryginału
+RESPONSIVE_IMAGES = {
+    'images/header-bg.jpg': (640, 960, 1280, 1900),
+    'images/footer-bg.jpg': (640, 960, 1280, 1900),
+    'images/header-form-bg.jpg': (480, 973),
+    'images/about-us.jpg': (480, 768, 1000),
+}
+
+# Katalog wariantów (względem katalogu static aplikacji) i opisujący je plik
+RESPONSIVE_DIR = 'images/responsive'
+RESPONSIVE_MANIFEST = f'{RESPONSIVE_DIR}/variants.json'
+
+# Formaty wariantów w kolejności preferencji: (format Pillow, rozszerzenie, typ MIME, parametry zapisu)
+IMAGE_FORMATS = [
+    ('AVIF', 'avif', 'image/avif', {'quality': 55, 'speed': 6}),
+    ('WEBP', 'webp', 'image/webp', {'quality': 75, 'method': 6}),
+    ('JPEG', 'jpg', 'image/jpeg', {'quality': 80, 'optimize': True, 'progressive': True}),
+]
+
+
+def available_formats():
+    """
+    Zwraca formaty wariantów (z IMAGE_FORMATS), które zainstalowana wersja Pillow potrafi zapisać.
+    """
+    Image.init()
+    return [image_format for image_format in IMAGE_FORMATS if image_format[0] in Image.SAVE]
+
+
+def variant_name(name, width, extension):
+    """
+    Zwraca ścieżkę wariantu obrazu (względem katalogu static), np. images/responsive/header-bg-640.webp.
+    """
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return f'{RESPONSIVE_DIR}/{stem}-{width}.{extension}'
+
+
+def build_variants(source_dir, force=False):
+    """
+    Zapisuje w katalogu source_dir/RESPONSIVE_DIR warianty obrazów z RESPONSIVE_IMAGES w każdej szerokości
+    i każdym dostępnym formacie oraz plik RESPONSIVE_MANIFEST z ich opisem. Warianty nowsze od oryginału
+    są pomijane (chyba że force=True). Zwraca listę par: ścieżka wariantu, rozmiar w bajtach.
+    """
+    formats = available_formats()
+    manifest, written = {}, []
+    os.makedirs(os.path.join(source_dir, RESPONSIVE_DIR), exist_ok=True)
+    for name, steps in RESPONSIVE_IMAGES.items():
+        source = os.path.join(source_dir, name)
+        with Image.open(source) as original:
+            original = original.convert('RGB')
+        widths = sorted({min(width, original.width) for width in steps} | {original.width})
+        manifest[name] = {
+            'width': original.width,
+            'height': original.height,
+            'widths': widths,
+            'formats': [(extension, mime_type) for _, extension, mime_type, _ in formats],
+        }
+        for width in widths:
+            resized = None
+            for image_format, extension, _, save_options in formats:
+                target = os.path.join(source_dir, variant_name(name, width, extension))
+                if not force and os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+                    continue
+                if resized is None:
+                    height = round(original.height * width / original.width)
+                    resized = original if width == original.width else original.resize((width, height),
+                                                                                       Image.LANCZOS)
+                resized.save(target, image_format, **save_options)
+                written.append((variant_name(name, width, extension), os.path.getsize(target)))
+
+    with open(os.path.join(source_dir, RESPONSIVE_MANIFEST), 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    load_manifest.cache_clear()
+    return written
+
+
+@lru_cache(maxsize=None)
+def load_manifest():
+    """
+    Zwraca opis wariantów obrazów (wczytywany raz na proces) lub pusty słownik, jeśli warianty
+    nie zostały wygenerowane poleceniem build_images.
+    """
+    path = finders.find(RESPONSIVE_MANIFEST)
+    if not path:
+        return {}
+    with open(path) as file:
+        return json.load(file)
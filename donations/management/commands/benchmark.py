@@ -0,0 +1,98 @@
+import json
+import platform
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from donations.benchmark import (DEFAULT_TOLERANCE, benchmark_donation, build_scenarios, compare, dataset_summary,
+                                 run_scenario)
+from donations.management.commands.populate_db import SCALES
+from donations.models import Donation
+
+
+class Command(BaseCommand):
+    help = ('Mierzy czasy odpowiedzi (p50/p95/p99), liczbę zapytań i szczytowe zużycie pamięci widoków '
+            'i list panelu administracyjnego, zapisuje wyniki do JSON i porównuje je z wynikami bazowymi')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES,
+                            help='Przed pomiarem wypełnia bazę danymi tej wielkości (USUWA istniejące dane)')
+        parser.add_argument('--donations', type=int,
+                            help='Przed pomiarem wypełnia bazę podaną liczbą darowizn (USUWA istniejące dane)')
+        parser.add_argument('--iterations', type=int, default=30, help='Liczba mierzonych żądań na scenariusz')
+        parser.add_argument('--warmup', type=int, default=3, help='Liczba niemierzonych żądań rozgrzewających')
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Uruchom tylko wskazany scenariusz (opcję można powtórzyć)')
+        parser.add_argument('--output', default='benchmark-results.json', help='Plik wyników JSON')
+        parser.add_argument('--baseline', help='Plik JSON z wynikami bazowymi do porównania')
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help='Dopuszczalny względny wzrost p95 i pamięci względem wyników bazowych')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('Liczba iteracji musi być dodatnia, a liczba żądań rozgrzewających nieujemna.')
+
+        if hasattr(staticfiles_storage, 'hashed_files') and not staticfiles_storage.hashed_files:
+            raise CommandError('Brak manifestu plików statycznych - uruchom najpierw collectstatic.')
+
+        if options['scale'] or options['donations']:
+            call_command('populate_db', scale=options['scale'], donations=options['donations'], seed=0,
+                         stdout=self.stdout)  # Stałe ziarno - powtarzalne dane
+
+        # Pomiar w konfiguracji zbliżonej do produkcyjnej: bez DEBUG (zapisywania zapytań) i z hostem klienta testowego
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            try:
+                scenarios = build_scenarios()
+            except ValueError as e:
+                raise CommandError(e)
+            if options['scenarios']:
+                unknown = set(options['scenarios']) - {scenario.name for scenario in scenarios}
+                if unknown:
+                    raise CommandError(f'Nieznane scenariusze: {", ".join(sorted(unknown))}')
+                scenarios = [scenario for scenario in scenarios if scenario.name in options['scenarios']]
+
+            last_donation_id = Donation.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            toggled = benchmark_donation()  # Scenariusz user_profile_toggle zmienia jej is_taken_by_user
+            results = {}
+            try:
+                for scenario in scenarios:
+                    results[scenario.name] = run_scenario(scenario, options['iterations'], options['warmup'])
+                    result = results[scenario.name]
+                    self.stdout.write(f"{scenario.name:<28} p50 {result['p50_ms']:>9.2f} ms  "
+                                      f"p95 {result['p95_ms']:>9.2f} ms  p99 {result['p99_ms']:>9.2f} ms  "
+                                      f"{result['queries']:>3} zapytań  {result['peak_memory_kb']:>9.1f} KiB")
+            finally:
+                Donation.objects.filter(id__gt=last_donation_id).delete()  # Darowizny dodane przez scenariusze POST
+                if toggled is not None:  # Przywrócenie stanu sprzed nieparzystej liczby przełączeń
+                    Donation.objects.filter(pk=toggled.pk).update(is_taken_by_user=toggled.is_taken_by_user,
+                                                                  updated_at=toggled.updated_at)
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'cache': settings.CACHES['default']['BACKEND'],
+            },
+            'dataset': dataset_summary(),
+            'scenarios': results,
+        }
+        Path(options['output']).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        self.stdout.write(f"Zapisano wyniki do {options['output']}.")
+
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())
+            regressions = compare(results, baseline['scenarios'], options['tolerance'])
+            if regressions:
+                raise CommandError('Wykryto regresje względem wyników bazowych:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('Brak regresji względem wyników bazowych.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Benchmark zakończony.'))
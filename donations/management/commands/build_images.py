@@ -0,0 +1,26 @@
+import os
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from donations.images import available_formats, build_variants
+
+
+class Command(BaseCommand):
+    help = ('Generuje warianty obrazów strony głównej o kilku szerokościach w formatach AVIF (jeśli Pillow go '
+            'obsługuje), WebP i JPEG; uruchamiane przed collectstatic')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Wygeneruj ponownie także warianty nowsze od oryginałów')
+
+    def handle(self, *args, **options):
+        formats = [image_format for image_format, *_ in available_formats()]
+        if 'AVIF' not in formats:
+            self.stdout.write(self.style.WARNING('Pillow nie obsługuje formatu AVIF - pomijam warianty AVIF '
+                                                 '(zainstaluj pillow-avif-plugin lub Pillow >= 11.2).'))
+        source_dir = os.path.join(apps.get_app_config('donations').path, 'static')
+        written = build_variants(source_dir, force=options['force'])
+        for name, size in written:
+            self.stdout.write(f'{name}: {size / 1024:.1f} KB')
+        self.stdout.write(self.style.SUCCESS(f'Zapisano {len(written)} wariantów obrazów ({", ".join(formats)}).'))
@@ -1,11 +1,23 @@
+import csv
+import io
 import os
 import random
 import uuid
-from django.core.management.base import BaseCommand
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import connection, transaction
 from django.utils import timezone
 from faker import Faker
-from donations.models import Category, Institution, Donation, EmailVerificationToken, PasswordResetToken, ContactMessage
+from donations import seeding
+from donations.cache import invalidate_page_cache
+from donations.catalog import invalidate_catalog
+from donations.models import (Category, Institution, Donation, EmailVerificationToken, PasswordResetToken,
+                              ContactMessage, ProblemReport, PlatformStats)
 
 # Konfiguracja ustawień Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'charity_platform.settings')
@@ -25,90 +37,244 @@ NUM_DONATIONS_PER_USER = 50
 NUM_CONTACT_MESSAGES = 200
 CATEGORIES = ['Odzież', 'Żywność', 'Zabawki', 'Książki', 'Sprzęt AGD']
 
+# Gotowe rozmiary danych (liczba darowizn) dla opcji --scale
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+}
+
+# Domyślna liczba wierszy generowanych i zapisywanych w jednej partii
+CHUNK_SIZE = 10_000
+
 
 class Command(BaseCommand):
     help = 'Populate the database with sample data'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES,
+                            help='Gotowy rozmiar danych (liczba darowizn): ' + ', '.join(SCALES))
+        parser.add_argument('--donations', type=int,
+                            help=f'Liczba darowizn (domyślnie {NUM_USERS * NUM_DONATIONS_PER_USER})')
+        parser.add_argument('--users', type=int,
+                            help=f'Liczba użytkowników (domyślnie liczba darowizn / {NUM_DONATIONS_PER_USER})')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Liczba wierszy generowanych i zapisywanych w jednej partii')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Liczba procesów generujących dane (1 - bez puli procesów)')
+        parser.add_argument('--no-copy', action='store_true',
+                            help='Nie używaj COPY na PostgreSQL, zapisuj dane przez bulk_create')
+        parser.add_argument('--seed', type=int, help='Ziarno generatora danych (powtarzalne dane)')
+
+    def handle(self, *args, **options):
+        num_donations = options['donations']
+        if num_donations is None:
+            num_donations = SCALES[options['scale']] if options['scale'] else NUM_USERS * NUM_DONATIONS_PER_USER
+        num_users = options['users'] or max(NUM_USERS, num_donations // NUM_DONATIONS_PER_USER)
+        if num_donations < 0 or num_users < 1 or options['chunk_size'] < 1 or options['workers'] < 1:
+            raise CommandError('Liczby darowizn, użytkowników, partii i procesów muszą być dodatnie.')
+
+        self.chunk_size = options['chunk_size']
+        self.use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+        self.rng = random.Random(options['seed'])
+        if options['seed'] is not None:
+            fake.seed_instance(options['seed'])
+
         self.stdout.write('Usuwanie starych danych...')
-        models = [Donation, Institution, Category, User, EmailVerificationToken, PasswordResetToken, ContactMessage]
-        for model in models:
-            model.objects.all().delete()
+        self.truncate()
 
         # Tworzenie kategorii
         self.stdout.write('Tworzenie kategorii...')
-        category_instances = [Category.objects.create(name=name) for name in CATEGORIES]
+        category_instances = Category.objects.bulk_create([Category(name=name) for name in CATEGORIES])
 
         # Tworzenie instytucji
         self.stdout.write('Tworzenie instytucji...')
-        institutions = []
-        for _ in range(NUM_INSTITUTIONS):
-            institution = Institution.objects.create(
-                name=fake.company(),
+        institutions = Institution.objects.bulk_create([
+            Institution(
+                name=fake.unique.company(),
                 description=fake.text(),
-                type=random.choice([Institution.FOUNDATION, Institution.NGO, Institution.LOCAL_COLLECTION]),
-                created_at=timezone.now()
+                type=self.rng.choice([Institution.FOUNDATION, Institution.NGO, Institution.LOCAL_COLLECTION]),
             )
-            institution.categories.set(random.sample(category_instances, random.randint(1, len(category_instances))))
-            institutions.append(institution)
-
-        # Tworzenie użytkowników i darowizn
-        self.stdout.write('Tworzenie użytkowników i darowizn...')
-        users = []
-        for i in range(NUM_USERS):
-            email = fake.email()
-            first_name = fake.first_name()
-            last_name = fake.last_name()
-            user = User.objects.create_user(username=email, email=email, password=PASSWORD)
-            user.first_name = first_name
-            user.last_name = last_name
-            user.is_superuser = i < NUM_SUPERUSERS  # Pierwszych NUM_SUPERUSERS użytkowników będzie superużytkownikami
-            user.is_staff = True if i < NUM_SUPERUSERS else False  # Pierwszych NUM_SUPERUSERS użytkowników będzie także pracownikami
-            user.save()
-            users.append(user)
-
-            for _ in range(NUM_DONATIONS_PER_USER):
-                phone_number = '+48' + fake.msisdn()[2:11]  # Polski numer telefonu zaczynający się od +48
-
-                donation = Donation.objects.create(
-                    quantity=random.randint(1, 10),
-                    institution=random.choice(institutions),
-                    address=fake.address(),
-                    phone_number=phone_number,
-                    city=fake.city(),
-                    zip_code=fake.zipcode(),
-                    pick_up_date=fake.date_this_year(),
-                    pick_up_time=fake.time(),
-                    pick_up_comment=fake.sentence(),
-                    user=user,
-                    is_taken_by_user=random.choice([True, False]),
-                    is_taken_by_courier=random.choice([True, False]),
-                    courier=random.choice(users) if random.choice([True, False]) else None,
-                    status=random.choice([status for status, _ in Donation.STATUS_CHOICES]),
-                    created_at=timezone.now(),
-                    updated_at=timezone.now()
-                )
-                donation.categories.set(random.sample(category_instances, random.randint(1, len(category_instances))))
+            for _ in range(NUM_INSTITUTIONS)
+        ])
+        Institution.categories.through.objects.bulk_create([
+            Institution.categories.through(institution_id=institution.id, category_id=category.id)
+            for institution in institutions
+            for category in self.rng.sample(category_instances, self.rng.randint(1, len(category_instances)))
+        ])
+
+        # Tworzenie użytkowników
+        self.stdout.write(f'Tworzenie {num_users} użytkowników...')
+        user_ids = self.create_users(num_users)
+
+        # Tworzenie darowizn
+        self.stdout.write(f'Tworzenie {num_donations} darowizn...')
+        self.create_donations(num_donations, institutions, category_instances, user_ids, options['workers'])
 
         # Tworzenie tokenów weryfikacji email
         self.stdout.write('Tworzenie tokenów weryfikacji email...')
-        for user in users:
-            EmailVerificationToken.objects.create(user=user, token=uuid.uuid4(), created_at=timezone.now())
+        for chunk in self.chunks(user_ids):
+            EmailVerificationToken.objects.bulk_create(
+                [EmailVerificationToken(user_id=user_id, token=uuid.uuid4()) for user_id in chunk])
 
         # Tworzenie tokenów resetowania hasła
         self.stdout.write('Tworzenie tokenów resetowania hasła...')
-        for user in users:
-            PasswordResetToken.objects.create(user=user, token=uuid.uuid4(), created_at=timezone.now())
+        for chunk in self.chunks(user_ids):
+            PasswordResetToken.objects.bulk_create(
+                [PasswordResetToken(user_id=user_id, token=uuid.uuid4()) for user_id in chunk])
 
         # Tworzenie wiadomości kontaktowych
         self.stdout.write('Tworzenie wiadomości kontaktowych...')
-        for _ in range(NUM_CONTACT_MESSAGES):
-            ContactMessage.objects.create(
+        ContactMessage.objects.bulk_create([
+            ContactMessage(
                 name=fake.first_name(),
                 surname=fake.last_name(),
                 email=fake.email(),
                 message=fake.text(),
-                created_at=timezone.now()
             )
+            for _ in range(NUM_CONTACT_MESSAGES)
+        ])
+
+        # Zapis hurtowy pomija sygnały - dane pochodne przeliczane są raz, na końcu
+        self.stdout.write('Przeliczanie statystyk i unieważnianie cache...')
+        self.finalize()
 
         self.stdout.write(self.style.SUCCESS('Pomyślnie wypełniono bazę danych.'))
+
+    def truncate(self):
+        """
+        Czyści tabele danych przykładowych jednym poleceniem TRUNCATE ... CASCADE (na PostgreSQL) zamiast
+        usuwania wierszy przez ORM, które wczytuje i kasuje kaskadowo każdy obiekt osobno.
+        """
+        models = [
+            Donation.categories.through, Donation, Institution.categories.through, Institution, Category,
+            EmailVerificationToken, PasswordResetToken, ContactMessage, ProblemReport, LogEntry,
+            User.groups.through, User.user_permissions.through, User,
+        ]
+        sql_list = connection.ops.sql_flush(no_style(), [model._meta.db_table for model in models],
+                                            reset_sequences=True, allow_cascade=True)
+        connection.ops.execute_sql_flush(sql_list)
+
+    def chunks(self, items):
+        """
+        Dzieli listę na partie po chunk_size elementów.
+        """
+        for start in range(0, len(items), self.chunk_size):
+            yield items[start:start + self.chunk_size]
+
+    def create_users(self, num_users):
+        """
+        Tworzy użytkowników partiami; hasło haszowane jest raz i współdzielone przez wszystkich użytkowników.
+        Pierwszych NUM_SUPERUSERS użytkowników jest superużytkownikami i pracownikami.
+        """
+        password = make_password(PASSWORD)
+        for start in range(0, num_users, self.chunk_size):
+            users = []
+            for i in range(start, min(start + self.chunk_size, num_users)):
+                local_part, domain = fake.email().split('@')
+                email = f'{local_part}{i}@{domain}'  # Numer użytkownika gwarantuje unikalność nazwy
+                users.append(User(
+                    username=email,
+                    email=email,
+                    password=password,
+                    first_name=fake.first_name(),
+                    last_name=fake.last_name(),
+                    is_superuser=i < NUM_SUPERUSERS,
+                    is_staff=i < NUM_SUPERUSERS,
+                ))
+            User.objects.bulk_create(users)
+        return list(User.objects.order_by('id').values_list('id', flat=True))
+
+    def create_donations(self, num_donations, institutions, categories, user_ids, workers):
+        """
+        Generuje darowizny partiami (w puli procesów, jeśli workers > 1) i zapisuje je razem z wierszami
+        tabeli kategorii darowizn. Dokument wyszukiwania budowany jest od razu, bo zapis hurtowy pomija save().
+        """
+        institution_names = {institution.id: institution.name for institution in institutions}
+        category_names = {category.id: category.name for category in categories}
+        worker_args = (list(institution_names), list(category_names), user_ids,
+                       [status for status, _ in Donation.STATUS_CHOICES])
+        now = timezone.now()
+        tasks = ((self.rng.getrandbits(32), first_id, min(self.chunk_size, num_donations - first_id + 1), now)
+                 for first_id in range(1, num_donations + 1, self.chunk_size))
+
+        fields = seeding.DONATION_FIELDS + ['search_document']
+        institution_index, address_index, city_index = (fields.index('institution_id'), fields.index('address'),
+                                                        fields.index('city'))
+        created = 0
+        for chunk in self.generate(tasks, workers, worker_args):
+            donation_rows, category_rows = [], []
+            for row, donation_category_ids in chunk:
+                donation_rows.append(row + (Donation.build_search_document(
+                    institution_names[row[institution_index]], sorted(category_names[category_id]
+                                                      for category_id in donation_category_ids),
+                    row[address_index], row[city_index]),))
+                category_rows.extend((row[0], category_id) for category_id in donation_category_ids)
+
+            with transaction.atomic():
+                self.insert_rows(Donation, fields, donation_rows)
+                self.insert_rows(Donation.categories.through, ['donation_id', 'category_id'], category_rows)
+            created += len(donation_rows)
+            self.stdout.write(f'  {created}/{num_donations}')
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Donation]):
+                cursor.execute(sql)  # Identyfikatory nadane jawnie - sekwencja ustawiana na ostatni z nich
+
+    def generate(self, tasks, workers, worker_args):
+        """
+        Zwraca kolejne wygenerowane partie darowizn. Przy workers > 1 partie generowane są równolegle w puli
+        procesów, a liczba partii oczekujących na zapis jest ograniczona, aby nie przechowywać ich w pamięci.
+        """
+        if workers == 1:
+            seeding.init_worker(*worker_args)
+            for task in tasks:
+                yield seeding.generate_donations(*task)
+            return
+
+        with ProcessPoolExecutor(workers, initializer=seeding.init_worker, initargs=worker_args) as executor:
+            pending = deque()
+            for task in tasks:
+                pending.append(executor.submit(seeding.generate_donations, *task))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def insert_rows(self, model, fields, rows):
+        """
+        Zapisuje wiersze (krotki wartości w kolejności fields) do tabeli modelu: na PostgreSQL poleceniem COPY,
+        na pozostałych bazach przez bulk_create.
+        """
+        if not rows:
+            return
+        if not self.use_copy:
+            model.objects.bulk_create([model(**dict(zip(fields, row))) for row in rows], batch_size=self.chunk_size)
+            return
+
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([['\\N' if value is None else value for value in row] for row in rows])
+        columns = ', '.join(connection.ops.quote_name(model._meta.get_field(field).column) for field in fields)
+        sql = (f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) "
+               f"FROM STDIN WITH (FORMAT csv, NULL '\\N')")
+        with connection.cursor() as cursor:
+            if hasattr(cursor.cursor, 'copy_expert'):  # psycopg2
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def finalize(self):
+        """
+        Przelicza statystyki platformy, unieważnia cache stron i katalogu oraz (na PostgreSQL) odświeża
+        statystyki planisty zapytań dla zapełnionych tabel.
+        """
+        PlatformStats.rebuild()
+        invalidate_catalog()
+        invalidate_page_cache()
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for model in [Donation, Donation.categories.through, Institution, User]:
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
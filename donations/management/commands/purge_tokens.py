@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from donations.models import EmailVerificationToken, PasswordResetToken
+
+
+class Command(BaseCommand):
+    help = ('Usuwa wygasłe tokeny weryfikacji email i resetowania hasła małymi partiami, każdą w osobnej '
+            'transakcji, aby nie blokować tabel tokenów na długo')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Liczba tokenów usuwanych w jednej transakcji')
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Przerwa (w sekundach) pomiędzy kolejnymi partiami')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['sleep'] < 0:
+            raise CommandError('Rozmiar partii musi być dodatni, a przerwa nieujemna.')
+
+        now = timezone.now()
+        for model in (EmailVerificationToken, PasswordResetToken):
+            deleted = 0
+            while True:
+                with transaction.atomic():
+                    # Identyfikatory partii wybierane indeksem po expires_at, usuwane jednym DELETE ... WHERE id IN
+                    ids = list(model.objects.filter(expires_at__lte=now).order_by('expires_at')
+                               .values_list('id', flat=True)[:options['batch_size']])
+                    if ids:
+                        model.objects.filter(id__in=ids).delete()
+                deleted += len(ids)
+                if len(ids) < options['batch_size']:
+                    break
+                time.sleep(options['sleep'])
+            self.stdout.write(f'{model._meta.verbose_name_plural}: usunięto {deleted} wygasłych tokenów.')
+        self.stdout.write(self.style.SUCCESS('Zakończono usuwanie wygasłych tokenów.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from donations.models import PlatformStats
+
+
+class Command(BaseCommand):
+    help = 'Przelicza od zera statystyki platformy wyświetlane na stronie głównej'
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            stats = PlatformStats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Przeliczono statystyki: {stats.total_bags} worków, {stats.supported_institutions} organizacji.'))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from donations.models import SearchRefreshJob
+from donations.search import REFRESH_CHUNK_SIZE, queue_search_refresh, run_search_refresh_job
+
+
+class Command(BaseCommand):
+    help = ('Przebudowuje dokumenty wyszukiwania darowizn zlecone po zmianie nazwy instytucji lub kategorii, '
+            'partiami zatwierdzanymi osobno, aby nie blokować tabeli darowizn na długo')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Zleć przebudowę dokumentów wyszukiwania wszystkich darowizn')
+        parser.add_argument('--chunk-size', type=int, default=REFRESH_CHUNK_SIZE,
+                            help='Liczba darowizn przebudowywanych w jednej partii')
+        parser.add_argument('--loop', action='store_true',
+                            help='Działa w pętli, sprawdzając kolejkę zadań co --interval sekund')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Odstęp (w sekundach) pomiędzy sprawdzeniami pustej kolejki w trybie --loop')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('Rozmiar partii musi być dodatni.')
+        if options['all']:
+            queue_search_refresh()
+
+        while True:
+            job = SearchRefreshJob.objects.select_related('institution', 'category').first()
+            if job:
+                refreshed = run_search_refresh_job(job, options['chunk_size'])
+                self.stdout.write(f'{job}: przebudowano {refreshed} dokumentów.')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Brak oczekujących przebudów wyszukiwania.'))
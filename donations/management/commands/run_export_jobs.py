@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from donations.export_jobs import claim_job, run_job
+from donations.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = 'Wykonuje zlecone w panelu administracyjnym eksporty danych i zapisuje pliki w magazynie mediów'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Liczba procesów eksportujących równolegle zakresy wierszy (CSV i JSON Lines)')
+        parser.add_argument('--loop', action='store_true',
+                            help='Działa w pętli, sprawdzając kolejkę zadań co --interval sekund')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Odstęp (w sekundach) pomiędzy sprawdzeniami pustej kolejki w trybie --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_job()
+            if job:
+                job = run_job(job, workers=options['workers'])
+                if job.status == ExportJob.DONE:
+                    self.stdout.write(f'Eksport #{job.id}: zapisano {job.rows} wierszy do {job.file.name}.')
+                else:
+                    self.stderr.write(f'Eksport #{job.id} nie powiódł się: {job.error}')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Brak oczekujących eksportów.'))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from donations.outbox import claim_batch, send_batch
+
+
+class Command(BaseCommand):
+    help = 'Wysyła wiadomości ze skrzynki nadawczej przez jedno, utrzymywane połączenie SMTP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Liczba wiadomości pobieranych do wysłania w jednej partii')
+        parser.add_argument('--loop', action='store_true',
+                            help='Działa w pętli, sprawdzając skrzynkę co --interval sekund')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Odstęp (w sekundach) pomiędzy sprawdzeniami pustej skrzynki w trybie --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            batch = claim_batch(options['batch_size'])
+            if batch:
+                sent, failed = send_batch(batch)
+                self.stdout.write(f'Wysłano {sent} wiadomości, nieudanych prób: {failed}.')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Skrzynka nadawcza została opróżniona.'))
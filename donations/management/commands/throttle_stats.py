@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from donations.throttle import throttle_stats
+
+
+class Command(BaseCommand):
+    help = 'Wyświetla liczniki dozwolonych i odrzuconych prób logowania i rejestracji dla każdego ogranicznika'
+
+    def handle(self, *args, **options):
+        for scope, counters in throttle_stats().items():
+            limit, window = settings.THROTTLE_RATES[scope]
+            self.stdout.write(f"{scope:<16} limit {limit}/{window} s  dozwolone {counters['allowed']:>8}  "
+                              f"odrzucone {counters['rejected']:>8}")
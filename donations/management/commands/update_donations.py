@@ -0,0 +1,69 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from donations.bulk import BULK_BATCH_SIZE, STATUS_TRANSITIONS, assign_courier, set_taken_by_courier, transition_status
+from donations.models import Donation
+
+
+class Command(BaseCommand):
+    help = ('Zbiorczo zmienia status, kuriera i oznaczenie "zabrane przez kuriera" darowizn wybranych filtrami, '
+            'jednym zapytaniem UPDATE na partię wierszy (np. wydanie kurierom odbiorów z danego dnia)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--id', type=int, action='append', dest='ids',
+                            help='Identyfikator darowizny (opcję można powtórzyć)')
+        parser.add_argument('--pick-up-date', type=date.fromisoformat, help='Data odbioru (RRRR-MM-DD)')
+        parser.add_argument('--institution', type=int, help='Identyfikator instytucji')
+        parser.add_argument('--city', help='Miasto odbioru')
+        parser.add_argument('--status', choices=STATUS_TRANSITIONS, help='Nowy status darowizn')
+        courier = parser.add_mutually_exclusive_group()
+        courier.add_argument('--courier', help='Nazwa użytkownika kuriera do przypisania')
+        courier.add_argument('--unassign-courier', action='store_true', help='Usuń przypisanie kuriera')
+        taken = parser.add_mutually_exclusive_group()
+        taken.add_argument('--taken-by-courier', action='store_true', dest='taken_by_courier', default=None,
+                           help='Oznacz jako zabrane przez kuriera')
+        taken.add_argument('--not-taken-by-courier', action='store_false', dest='taken_by_courier',
+                           help='Oznacz jako niezabrane przez kuriera')
+        parser.add_argument('--batch-size', type=int, default=BULK_BATCH_SIZE,
+                            help='Liczba darowizn zmienianych jednym zapytaniem UPDATE (w jednej transakcji)')
+
+    def handle(self, *args, **options):
+        filters = {
+            'id__in': options['ids'],
+            'pick_up_date': options['pick_up_date'],
+            'institution_id': options['institution'],
+            'city__iexact': options['city'],
+        }
+        filters = {lookup: value for lookup, value in filters.items() if value is not None}
+        if not filters:
+            raise CommandError('Podaj co najmniej jeden filtr darowizn (--id, --pick-up-date, --institution, --city).')
+        if not (options['status'] or options['courier'] or options['unassign_courier']
+                or options['taken_by_courier'] is not None):
+            raise CommandError('Podaj zmianę: --status, --courier, --unassign-courier lub --(not-)taken-by-courier.')
+        if options['batch_size'] < 1:
+            raise CommandError('Rozmiar partii musi być dodatni.')
+
+        courier = None
+        if options['courier']:
+            courier = User.objects.filter(username=options['courier']).first()
+            if courier is None:
+                raise CommandError(f"Nie znaleziono kuriera {options['courier']}.")
+
+        queryset = Donation.objects.filter(**filters)
+        batch_size = options['batch_size']
+        # Każda partia zatwierdzana jest osobno, więc blokady wierszy nie są trzymane do końca polecenia.
+        # Kolejność: przypisanie kuriera, odbiór przez kuriera, a na końcu status (np. realizacja odebranych)
+        if options['courier'] or options['unassign_courier']:
+            updated = assign_courier(queryset, courier, batch_size)
+            self.stdout.write(f"Kurier {courier or '(brak)'}: zmieniono {updated} darowizn.")
+        if options['taken_by_courier'] is not None:
+            updated = set_taken_by_courier(queryset, options['taken_by_courier'], batch_size)
+            self.stdout.write(f"Zabrane przez kuriera = {options['taken_by_courier']}: "
+                              f"zmieniono {updated} darowizn.")
+        if options['status']:
+            updated = transition_status(queryset, options['status'], batch_size)
+            self.stdout.write(f"Status {options['status']}: zmieniono {updated} darowizn "
+                              f"(dozwolone z: {', '.join(STATUS_TRANSITIONS[options['status']])}).")
+        self.stdout.write(self.style.SUCCESS('Zakończono zbiorczą zmianę darowizn.'))
@@ -0,0 +1,95 @@
+import logging
+import re
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('donations.queries')
+
+# Wyrażenia normalizujące zapytania SQL do ich "kształtu" (bez konkretnych wartości parametrów)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?|#)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Wyjątek zgłaszany, gdy widok przekroczy budżet zapytań lub wykona powtarzające się zapytania (N+1).
+    """
+
+
+def fingerprint_sql(sql):
+    """
+    Zwraca znormalizowany kształt zapytania SQL, w którym wartości literałów i listy IN są zastąpione znacznikami.
+    """
+    sql = _STRING_RE.sub('#', sql)
+    sql = _NUMBER_RE.sub('#', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+class QueryCounter:
+    """
+    Funkcja opakowująca wykonywanie zapytań (execute_wrapper), zliczająca zapytania i ich kształty.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        self.fingerprints[fingerprint_sql(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold):
+        """
+        Zwraca kształty zapytań wykonanych co najmniej threshold razy (podejrzenie wzorca N+1).
+        """
+        return {sql: count for sql, count in self.fingerprints.items() if count >= threshold}
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware zliczający zapytania do bazy danych w trakcie żądania, wykrywający wzorce N+1
+    i egzekwujący budżet zapytań zdefiniowany dla widoków w ustawieniu QUERY_BUDGETS.
+    Włączany ustawieniem QUERY_BUDGET_ENABLED; wyniki dodawane są do nagłówków odpowiedzi.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        budget = settings.QUERY_BUDGETS.get(view_name, settings.QUERY_BUDGET_DEFAULT)
+        repeated = counter.repeated(settings.QUERY_BUDGET_N_PLUS_ONE_THRESHOLD)
+
+        response.headers['X-Query-Count'] = str(counter.count)
+        if budget is not None:
+            response.headers['X-Query-Budget'] = str(budget)
+        if repeated:
+            response.headers['X-Query-N-Plus-One'] = str(len(repeated))
+
+        problems = []
+        if budget is not None and counter.count > budget:
+            problems.append(f'{view_name}: {counter.count} zapytań przy budżecie {budget}')
+        for sql, count in repeated.items():
+            problems.append(f'{view_name}: zapytanie powtórzone {count} razy (N+1): {sql[:300]}')
+
+        for problem in problems:
+            logger.warning(problem)
+        if problems and settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded('\n'.join(problems))
+        return response
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:37
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def build_platform_stats(apps, schema_editor):
+    PlatformStats = apps.get_model('donations', 'PlatformStats')
+    Donation = apps.get_model('donations', 'Donation')
+    Institution = apps.get_model('donations', 'Institution')
+    PlatformStats.objects.update_or_create(
+        pk=1,
+        defaults={
+            'total_bags': Donation.objects.aggregate(total=Sum('quantity'))['total'] or 0,
+            'supported_institutions': Institution.objects.count(),
+        },
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0012_problemreport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_bags', models.BigIntegerField(default=0, verbose_name='Oddanych worków')),
+                ('supported_institutions', models.BigIntegerField(default=0, verbose_name='Wspartych organizacji')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Zaktualizowano')),
+            ],
+            options={
+                'verbose_name': 'Statystyki platformy',
+                'verbose_name_plural': 'Statystyki platformy',
+            },
+        ),
+        migrations.RunPython(build_platform_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0013_platformstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Temat')),
+                ('body', models.TextField(verbose_name='Treść')),
+                ('html_body', models.TextField(blank=True, verbose_name='Treść HTML')),
+                ('from_email', models.CharField(max_length=255, verbose_name='Nadawca')),
+                ('recipients', models.JSONField(default=list, verbose_name='Odbiorcy')),
+                ('status', models.CharField(choices=[('pending', 'Oczekująca'), ('sending', 'W trakcie wysyłki'), ('sent', 'Wysłana'), ('failed', 'Błąd wysyłki')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Liczba prób')),
+                ('last_error', models.TextField(blank=True, verbose_name='Ostatni błąd')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Następna próba')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True, verbose_name='Pobrano do wysyłki')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Utworzono')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Wysłano')),
+            ],
+            options={
+                'verbose_name': 'Wiadomość w skrzynce nadawczej',
+                'verbose_name_plural': 'Skrzynka nadawcza',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='donations_o_status_f9e6f2_idx')],
+            },
+        ),
+    ]
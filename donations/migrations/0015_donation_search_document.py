@@ -0,0 +1,61 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+from donations.models import Donation as CurrentDonation
+
+
+def build_search_documents(apps, schema_editor):
+    Donation = apps.get_model('donations', 'Donation')
+    Through = Donation.categories.through
+    chunk_size = 1000
+    last_id = 0
+    while True:
+        rows = list(Donation.objects.filter(id__gt=last_id).order_by('id').values_list(
+            'id', 'institution__name', 'address', 'city')[:chunk_size])
+        if not rows:
+            break
+        ids = [row[0] for row in rows]
+        category_names = {}
+        for donation_id, name in Through.objects.filter(donation_id__in=ids).values_list('donation_id', 'category__name'):
+            category_names.setdefault(donation_id, []).append(name)
+        Donation.objects.bulk_update([
+            # Ten sam format dokumentu (pola oddzielone SEARCH_DOCUMENT_SEPARATOR) co przy zapisie darowizny
+            Donation(id=donation_id, search_document=CurrentDonation.build_search_document(
+                institution_name, sorted(category_names.get(donation_id, [])), address, city))
+            for donation_id, institution_name, address, city in rows
+        ], ['search_document'])
+        last_id = ids[-1]
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return  # Na SQLite (bazy testowe) wyszukiwanie działa bez indeksu trigramowego
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS donations_donation_search_trgm '
+        'ON donations_donation USING gin (search_document gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS donations_donation_search_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0014_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donation',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Dokument wyszukiwania'),
+        ),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
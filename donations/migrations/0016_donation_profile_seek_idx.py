@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0015_donation_search_document'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['user', 'is_taken_by_user', 'pick_up_date', 'pick_up_time', 'id'], name='donation_profile_seek_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0016_donation_profile_seek_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='donation',
+            constraint=models.CheckConstraint(check=models.Q(('quantity__gte', 1)), name='donation_quantity_gte_1'),
+        ),
+        migrations.AddConstraint(
+            model_name='donation',
+            constraint=models.CheckConstraint(check=models.Q(('status__in', ['pending', 'in_progress', 'completed'])), name='donation_status_valid'),
+        ),
+        migrations.AddConstraint(
+            model_name='donation',
+            constraint=models.CheckConstraint(check=models.Q(('phone_number__regex', '^\\+?1?\\d{9,15}$')), name='donation_phone_number_format'),
+        ),
+    ]
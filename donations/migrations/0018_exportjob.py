@@ -0,0 +1,40 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0017_donation_check_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100, verbose_name='Model')),
+                ('export_format', models.CharField(choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines'), ('xlsx', 'XLSX')], max_length=10, verbose_name='Format')),
+                ('query_string', models.TextField(blank=True, verbose_name='Parametry listy')),
+                ('selected_ids', models.JSONField(blank=True, null=True, verbose_name='Zaznaczone obiekty')),
+                ('status', models.CharField(choices=[('pending', 'Oczekujące'), ('running', 'W trakcie'), ('done', 'Gotowe'), ('failed', 'Błąd')], default='pending', max_length=20, verbose_name='Status')),
+                ('file', models.FileField(blank=True, upload_to='exports/', verbose_name='Plik')),
+                ('rows', models.BigIntegerField(default=0, verbose_name='Liczba wierszy')),
+                ('error', models.TextField(blank=True, verbose_name='Błąd')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Zlecono')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Rozpoczęto')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Zakończono')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Zlecający')),
+            ],
+            options={
+                'verbose_name': 'Eksport danych',
+                'verbose_name_plural': 'Eksporty danych',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='donations_e_status_f7e340_idx')],
+            },
+        ),
+    ]
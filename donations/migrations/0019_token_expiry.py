@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:04
+
+import donations.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0018_exportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailverificationtoken',
+            name='expires_at',
+            field=models.DateTimeField(default=donations.models.email_verification_expiry, verbose_name='Wygasa'),
+        ),
+        migrations.AddField(
+            model_name='passwordresettoken',
+            name='expires_at',
+            field=models.DateTimeField(default=donations.models.password_reset_expiry, verbose_name='Wygasa'),
+        ),
+        migrations.AddIndex(
+            model_name='emailverificationtoken',
+            index=models.Index(fields=['expires_at'], name='verification_token_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresettoken',
+            index=models.Index(fields=['user', 'token', 'expires_at'], name='reset_token_lookup_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresettoken',
+            index=models.Index(fields=['expires_at'], name='reset_token_expiry_idx'),
+        ),
+    ]
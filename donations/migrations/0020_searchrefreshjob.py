@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0019_token_expiry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchRefreshJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Zlecono')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='donations.category', verbose_name='Kategoria')),
+                ('institution', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='donations.institution', verbose_name='Instytucja')),
+            ],
+            options={
+                'verbose_name': 'Przebudowa wyszukiwania',
+                'verbose_name_plural': 'Przebudowy wyszukiwania',
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:32
+
+from django.db import migrations, models
+
+
+def copy_started_at(apps, schema_editor):
+    # Eksporty wykonywane w chwili migracji - sygnał życia liczony od rozpoczęcia
+    ExportJob = apps.get_model('donations', 'ExportJob')
+    ExportJob.objects.filter(status='running').update(heartbeat_at=models.F('started_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0020_searchrefreshjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Sygnał życia'),
+        ),
+        migrations.RunPython(copy_started_at, migrations.RunPython.noop),
+    ]
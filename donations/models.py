@@ -1,9 +1,10 @@
 import uuid
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, RegexValidator
-from django.core.exceptions import ValidationError
-import re
+from django.utils import timezone
 
 
 class Category(models.Model):
@@ -63,6 +64,14 @@ class Institution(models.Model):
         return self.name  # "Zwraca nazwę instytucji jako reprezentację obiektu"
 
 
+# Dozwolony format numeru telefonu darczyńcy
+PHONE_NUMBER_REGEX = r'^\+?1?\d{9,15}$'
+
+# Separator pól dokumentu wyszukiwania (znak kontrolny, którego nie zawiera fraza wyszukiwania),
+# dzięki któremu fraza nie jest dopasowywana na granicy dwóch pól (np. miasta i adresu)
+SEARCH_DOCUMENT_SEPARATOR = '\x1f'
+
+
 class Donation(models.Model):
     """
     Model reprezentujący darowiznę.
@@ -100,7 +109,7 @@ class Donation(models.Model):
     address = models.CharField(max_length=255, verbose_name="Adres")  # "Pole dla adresu, maksymalna długość 255 znaków"
     phone_number = models.CharField(
         max_length=15,
-        validators=[RegexValidator(regex=r'^\+?1?\d{9,15}$',
+        validators=[RegexValidator(regex=PHONE_NUMBER_REGEX,
                                    message="Podaj prawidłowy numer telefonu w formacie: '+999999999'. Do 15 cyfr.")],
         verbose_name="Numer telefonu"
     )  # "Pole dla numeru telefonu, maksymalna długość 15 znaków, z walidacją formatu"
@@ -126,33 +135,59 @@ class Donation(models.Model):
                                       verbose_name="Utworzono")  # "Pole dla daty utworzenia, automatycznie ustawiane przy tworzeniu"
     updated_at = models.DateTimeField(auto_now=True,
                                       verbose_name="Zaktualizowano")  # "Pole dla daty aktualizacji, automatycznie ustawiane przy każdej aktualizacji"
+    search_document = models.TextField(blank=True, default='', editable=False,
+                                       verbose_name="Dokument wyszukiwania")  # "Pole z połączonym tekstem do wyszukiwania (nazwa instytucji, kategorie, adres, miasto)"
+
+    # Pola, których zmiana wymaga przebudowania dokumentu wyszukiwania
+    SEARCH_DOCUMENT_FIELDS = {'institution', 'address', 'city'}
 
     class Meta:
         verbose_name = "Darowizna"  # "Pojedyncza darowizna"
         verbose_name_plural = "Darowizny"  # "Wiele darowizn"
         ordering = ['pick_up_date', 'pick_up_time']  # "Sortowanie darowizn według daty i czasu odbioru"
+        constraints = [
+            models.CheckConstraint(check=models.Q(quantity__gte=1),
+                                   name='donation_quantity_gte_1'),  # "Ilość worków musi być co najmniej 1"
+            models.CheckConstraint(check=models.Q(status__in=['pending', 'in_progress', 'completed']),
+                                   name='donation_status_valid'),  # "Status musi być jedną z dozwolonych wartości"
+            models.CheckConstraint(check=models.Q(phone_number__regex=PHONE_NUMBER_REGEX),
+                                   name='donation_phone_number_format'),  # "Numer telefonu w formacie '+999999999'"
+        ]
         indexes = [
             models.Index(fields=['pick_up_date', 'pick_up_time']),  # "Indeks na pola data i czas odbioru"
+            models.Index(fields=['user', 'is_taken_by_user', 'pick_up_date', 'pick_up_time', 'id'],
+                         name='donation_profile_seek_idx'),  # "Indeks dla paginacji kursorowej w profilu użytkownika"
         ]
 
     def __str__(self):
         return f"Darowizna {self.quantity} worków od {self.user} do {self.institution}"  # "Reprezentacja darowizny jako ilość worków od użytkownika do instytucji"
 
-    def clean(self):
+    def save(self, *args, **kwargs):
         """
-        Metoda czyszcząca model, sprawdza poprawność numeru telefonu.
+        Metoda zapisu modelu. Waliduje (i konwertuje) tylko zapisywane pola; niezmienniki modelu (format numeru
+        telefonu, ilość worków, poprawny status, klucze obce) pilnowane są przez ograniczenia bazy danych,
+        dzięki czemu save(), bulk_create() i update() działają według tych samych reguł.
+        Aktualizuje też dokument wyszukiwania, jeśli zmieniają się pola, z których jest budowany.
         """
-        if self.phone_number and not re.match(r'^\+?1?\d{9,15}$', self.phone_number):
-            raise ValidationError(
-                {
-                    "phone_number": "Podaj prawidłowy numer telefonu w formacie: '+999999999'. Do 15 cyfr."})  # "Walidacja numeru telefonu"
+        update_fields = kwargs.get('update_fields')
+        written = {field.name for field in self._meta.concrete_fields} if update_fields is None else set(update_fields)
+        self.clean_fields(exclude=[field.name for field in self._meta.concrete_fields
+                                   if field.name not in written or field.is_relation])  # "Walidacja zapisywanych pól"
+        if update_fields is None or self.SEARCH_DOCUMENT_FIELDS & set(update_fields):
+            category_names = list(self.categories.values_list('name', flat=True)) if self.pk else []
+            self.search_document = self.build_search_document(
+                self.institution.name, category_names, self.address, self.city)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'search_document'}
+        super().save(*args, **kwargs)  # "Wywołanie metody zapisu z klasy bazowej"
 
-    def save(self, *args, **kwargs):
+    @staticmethod
+    def build_search_document(institution_name, category_names, address, city):
         """
-        Metoda zapisu modelu, wykonuje pełną walidację przed zapisaniem.
+        Buduje znormalizowany (małe litery) dokument wyszukiwania darowizny z polami oddzielonymi
+        SEARCH_DOCUMENT_SEPARATOR.
         """
-        self.full_clean()  # "Walidacja przed zapisaniem"
-        super().save(*args, **kwargs)  # "Wywołanie metody zapisu z klasy bazowej"
+        return SEARCH_DOCUMENT_SEPARATOR.join(filter(None, [institution_name, *category_names, address, city])).lower()
 
     def get_status_display(self):
         """
@@ -162,6 +197,85 @@ class Donation(models.Model):
         return status_dict.get(self.status, self.status)  # "Metoda zwracająca przetłumaczony status darowizny"
 
 
+class PlatformStats(models.Model):
+    """
+    Model przechowujący zagregowane statystyki platformy wyświetlane na stronie głównej.
+    Tabela zawiera jeden wiersz (singleton), aktualizowany atomowo przez sygnały przy każdej
+    zmianie darowizn i instytucji, dzięki czemu strona główna nie agreguje całej tabeli darowizn.
+
+    Atrybuty:
+        total_bags (int): Łączna liczba przekazanych worków.
+        supported_institutions (int): Liczba wspieranych instytucji.
+        updated_at (datetime): Data ostatniej aktualizacji statystyk.
+    """
+    SINGLETON_ID = 1
+
+    total_bags = models.BigIntegerField(default=0,
+                                        verbose_name="Oddanych worków")  # "Pole dla łącznej liczby worków"
+    supported_institutions = models.BigIntegerField(default=0,
+                                                    verbose_name="Wspartych organizacji")  # "Pole dla liczby instytucji"
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name="Zaktualizowano")  # "Pole dla daty ostatniej aktualizacji statystyk"
+
+    class Meta:
+        verbose_name = "Statystyki platformy"  # "Pojedynczy wiersz statystyk"
+        verbose_name_plural = "Statystyki platformy"  # "Wiele wierszy statystyk"
+
+    def __str__(self):
+        return f"Statystyki: {self.total_bags} worków, {self.supported_institutions} organizacji"
+
+    @classmethod
+    def load(cls):
+        """
+        Zwraca wiersz statystyk, odbudowując go od zera, jeśli jeszcze nie istnieje.
+        """
+        stats = cls.objects.filter(pk=cls.SINGLETON_ID).first()
+        return stats if stats is not None else cls.rebuild()
+
+    @classmethod
+    def increment(cls, total_bags=0, supported_institutions=0):
+        """
+        Atomowo zmienia liczniki o podane wartości za pomocą pojedynczego zapytania UPDATE.
+        """
+        if not total_bags and not supported_institutions:
+            return
+        updated = cls.objects.filter(pk=cls.SINGLETON_ID).update(
+            total_bags=models.F('total_bags') + total_bags,
+            supported_institutions=models.F('supported_institutions') + supported_institutions,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            cls.rebuild()  # "Brak wiersza - liczniki budowane od zera uwzględniają już bieżącą zmianę"
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Przelicza statystyki od zera na podstawie tabel darowizn i instytucji.
+        """
+        stats, _ = cls.objects.update_or_create(
+            pk=cls.SINGLETON_ID,
+            defaults={
+                'total_bags': Donation.objects.aggregate(total=models.Sum('quantity'))['total'] or 0,
+                'supported_institutions': Institution.objects.count(),
+            },
+        )
+        return stats
+
+
+def email_verification_expiry():
+    """
+    Zwraca czas wygaśnięcia nowego tokenu weryfikacji email (EMAIL_VERIFICATION_TIMEOUT sekund od teraz).
+    """
+    return timezone.now() + timedelta(seconds=settings.EMAIL_VERIFICATION_TIMEOUT)
+
+
+def password_reset_expiry():
+    """
+    Zwraca czas wygaśnięcia nowego tokenu resetowania hasła (PASSWORD_RESET_TIMEOUT sekund od teraz).
+    """
+    return timezone.now() + timedelta(seconds=settings.PASSWORD_RESET_TIMEOUT)
+
+
 class EmailVerificationToken(models.Model):
     """
     Model reprezentujący token weryfikacji email.
@@ -170,6 +284,7 @@ class EmailVerificationToken(models.Model):
         user (User): Użytkownik powiązany z tym tokenem.
         token (UUID): Unikalny token weryfikacyjny.
         created_at (datetime): Data utworzenia tokenu.
+        expires_at (datetime): Data wygaśnięcia tokenu.
     """
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='verification_token',
                                 verbose_name="Użytkownik")  # "Pole klucza jednego do jednego dla użytkownika"
@@ -177,6 +292,8 @@ class EmailVerificationToken(models.Model):
                              verbose_name="Token")  # "Pole dla tokenu UUID, automatycznie generowany"
     created_at = models.DateTimeField(auto_now_add=True,
                                       verbose_name="Utworzono")  # "Pole dla daty utworzenia, automatycznie ustawiane przy tworzeniu"
+    expires_at = models.DateTimeField(default=email_verification_expiry,
+                                      verbose_name="Wygasa")  # "Pole dla daty wygaśnięcia tokenu"
 
     def __str__(self):
         return f"{self.user.email} - {self.token}"  # "Reprezentacja tokenu jako email użytkownika i token"
@@ -184,6 +301,10 @@ class EmailVerificationToken(models.Model):
     class Meta:
         verbose_name = "Token weryfikacji email"  # "Pojedynczy token weryfikacji email"
         verbose_name_plural = "Tokeny weryfikacji email"  # "Wiele tokenów weryfikacji email"
+        indexes = [
+            models.Index(fields=['expires_at'],
+                         name='verification_token_expiry_idx'),  # "Indeks dla usuwania wygasłych tokenów"
+        ]
 
 
 class PasswordResetToken(models.Model):
@@ -194,6 +315,7 @@ class PasswordResetToken(models.Model):
         user (User): Użytkownik powiązany z tym tokenem.
         token (UUID): Unikalny token do resetowania hasła.
         created_at (datetime): Data utworzenia tokenu.
+        expires_at (datetime): Data wygaśnięcia tokenu.
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE,
                              verbose_name="Użytkownik")  # "Pole klucza obcego dla użytkownika"
@@ -201,6 +323,8 @@ class PasswordResetToken(models.Model):
                              verbose_name="Token")  # "Pole dla unikalnego tokenu UUID, automatycznie generowany"
     created_at = models.DateTimeField(auto_now_add=True,
                                       verbose_name="Utworzono")  # "Pole dla daty utworzenia, automatycznie ustawiane przy tworzeniu"
+    expires_at = models.DateTimeField(default=password_reset_expiry,
+                                      verbose_name="Wygasa")  # "Pole dla daty wygaśnięcia tokenu"
 
     def __str__(self):
         return f"Token resetowania hasła dla {self.user.email}"  # "Reprezentacja tokenu jako token resetowania hasła dla email użytkownika"
@@ -208,6 +332,12 @@ class PasswordResetToken(models.Model):
     class Meta:
         verbose_name = "Token resetowania hasła"  # "Pojedynczy token resetowania hasła"
         verbose_name_plural = "Tokeny resetowania hasła"  # "Wiele tokenów resetowania hasła"
+        indexes = [
+            models.Index(fields=['user', 'token', 'expires_at'],
+                         name='reset_token_lookup_idx'),  # "Indeks dla wyszukiwania tokenu użytkownika"
+            models.Index(fields=['expires_at'],
+                         name='reset_token_expiry_idx'),  # "Indeks dla usuwania wygasłych tokenów"
+        ]
 
 
 class ContactMessage(models.Model):
@@ -265,3 +395,164 @@ class ProblemReport(models.Model):
 
     def __str__(self):
         return f"Zgłoszenie od {self.user.username} - {self.get_topic_display()}"
+
+
+class OutgoingEmail(models.Model):
+    """
+    Model reprezentujący wiadomość email oczekującą w skrzynce nadawczej na wysłanie przez polecenie send_outbox.
+
+    Atrybuty:
+        subject (str): Temat wiadomości.
+        body (str): Treść wiadomości w formacie tekstowym.
+        html_body (str): Treść wiadomości w formacie HTML (opcjonalna).
+        from_email (str): Adres nadawcy.
+        recipients (list): Lista adresów odbiorców.
+        status (str): Stan dostarczenia wiadomości.
+        attempts (int): Liczba wykonanych prób wysłania.
+        last_error (str): Treść ostatniego błędu wysyłki.
+        next_attempt_at (datetime): Najwcześniejszy czas kolejnej próby wysłania.
+        claimed_at (datetime): Czas pobrania wiadomości do wysłania przez workera.
+        created_at (datetime): Data utworzenia wiadomości.
+        sent_at (datetime): Data wysłania wiadomości.
+    """
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Oczekująca'),  # "Opcja statusu: Oczekująca"
+        (SENDING, 'W trakcie wysyłki'),  # "Opcja statusu: W trakcie wysyłki"
+        (SENT, 'Wysłana'),  # "Opcja statusu: Wysłana"
+        (FAILED, 'Błąd wysyłki'),  # "Opcja statusu: Błąd wysyłki"
+    ]
+
+    subject = models.CharField(max_length=255, verbose_name="Temat")  # "Pole dla tematu wiadomości"
+    body = models.TextField(verbose_name="Treść")  # "Pole dla treści tekstowej wiadomości"
+    html_body = models.TextField(blank=True, verbose_name="Treść HTML")  # "Pole dla treści HTML wiadomości"
+    from_email = models.CharField(max_length=255, verbose_name="Nadawca")  # "Pole dla adresu nadawcy"
+    recipients = models.JSONField(default=list, verbose_name="Odbiorcy")  # "Pole dla listy adresów odbiorców"
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING,
+                              verbose_name="Status")  # "Pole dla stanu dostarczenia wiadomości"
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Liczba prób")  # "Pole dla liczby prób wysłania"
+    last_error = models.TextField(blank=True, verbose_name="Ostatni błąd")  # "Pole dla treści ostatniego błędu"
+    next_attempt_at = models.DateTimeField(default=timezone.now,
+                                           verbose_name="Następna próba")  # "Pole dla czasu kolejnej próby"
+    claimed_at = models.DateTimeField(null=True, blank=True,
+                                      verbose_name="Pobrano do wysyłki")  # "Pole dla czasu pobrania przez workera"
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name="Utworzono")  # "Pole dla daty utworzenia wiadomości"
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Wysłano")  # "Pole dla daty wysłania"
+
+    class Meta:
+        verbose_name = "Wiadomość w skrzynce nadawczej"  # "Pojedyncza wiadomość w skrzynce nadawczej"
+        verbose_name_plural = "Skrzynka nadawcza"  # "Wiele wiadomości w skrzynce nadawczej"
+        ordering = ['-created_at']  # "Sortowanie wiadomości według daty utworzenia, od najnowszej"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),  # "Indeks dla pobierania wiadomości do wysłania"
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.get_status_display()})"
+
+
+class ExportJob(models.Model):
+    """
+    Model reprezentujący zadanie eksportu danych z panelu administracyjnego wykonywane w tle
+    przez polecenie run_export_jobs.
+
+    Atrybuty:
+        model_label (str): Etykieta eksportowanego modelu (np. 'donations.donation').
+        export_format (str): Format pliku eksportu (csv, jsonl, xlsx).
+        query_string (str): Parametry listy zmian (filtry, wyszukiwanie) w chwili zlecenia eksportu.
+        selected_ids (list): Identyfikatory zaznaczonych obiektów lub None, gdy eksportowane są wszystkie
+            obiekty pasujące do filtrów.
+        status (str): Stan zadania.
+        created_by (User): Użytkownik zlecający eksport.
+        file (File): Wygenerowany plik eksportu.
+        rows (int): Liczba wyeksportowanych wierszy.
+        error (str): Treść błędu, jeśli eksport się nie powiódł.
+        created_at (datetime): Data zlecenia eksportu.
+        started_at (datetime): Data rozpoczęcia eksportu.
+        heartbeat_at (datetime): Data ostatniego sygnału życia workera wykonującego eksport.
+        finished_at (datetime): Data zakończenia eksportu.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Oczekujące'),  # "Opcja statusu: Oczekujące"
+        (RUNNING, 'W trakcie'),  # "Opcja statusu: W trakcie"
+        (DONE, 'Gotowe'),  # "Opcja statusu: Gotowe"
+        (FAILED, 'Błąd'),  # "Opcja statusu: Błąd"
+    ]
+
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+        ('xlsx', 'XLSX'),
+    ]
+
+    model_label = models.CharField(max_length=100, verbose_name="Model")  # "Pole dla etykiety eksportowanego modelu"
+    export_format = models.CharField(max_length=10, choices=FORMAT_CHOICES,
+                                     verbose_name="Format")  # "Pole dla formatu pliku eksportu"
+    query_string = models.TextField(blank=True,
+                                    verbose_name="Parametry listy")  # "Pole dla filtrów i wyszukiwania listy zmian"
+    selected_ids = models.JSONField(null=True, blank=True,
+                                    verbose_name="Zaznaczone obiekty")  # "Pole dla identyfikatorów zaznaczonych obiektów"
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING,
+                              verbose_name="Status")  # "Pole dla stanu zadania"
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs',
+                                   verbose_name="Zlecający")  # "Pole klucza obcego dla użytkownika zlecającego eksport"
+    file = models.FileField(upload_to='exports/', blank=True, verbose_name="Plik")  # "Pole dla pliku eksportu"
+    rows = models.BigIntegerField(default=0, verbose_name="Liczba wierszy")  # "Pole dla liczby wyeksportowanych wierszy"
+    error = models.TextField(blank=True, verbose_name="Błąd")  # "Pole dla treści błędu eksportu"
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name="Zlecono")  # "Pole dla daty zlecenia eksportu"
+    started_at = models.DateTimeField(null=True, blank=True,
+                                      verbose_name="Rozpoczęto")  # "Pole dla daty rozpoczęcia eksportu"
+    heartbeat_at = models.DateTimeField(null=True, blank=True,
+                                        verbose_name="Sygnał życia")  # "Pole dla daty ostatniego sygnału życia workera"
+    finished_at = models.DateTimeField(null=True, blank=True,
+                                       verbose_name="Zakończono")  # "Pole dla daty zakończenia eksportu"
+
+    class Meta:
+        verbose_name = "Eksport danych"  # "Pojedyncze zadanie eksportu"
+        verbose_name_plural = "Eksporty danych"  # "Wiele zadań eksportu"
+        ordering = ['-created_at']  # "Sortowanie zadań według daty zlecenia, od najnowszego"
+        indexes = [
+            models.Index(fields=['status', 'created_at']),  # "Indeks dla pobierania oczekujących zadań"
+        ]
+
+    def __str__(self):
+        return f"Eksport {self.model_label} ({self.export_format}) - {self.get_status_display()}"
+
+
+class SearchRefreshJob(models.Model):
+    """
+    Model reprezentujący zadanie przebudowy dokumentów wyszukiwania darowizn po zmianie nazwy instytucji
+    lub kategorii, wykonywane w tle przez polecenie refresh_search_documents (partiami, bez blokowania
+    tabeli darowizn w transakcji zapisu w panelu administracyjnym).
+
+    Atrybuty:
+        institution (Institution): Instytucja, której darowizny należy przebudować.
+        category (Category): Kategoria, której darowizny należy przebudować.
+            Bez instytucji i kategorii przebudowywane są wszystkie darowizny.
+        created_at (datetime): Data zlecenia przebudowy.
+    """
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE, null=True, blank=True,
+                                    verbose_name="Instytucja")  # "Pole klucza obcego dla instytucji o zmienionej nazwie"
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True,
+                                 verbose_name="Kategoria")  # "Pole klucza obcego dla kategorii o zmienionej nazwie"
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name="Zlecono")  # "Pole dla daty zlecenia przebudowy"
+
+    class Meta:
+        verbose_name = "Przebudowa wyszukiwania"  # "Pojedyncze zadanie przebudowy"
+        verbose_name_plural = "Przebudowy wyszukiwania"  # "Wiele zadań przebudowy"
+        ordering = ['created_at', 'id']  # "Sortowanie zadań według kolejności zlecenia"
+
+    def __str__(self):
+        return f"Przebudowa wyszukiwania: {self.institution or self.category or 'wszystkie darowizny'}"
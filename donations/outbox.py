@@ -0,0 +1,131 @@
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from .models import OutgoingEmail
+
+# Maksymalna liczba prób wysłania wiadomości przed oznaczeniem jej jako błędnej
+MAX_ATTEMPTS = 5
+
+# Czas, po którym wiadomość pobrana przez worker, który przestał działać, może zostać pobrana ponownie
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Bazowe opóźnienie kolejnej próby wysłania wiadomości (podwajane przy każdej nieudanej próbie)
+RETRY_BACKOFF = timedelta(minutes=1)
+
+# Błędy połączenia, po których warto od razu ponowić wysyłkę przez nowe połączenie
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+def queue_email(subject, body, recipients, html_body='', from_email=None):
+    """
+    Zapisuje wiadomość w skrzynce nadawczej. Wywołana wewnątrz transakcji żądania zapisuje wiadomość
+    tylko wtedy, gdy zapisane zostaną również pozostałe dane (np. użytkownik i jego token).
+    """
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Pobiera do wysłania partię oczekujących wiadomości i oznacza je jako wysyłane.
+    Na PostgreSQL wiersze blokowane są z SKIP LOCKED, dzięki czemu kilka workerów nie pobierze tych samych wiadomości.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=OutgoingEmail.PENDING, next_attempt_at__lte=now) |
+                Q(status=OutgoingEmail.SENDING, claimed_at__lt=now - CLAIM_TIMEOUT)
+            )
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        OutgoingEmail.objects.filter(id__in=ids).update(status=OutgoingEmail.SENDING, claimed_at=now)
+    return list(OutgoingEmail.objects.filter(id__in=ids).order_by('id'))
+
+
+def _build_message(outgoing, connection):
+    """
+    Tworzy wiadomość Django na podstawie wiersza skrzynki nadawczej.
+    """
+    message = EmailMultiAlternatives(outgoing.subject, outgoing.body, outgoing.from_email, outgoing.recipients,
+                                     connection=connection)
+    if outgoing.html_body:
+        message.attach_alternative(outgoing.html_body, "text/html")
+    return message
+
+
+def _send_with_retry(message, connection):
+    """
+    Wysyła wiadomość, ponawiając próbę z nowym połączeniem po przejściowych błędach połączenia.
+    """
+    def reconnect(retry_state):
+        connection.close()
+        connection.open()
+
+    for attempt in Retrying(retry=retry_if_exception_type(TRANSIENT_ERRORS), stop=stop_after_attempt(3),
+                            wait=wait_exponential(multiplier=0.5, max=5), before_sleep=reconnect, reraise=True):
+        with attempt:
+            message.send()
+
+
+def _record_result(outgoing, error=None):
+    """
+    Zapisuje wynik próby wysłania wiadomości; po błędzie planuje kolejną próbę z wykładniczym opóźnieniem.
+    """
+    outgoing.attempts += 1
+    if error is None:
+        outgoing.status = OutgoingEmail.SENT
+        outgoing.sent_at = timezone.now()
+        outgoing.last_error = ''
+    else:
+        outgoing.last_error = f"{type(error).__name__}: {error}"
+        if outgoing.attempts >= MAX_ATTEMPTS:
+            outgoing.status = OutgoingEmail.FAILED
+        else:
+            outgoing.status = OutgoingEmail.PENDING
+            outgoing.next_attempt_at = timezone.now() + RETRY_BACKOFF * 2 ** (outgoing.attempts - 1)
+    outgoing.claimed_at = None
+    outgoing.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at', 'claimed_at', 'sent_at'])
+
+
+def send_batch(batch, connection=None):
+    """
+    Wysyła partię wiadomości przez jedno, utrzymywane połączenie i zapisuje stan dostarczenia każdej z nich.
+    Zwraca krotkę (liczba wysłanych, liczba nieudanych).
+    """
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        for outgoing in batch:
+            _record_result(outgoing, e)  # Serwer niedostępny - cała partia wraca do kolejki
+        return 0, len(batch)
+
+    sent = failed = 0
+    try:
+        for outgoing in batch:
+            try:
+                _send_with_retry(_build_message(outgoing, connection), connection)
+            except Exception as e:
+                failed += 1
+                _record_result(outgoing, e)
+            else:
+                sent += 1
+                _record_result(outgoing)
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,120 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(ValueError):
+    """
+    Wyjątek zgłaszany, gdy przekazany kursor paginacji jest uszkodzony.
+    """
+
+
+def encode_cursor(values):
+    """
+    Koduje wartości klucza sortowania ostatniego (lub pierwszego) wiersza strony jako nieprzezroczysty kursor.
+    """
+    data = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values],
+                      separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields, model):
+    """
+    Dekoduje kursor do listy wartości pól sortowania, konwertując je na typy pól modelu.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise InvalidCursor(cursor)
+        return [model._meta.get_field(field).to_python(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, ValidationError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def _seek_filter(fields, values, descending):
+    """
+    Buduje warunek (f1, f2, ..., fn) > (v1, v2, ..., vn) (lub < dla descending) jako sumę warunków Q.
+    """
+    lookup = 'lt' if descending else 'gt'
+    condition = Q()
+    for position, field in enumerate(fields):
+        equal = {f: v for f, v in zip(fields[:position], values[:position])}
+        condition |= Q(**equal, **{f'{field}__{lookup}': values[position]})
+    return condition
+
+
+def keyset_page(queryset, fields, per_page, after=None, before=None):
+    """
+    Zwraca stronę wyników paginacji kursorowej (seek) według pól fields (ostatnie pole musi być unikalne).
+    Zamiast COUNT i OFFSET wykonywane jest jedno zapytanie z warunkiem na wartości klucza sortowania.
+
+    Zwraca słownik: object_list, has_next, has_previous, next_cursor, previous_cursor.
+    """
+    model = queryset.model
+    if before:
+        values = decode_cursor(before, fields, model)
+        rows = list(queryset.filter(_seek_filter(fields, values, descending=True))
+                    .order_by(*[f'-{field}' for field in fields])[:per_page + 1])
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+    else:
+        if after:
+            values = decode_cursor(after, fields, model)
+            queryset = queryset.filter(_seek_filter(fields, values, descending=False))
+        rows = list(queryset.order_by(*fields)[:per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = bool(after)
+
+    def cursor_for(obj):
+        return encode_cursor([getattr(obj, field) for field in fields])
+
+    return {
+        'object_list': rows,
+        'has_next': has_next and bool(rows),
+        'has_previous': has_previous and bool(rows),
+        'next_cursor': cursor_for(rows[-1]) if rows else None,
+        'previous_cursor': cursor_for(rows[0]) if rows else None,
+    }
+
+
+def estimated_count(queryset, threshold):
+    """
+    Zwraca szacowaną przez planistę PostgreSQL liczbę wierszy querysetu albo None, gdy tabela ma mniej niż
+    threshold wierszy (według pg_class.reltuples) lub baza nie jest PostgreSQL - wtedy należy policzyć dokładnie.
+    Dla querysetu bez warunków zwracane jest reltuples, dla querysetu z filtrami - szacunek z EXPLAIN.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+        if row is None or row[0] < threshold:  # Przed pierwszym ANALYZE reltuples wynosi -1
+            return None
+        if not queryset.query.where:
+            return int(row[0])
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator dla dużych tabel, który zamiast dokładnego COUNT(*) używa szacunku planisty PostgreSQL,
+    gdy tabela przekracza ADMIN_ESTIMATED_COUNT_THRESHOLD wierszy.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list, settings.ADMIN_ESTIMATED_COUNT_THRESHOLD)
+        return estimate if estimate is not None else super().count
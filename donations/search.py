@@ -0,0 +1,76 @@
+from .models import SEARCH_DOCUMENT_SEPARATOR, Donation, SearchRefreshJob
+
+# Liczba darowizn przebudowywanych w jednej partii
+REFRESH_CHUNK_SIZE = 1000
+
+
+def refresh_search_documents(donations, chunk_size=REFRESH_CHUNK_SIZE):
+    """
+    Przebudowuje dokumenty wyszukiwania podanych darowizn partiami kolejnych kluczy głównych, bez wywoływania
+    Donation.save(). Każda partia kosztuje cztery zapytania niezależnie od liczby kategorii darowizn
+    i poza transakcją jest zatwierdzana osobno. Zwraca liczbę przebudowanych darowizn.
+    """
+    donations = donations.order_by()
+    refreshed, last = 0, None
+    while True:
+        chunk = donations if last is None else donations.filter(id__gt=last)
+        donation_ids = list(chunk.order_by('id').values_list('id', flat=True)[:chunk_size])
+        if not donation_ids:
+            break
+        _refresh_chunk(donation_ids)
+        refreshed += len(donation_ids)
+        if len(donation_ids) < chunk_size:
+            break
+        last = donation_ids[-1]
+    return refreshed
+
+
+def _refresh_chunk(donation_ids):
+    """
+    Przebudowuje dokumenty wyszukiwania jednej partii darowizn.
+    """
+    category_names = {}
+    for donation_id, name in Donation.categories.through.objects.filter(donation_id__in=donation_ids).values_list(
+            'donation_id', 'category__name'):
+        category_names.setdefault(donation_id, []).append(name)
+
+    rows = Donation.objects.filter(id__in=donation_ids).values_list('id', 'institution__name', 'address', 'city')
+    updated = [
+        Donation(id=donation_id, search_document=Donation.build_search_document(
+            institution_name, sorted(category_names.get(donation_id, [])), address, city))
+        for donation_id, institution_name, address, city in rows
+    ]
+    Donation.objects.bulk_update(updated, ['search_document'])
+
+
+def queue_search_refresh(institution=None, category=None):
+    """
+    Zleca przebudowę dokumentów wyszukiwania darowizn instytucji lub kategorii (bez obu - wszystkich darowizn)
+    poleceniu refresh_search_documents. Zadanie zapisywane jest w bieżącej transakcji, więc worker widzi je
+    dopiero po jej zatwierdzeniu, a wycofana zmiana nazwy nie zleca przebudowy.
+    """
+    return SearchRefreshJob.objects.create(institution=institution, category=category)
+
+
+def run_search_refresh_job(job, chunk_size=REFRESH_CHUNK_SIZE):
+    """
+    Przebudowuje dokumenty wyszukiwania darowizn objętych zadaniem i usuwa zadanie.
+    Zwraca liczbę przebudowanych darowizn.
+    """
+    donations = Donation.objects.all()
+    if job.institution_id:
+        donations = donations.filter(institution_id=job.institution_id)
+    if job.category_id:
+        donations = donations.filter(categories=job.category_id)
+    refreshed = refresh_search_documents(donations, chunk_size)
+    job.delete()
+    return refreshed
+
+
+def search_donations(queryset, query):
+    """
+    Filtruje darowizny po fragmencie tekstu w jednym polu dokumentu wyszukiwania (fraza nie może zawierać
+    separatora pól). Na PostgreSQL zapytanie LIKE korzysta z indeksu GIN (pg_trgm), na SQLite wykonywane jest
+    zwykłe LIKE.
+    """
+    return queryset.filter(search_document__contains=query.replace(SEARCH_DOCUMENT_SEPARATOR, '').lower())
@@ -0,0 +1,60 @@
+import random
+
+from faker import Faker
+
+# Kolejność pól w wierszach darowizn generowanych przez generate_donations
+DONATION_FIELDS = [
+    'id', 'quantity', 'institution_id', 'address', 'phone_number', 'city', 'zip_code', 'pick_up_date',
+    'pick_up_time', 'pick_up_comment', 'user_id', 'is_taken_by_user', 'is_taken_by_courier', 'courier_id',
+    'status', 'created_at', 'updated_at',
+]
+
+# Dane wspólne dla wszystkich partii, przekazywane raz do każdego procesu roboczego
+_context = {}
+
+
+def init_worker(institution_ids, category_ids, user_ids, statuses):
+    """
+    Inicjalizuje proces roboczy identyfikatorami instytucji, kategorii i użytkowników oraz listą statusów.
+    Moduł nie importuje modeli Django, dzięki czemu działa również w procesach uruchamianych metodą spawn.
+    """
+    _context.update(institution_ids=institution_ids, category_ids=category_ids, user_ids=user_ids,
+                    statuses=statuses)
+
+
+def generate_donations(seed, first_id, count, now):
+    """
+    Generuje partię count darowizn o kolejnych identyfikatorach od first_id.
+    Zwraca listę par (wiersz darowizny w kolejności DONATION_FIELDS, krotka identyfikatorów kategorii).
+    """
+    fake = Faker('pl_PL')
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    institution_ids = _context['institution_ids']
+    category_ids = _context['category_ids']
+    user_ids = _context['user_ids']
+    statuses = _context['statuses']
+
+    donations = []
+    for donation_id in range(first_id, first_id + count):
+        row = (
+            donation_id,
+            rng.randint(1, 10),
+            rng.choice(institution_ids),
+            fake.address(),
+            '+48' + fake.msisdn()[2:11],  # Polski numer telefonu zaczynający się od +48
+            fake.city(),
+            fake.zipcode(),
+            fake.date_this_year(),
+            fake.time_object(),
+            fake.sentence(),
+            rng.choice(user_ids),
+            rng.random() < 0.5,
+            rng.random() < 0.5,
+            rng.choice(user_ids) if rng.random() < 0.5 else None,
+            rng.choice(statuses),
+            now,
+            now,
+        )
+        donations.append((row, tuple(rng.sample(category_ids, rng.randint(1, len(category_ids))))))
+    return donations
@@ -0,0 +1,154 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .auth import invalidate_cached_user
+from .cache import invalidate_page_cache
+from .catalog import invalidate_catalog
+from .models import Category, Donation, Institution, PlatformStats
+from .search import queue_search_refresh, refresh_search_documents
+
+
+# Zapamiętanie ilości worków wczytanej z bazy danych
+@receiver(post_init, sender=Donation)
+def remember_donation_quantity(sender, instance, **kwargs):
+    """
+    Sygnał zapamiętujący ilość worków darowizny, aby przy zapisie wyliczyć różnicę dla statystyk.
+    """
+    instance._stats_quantity = instance.quantity if instance.pk else 0
+
+
+# Aktualizacja statystyk po zapisie darowizny
+@receiver(post_save, sender=Donation)
+def update_stats_on_donation_save(sender, instance, created, **kwargs):
+    """
+    Sygnał aktualizujący łączną liczbę worków o różnicę pomiędzy nową a poprzednią ilością.
+    """
+    quantity = int(instance.quantity or 0)
+    previous = 0 if created else int(getattr(instance, '_stats_quantity', 0) or 0)
+    if quantity != previous:
+        PlatformStats.increment(total_bags=quantity - previous)
+        transaction.on_commit(invalidate_page_cache)  # Zmiana łącznej liczby worków unieważnia strony publiczne
+    instance._stats_quantity = quantity
+
+
+# Aktualizacja statystyk po usunięciu darowizny
+@receiver(post_delete, sender=Donation)
+def update_stats_on_donation_delete(sender, instance, **kwargs):
+    """
+    Sygnał zmniejszający łączną liczbę worków po usunięciu darowizny.
+    """
+    PlatformStats.increment(total_bags=-int(getattr(instance, '_stats_quantity', 0) or 0))
+    transaction.on_commit(invalidate_page_cache)
+
+
+# Aktualizacja statystyk po utworzeniu instytucji
+@receiver(post_save, sender=Institution)
+def update_stats_on_institution_save(sender, instance, created, **kwargs):
+    """
+    Sygnał zwiększający liczbę wspieranych instytucji po utworzeniu nowej instytucji.
+    """
+    if created:
+        PlatformStats.increment(supported_institutions=1)
+    transaction.on_commit(invalidate_page_cache)  # Zmiana danych instytucji unieważnia strony publiczne
+    transaction.on_commit(invalidate_catalog)  # oraz katalog formularza darowizny
+
+
+# Aktualizacja statystyk po usunięciu instytucji
+@receiver(post_delete, sender=Institution)
+def update_stats_on_institution_delete(sender, instance, **kwargs):
+    """
+    Sygnał zmniejszający liczbę wspieranych instytucji po usunięciu instytucji.
+    """
+    PlatformStats.increment(supported_institutions=-1)
+    transaction.on_commit(invalidate_page_cache)
+    transaction.on_commit(invalidate_catalog)
+
+
+# Unieważnienie stron publicznych i katalogu po zmianie kategorii
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_on_category_change(sender, **kwargs):
+    """
+    Sygnał unieważniający zapisane strony publiczne oraz katalog formularza po zmianie lub usunięciu kategorii.
+    """
+    transaction.on_commit(invalidate_page_cache)
+    transaction.on_commit(invalidate_catalog)
+
+
+# Unieważnienie stron publicznych i katalogu po zmianie kategorii instytucji
+@receiver(m2m_changed, sender=Institution.categories.through)
+def invalidate_on_institution_categories_change(sender, action, **kwargs):
+    """
+    Sygnał unieważniający zapisane strony publiczne oraz katalog formularza po zmianie przypisania
+    kategorii do instytucji.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(invalidate_page_cache)
+        transaction.on_commit(invalidate_catalog)
+
+
+# Przebudowa dokumentu wyszukiwania po zmianie kategorii darowizny
+@receiver(m2m_changed, sender=Donation.categories.through)
+def refresh_search_document_on_categories_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Sygnał przebudowujący dokument wyszukiwania darowizn po zmianie przypisanych kategorii.
+    """
+    if reverse and action == 'pre_clear':
+        # Po wyczyszczeniu powiązań z poziomu kategorii nie będzie już wiadomo, których darowizn dotyczyły
+        instance._cleared_donation_ids = list(instance.donation_set.values_list('id', flat=True))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        refresh_search_documents(Donation.objects.filter(pk=instance.pk))
+    else:
+        donation_ids = pk_set if action != 'post_clear' else getattr(instance, '_cleared_donation_ids', [])
+        refresh_search_documents(Donation.objects.filter(pk__in=donation_ids))
+
+
+# Zapamiętanie nazw instytucji i kategorii wczytanych z bazy danych
+@receiver(post_init, sender=Institution)
+@receiver(post_init, sender=Category)
+def remember_name(sender, instance, **kwargs):
+    """
+    Sygnał zapamiętujący nazwę instytucji lub kategorii, aby wykryć jej zmianę przy zapisie.
+    """
+    instance._search_name = instance.name
+
+
+# Zlecenie przebudowy dokumentów wyszukiwania po zmianie nazwy instytucji
+@receiver(post_save, sender=Institution)
+def refresh_search_documents_on_institution_rename(sender, instance, created, **kwargs):
+    """
+    Sygnał zlecający przebudowę dokumentów wyszukiwania darowizn instytucji po zmianie jej nazwy
+    (wykonywaną partiami przez polecenie refresh_search_documents, poza transakcją zapisu).
+    """
+    if not created and instance.name != instance._search_name:
+        queue_search_refresh(institution=instance)
+    instance._search_name = instance.name
+
+
+# Zlecenie przebudowy dokumentów wyszukiwania po zmianie nazwy kategorii
+@receiver(post_save, sender=Category)
+def refresh_search_documents_on_category_rename(sender, instance, created, **kwargs):
+    """
+    Sygnał zlecający przebudowę dokumentów wyszukiwania darowizn danej kategorii po zmianie jej nazwy
+    (wykonywaną partiami przez polecenie refresh_search_documents, poza transakcją zapisu).
+    """
+    if not created and instance.name != instance._search_name:
+        queue_search_refresh(category=instance)
+    instance._search_name = instance.name
+
+
+# Unieważnienie obiektu użytkownika zapisanego w cache sesji
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user_on_change(sender, instance, **kwargs):
+    """
+    Sygnał usuwający z cache obiekt użytkownika po jego zapisie (w tym zmianie hasła, aktywności
+    lub uprawnień) i usunięciu. Usunięcie następuje po zatwierdzeniu transakcji, aby równoległe żądanie
+    nie zapisało w cache stanu sprzed zmiany.
+    """
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
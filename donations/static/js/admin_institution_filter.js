@@ -0,0 +1,44 @@
+// Filtr instytucji w panelu administracyjnym - podpowiedzi podczas pisania
+document.addEventListener("DOMContentLoaded", function() {
+    document.querySelectorAll('.institution-filter').forEach(container => {
+        const input = container.querySelector('.institution-filter-input');
+        const results = container.querySelector('.institution-filter-results');
+        let timeout = null;
+
+        // Budowanie adresu listy z wybraną instytucją (z zachowaniem pozostałych filtrów)
+        function filterUrl(institutionId) {
+            const params = new URLSearchParams(window.location.search);
+            params.set(container.dataset.param, institutionId);
+            params.delete('p'); // Powrót na pierwszą stronę wyników
+            return '?' + params.toString();
+        }
+
+        // Pobieranie instytucji o nazwie zaczynającej się od wpisanego tekstu
+        function search() {
+            const query = input.value.trim();
+            if (!query) {
+                results.innerHTML = '';
+                return;
+            }
+            fetch(container.dataset.url + '?' + new URLSearchParams({q: query}))
+                .then(response => response.json())
+                .then(data => {
+                    results.innerHTML = '';
+                    data.results.forEach(institution => {
+                        const item = document.createElement('li');
+                        const link = document.createElement('a');
+                        link.href = filterUrl(institution.id);
+                        link.textContent = institution.name;
+                        item.appendChild(link);
+                        results.appendChild(item);
+                    });
+                });
+        }
+
+        // Wyszukiwanie z opóźnieniem, aby nie wysyłać żądania po każdym znaku
+        input.addEventListener('input', () => {
+            clearTimeout(timeout);
+            timeout = setTimeout(search, 250);
+        });
+    });
+});
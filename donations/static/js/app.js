@@ -19,6 +19,7 @@ document.addEventListener("DOMContentLoaded", function() {
     init() {
       this.events();  // Ustawienie zdarzeń
       this.updateForm();  // Aktualizacja formularza
+      this.loadInstitutions(1);  // Pobranie pierwszej strony instytucji
     }
 
     // Ustawienie nasłuchiwania zdarzeń
@@ -54,6 +55,30 @@ document.addEventListener("DOMContentLoaded", function() {
           this.filterInstitutions();  // Filtrowanie instytucji
         });
       });
+
+      // Zdarzenia dla wyszukiwania instytucji po nazwie
+      const searchInput = this.$form.querySelector('.institution-search');
+      if (searchInput) {
+        let searchTimeout = null;
+        searchInput.addEventListener('input', () => {
+          clearTimeout(searchTimeout);
+          searchTimeout = setTimeout(() => this.filterInstitutions(), 250);  // Opóźnienie zapytań podczas pisania
+        });
+        searchInput.addEventListener('keydown', e => {
+          if (e.key === 'Enter') {
+            e.preventDefault();  // Enter w polu wyszukiwania nie wysyła formularza
+          }
+        });
+      }
+
+      // Zdarzenie dla przycisku "pokaż więcej" instytucji
+      const loadMoreButton = this.$form.querySelector('.load-more-institutions');
+      if (loadMoreButton) {
+        loadMoreButton.addEventListener('click', e => {
+          e.preventDefault();
+          this.loadInstitutions(this.institutionsPage + 1);  // Pobranie kolejnej strony instytucji
+        });
+      }
     }
 
     // Walidacja bieżącego kroku formularza
@@ -98,16 +123,89 @@ document.addEventListener("DOMContentLoaded", function() {
       }
     }
 
-    // Filtrowanie instytucji na podstawie zaznaczonych kategorii
+    // Filtrowanie instytucji na podstawie zaznaczonych kategorii i wpisanej nazwy
     filterInstitutions() {
-      const selectedCategories = [...document.querySelectorAll('.category-checkbox:checked')].map(cb => parseInt(cb.value));  // Pobieranie zaznaczonych kategorii
-      document.querySelectorAll('.institution').forEach(inst => {
-        const instCategories = inst.dataset.categories ? inst.dataset.categories.split(',').map(Number) : [];  // Pobieranie kategorii instytucji
-        const match = selectedCategories.every(cat => instCategories.includes(cat));  // Sprawdzanie dopasowania kategorii
-        inst.style.display = match ? 'block' : 'none';  // Wyświetlanie lub ukrywanie instytucji
+      this.loadInstitutions(1);  // Ponowne pobranie pierwszej strony instytucji
+    }
+
+    // Pobieranie strony instytucji z serwera (wyszukiwanie w indeksie kategorii)
+    loadInstitutions(page) {
+      const list = this.$form.querySelector('.institutions-list');  // Kontener listy instytucji
+      if (!list) {
+        return;
+      }
+      const params = new URLSearchParams();
+      document.querySelectorAll('.category-checkbox:checked').forEach(cb => params.append('categories', cb.value));  // Zaznaczone kategorie
+      const searchInput = this.$form.querySelector('.institution-search');
+      if (searchInput && searchInput.value.trim()) {
+        params.set('q', searchInput.value.trim());  // Prefiks nazwy instytucji
+      }
+      params.set('page', page);
+
+      const requestId = (this.institutionsRequestId || 0) + 1;  // Identyfikator żądania, aby zignorować nieaktualne odpowiedzi
+      this.institutionsRequestId = requestId;
+
+      fetch(`${list.dataset.url}?${params.toString()}`, {
+        headers: {
+          'X-Requested-With': 'XMLHttpRequest'  // Nagłówek do żądania AJAX
+        }
+      })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(response.statusText);
+        }
+        return response.json();
+      })
+      .then(data => {
+        if (requestId !== this.institutionsRequestId) {
+          return;
+        }
+        if (page === 1) {
+          list.innerHTML = '';  // Wyczyszczenie listy przy nowym wyszukiwaniu
+        }
+        data.results.forEach(institution => list.appendChild(this.renderInstitution(institution)));
+        this.institutionsPage = data.page;
+        const more = this.$form.querySelector('.institutions-more');
+        if (more) {
+          more.hidden = !data.has_next;  // Pokazywanie przycisku "pokaż więcej", jeśli są kolejne strony
+        }
+      })
+      .catch(error => {
+        console.error('Nie udało się pobrać listy organizacji:', error);  // Logowanie błędów
       });
     }
 
+    // Tworzenie elementu instytucji do wyboru w formularzu
+    renderInstitution(institution) {
+      const group = document.createElement('div');
+      group.className = 'form-group form-group--checkbox institution';
+      group.dataset.categories = institution.category_ids.join(',');
+
+      const label = document.createElement('label');
+      const radio = document.createElement('input');
+      radio.type = 'radio';
+      radio.name = 'organization';
+      radio.value = institution.id;
+      radio.required = true;
+
+      const checkbox = document.createElement('span');
+      checkbox.className = 'checkbox radio';
+
+      const description = document.createElement('span');
+      description.className = 'description';
+      const title = document.createElement('div');
+      title.className = 'title';
+      title.textContent = institution.name;
+      const subtitle = document.createElement('div');
+      subtitle.className = 'subtitle';
+      subtitle.textContent = institution.description;
+      description.append(title, subtitle);
+
+      label.append(radio, checkbox, description);
+      group.appendChild(label);
+      return group;
+    }
+
     // Pokazywanie podsumowania
     showSummary() {
       const selectedInstitutionElement = document.querySelector('input[name="organization"]:checked');  // Zaznaczona organizacja
@@ -50,13 +50,32 @@ document.addEventListener("DOMContentLoaded", function() {
     });
   });
 
-  // Dodanie zdarzeń 'click' dla linków paginacji
-  const paginationLinks = document.querySelectorAll('.pagination a');
-  paginationLinks.forEach(link => {
-    link.addEventListener('click', (event) => {
-      const url = new URL(event.target.href);  // Tworzenie nowego URL z href linku
-      url.searchParams.set('activeTab', activeTab);  // Dodawanie aktywnej zakładki do parametrów URL
-      event.target.href = url.toString();  // Ustawienie nowego href z dodaną aktywną zakładką
+  // Obsługa paginacji sekcji instytucji - pobieranie tylko wybranej sekcji zamiast całej strony
+  document.querySelectorAll('.help--slides').forEach(slide => {
+    slide.addEventListener('click', (event) => {
+      const link = event.target.closest('.pagination a');
+      if (!link) {
+        return;
+      }
+      event.preventDefault();  // Zatrzymanie domyślnego działania linku
+      fetch(link.href, {
+        headers: {
+          'X-Requested-With': 'XMLHttpRequest'  // Nagłówek do żądania AJAX
+        }
+      })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(response.statusText);
+        }
+        return response.text();
+      })
+      .then(html => {
+        const content = slide.querySelector('.help--slides-content');  // Bieżąca zawartość sekcji
+        content.outerHTML = html;  // Zastąpienie zawartości sekcji pobranym fragmentem
+      })
+      .catch(error => {
+        console.error('Nie udało się pobrać listy instytucji:', error);  // Logowanie błędów
+      });
     });
   });
 });
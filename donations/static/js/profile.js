@@ -54,34 +54,97 @@ function toggleArchive(donationId, userType) {
     });
 }
 
-// Funkcja do konfiguracji linków paginacji
+// Funkcja aktualizująca wiersz darowizny po zmianie oznaczenia "zabrane przez użytkownika"
+function updateDonationRow(donationId, isTakenByUser) {
+    const row = document.querySelector(`.donation-row[data-donation-id='${donationId}']`); // Znajdowanie wiersza darowizny
+    if (!row) {
+        return;
+    }
+    row.classList.toggle('archived', isTakenByUser); // Ustawienie klasy 'archived'
+    const buttonUser = row.querySelector('.btn-archive-user'); // Znajdowanie przycisku archiwizacji użytkownika
+    buttonUser.textContent = isTakenByUser ? 'Oznacz jako niezabrane' : 'Oznacz jako zabrane'; // Aktualizacja tekstu przycisku
+    const checkbox = row.querySelector('.donation-select');
+    if (checkbox) {
+        checkbox.checked = false; // Odznaczenie zaktualizowanej darowizny
+    }
+}
+
+// Funkcja do zbiorczego oznaczania zaznaczonych darowizn jednym żądaniem
+function bulkSetTaken(isTakenByUser) {
+    const donationIds = [...document.querySelectorAll('.donation-select:checked')].map(cb => parseInt(cb.value)); // Zaznaczone darowizny
+    if (donationIds.length === 0) {
+        alert('Zaznacz co najmniej jedną darowiznę.');
+        return;
+    }
+    const csrftoken = getCookie('csrftoken'); // Pobieranie tokenu CSRF
+
+    fetch(document.querySelector('.bulk-actions').dataset.url, {
+        method: 'POST', // Metoda POST do wysyłania danych
+        headers: {
+            'Content-Type': 'application/json', // Typ treści
+            'X-CSRFToken': csrftoken // Nagłówek tokenu CSRF
+        },
+        body: JSON.stringify({ donation_ids: donationIds, is_taken_by_user: isTakenByUser }) // Przesyłanie danych w formacie JSON
+    })
+    .then(response => {
+        if (!response.ok) {
+            return response.json().then(err => { throw new Error(err.message); }); // Obsługa błędów odpowiedzi
+        }
+        return response.json();
+    })
+    .then(data => {
+        data.donation_ids.forEach(donationId => updateDonationRow(donationId, data.is_taken_by_user)); // Aktualizacja wierszy
+        const selectAll = document.querySelector('.donation-select-all');
+        if (selectAll) {
+            selectAll.checked = false;
+        }
+    })
+    .catch(error => {
+        alert('Wystąpił błąd podczas aktualizacji statusu darowizn. Spróbuj ponownie. ' + error.message); // Obsługa błędów
+    });
+}
+
+// Zaznaczanie lub odznaczanie wszystkich darowizn na stronie
+document.addEventListener('change', (event) => {
+    if (event.target.classList.contains('donation-select-all')) {
+        document.querySelectorAll('.donation-select').forEach(cb => {
+            cb.checked = event.target.checked;
+        });
+    }
+});
+
+// Funkcja do konfiguracji linków paginacji (kursory następnej/poprzedniej strony są zawarte w adresach linków)
 function setupPaginationLinks() {
-    document.querySelectorAll('.pagination-link').forEach(link => {
-        link.addEventListener('click', (event) => {
-            event.preventDefault(); // Zatrzymanie domyślnego działania linku
-            const url = event.target.href;
-            fetch(url, {
-                headers: {
-                    'X-Requested-With': 'XMLHttpRequest' // Nagłówek do żądania AJAX
-                }
-            })
-            .then(response => response.text())
-            .then(html => {
-                const parser = new DOMParser();
-                const doc = parser.parseFromString(html, 'text/html'); // Parsowanie odpowiedzi HTML
-                const newTableContainer = doc.querySelector('#donations-table-container'); // Znajdowanie nowego kontenera tabeli
-                if (newTableContainer) {
-                    document.querySelector('#donations-table-container').innerHTML = newTableContainer.innerHTML; // Aktualizacja kontenera tabeli
-                    setupPaginationLinks(); // Ponowna konfiguracja linków paginacji
-                    window.scrollTo({
-                        top: document.querySelector('#donations-table-container').offsetTop,
-                        behavior: 'smooth' // Płynne przewijanie do tabeli
-                    });
-                }
-            })
-            .catch(error => {
-                console.error('There was a problem with the fetch operation:', error); // Logowanie błędów
+    const container = document.querySelector('#donations-table-container');
+    if (!container) {
+        return;
+    }
+    container.addEventListener('click', (event) => {
+        const link = event.target.closest('.pagination-link');
+        if (!link) {
+            return;
+        }
+        event.preventDefault(); // Zatrzymanie domyślnego działania linku
+        fetch(link.href, {
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest' // Nagłówek do żądania AJAX - serwer zwraca samą tabelę
+            }
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.text();
+        })
+        .then(html => {
+            container.innerHTML = html; // Aktualizacja kontenera tabeli
+            window.scrollTo({
+                top: container.offsetTop,
+                behavior: 'smooth' // Płynne przewijanie do tabeli
             });
+        })
+        .catch(error => {
+            console.error('There was a problem with the fetch operation:', error); // Logowanie błędów
         });
     });
 }
@@ -0,0 +1,147 @@
+import gzip
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import rcssmin
+except ImportError:  # Bez rcssmin pliki CSS nie są minifikowane
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:  # Bez rjsmin pliki JavaScript nie są minifikowane
+    rjsmin = None
+
+try:
+    import brotli
+except ImportError:  # Bez biblioteki brotli zapisywane są tylko warianty gzip
+    brotli = None
+
+# Rozszerzenia plików, dla których zapisywane są skompresowane warianty (.gz, .br)
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.map', '.svg', '.json', '.txt', '.xml', '.html', '.ico'}
+
+# Czas przechowywania przez przeglądarki plików z odciskiem treści w nazwie (rok, s)
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Kodowania skompresowanych wariantów plików w kolejności preferencji: (Content-Encoding, rozszerzenie)
+COMPRESSED_VARIANTS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def minify(name, content):
+    """
+    Zwraca zminifikowaną treść pliku CSS lub JavaScript (albo niezmienioną treść innych plików
+    i plików, dla których biblioteka minifikująca nie jest zainstalowana).
+    """
+    if name.endswith('.css') and rcssmin is not None:
+        return rcssmin.cssmin(content)
+    if name.endswith('.js') and not name.endswith('.min.js') and rjsmin is not None:
+        return rjsmin.jsmin(content)
+    return content
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Magazyn plików statycznych dla collectstatic: nadaje plikom nazwy z odciskiem treści (manifest), dzięki
+    którym mogą być przechowywane przez przeglądarki bez ograniczenia czasu, minifikuje pliki CSS i JavaScript
+    i zapisuje obok nich warianty skompresowane gzip i brotli, wysyłane bez kompresji przy żądaniu.
+    Odcisk liczony jest z treści źródłowej, więc nazwa zmienia się zawsze, gdy zmienia się plik źródłowy.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(('.css', '.js')):
+                self._minify(name)
+            if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS:
+                self._compress(name)
+
+    def _minify(self, name):
+        """
+        Minifikuje plik z odciskiem treści w nazwie.
+        """
+        with self.open(name) as file:
+            content = file.read().decode()
+        minified = minify(name, content)
+        if minified != content:
+            self._replace(name, minified.encode())
+
+    def _compress(self, name):
+        """
+        Zapisuje warianty gzip i brotli pliku, jeśli są mniejsze od oryginału.
+        """
+        with self.open(name) as file:
+            content = file.read()
+        variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content, quality=11)
+        for suffix, compressed in variants.items():
+            if len(compressed) < len(content):
+                self._replace(name + suffix, compressed)
+
+    def _replace(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(content))
+
+
+def _accepted_encodings(request):
+    """
+    Zwraca kodowania akceptowane przez klienta (nagłówek Accept-Encoding, bez kodowań z q=0).
+    """
+    encodings = set()
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        encoding, _, params = item.partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            encodings.add(encoding.strip().lower())
+    return encodings
+
+
+def serve_static(request, path):
+    """
+    Widok wysyłający pliki statyczne z STATIC_ROOT (gdy nie robi tego serwer WWW, ustawienie STATIC_SERVE).
+    Wybiera zapisany przez collectstatic wariant brotli lub gzip akceptowany przez klienta. Pliki z odciskiem
+    treści w nazwie wysyłane są z nagłówkiem Cache-Control: immutable, więc przeglądarka nie pyta o nie ponownie;
+    pozostałe pliki przeglądarka musi zweryfikować (If-Modified-Since).
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    encoding = None
+    accepted = _accepted_encodings(request)
+    for candidate, suffix in COMPRESSED_VARIANTS:
+        if candidate in accepted and os.path.isfile(full_path + suffix):
+            encoding, full_path = candidate, full_path + suffix
+            break
+
+    mtime = os.stat(full_path).st_mtime
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), mtime):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['Last-Modified'] = http_date(mtime)
+    patch_vary_headers(response, ['Accept-Encoding'])
+
+    if path in getattr(staticfiles_storage, 'hashed_files', {}).values():  # Nazwa z odciskiem treści
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
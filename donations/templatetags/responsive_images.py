@@ -0,0 +1,94 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join, mark_safe
+
+from donations.images import load_manifest, variant_name
+
+register = template.Library()
+
+
+def _media_queries(widths):
+    """
+    Zwraca pary: szerokość wariantu, rozłączne zapytanie media wybierające go według szerokości okna
+    (najmniejszy wariant nie węższy od okna; największy także dla szerszych okien).
+    """
+    queries = []
+    for index, width in enumerate(widths):
+        conditions = []
+        if index:
+            conditions.append(f'(min-width: {widths[index - 1] + 1}px)')
+        if index < len(widths) - 1:
+            conditions.append(f'(max-width: {width}px)')
+        queries.append((width, ' and '.join(conditions) or 'all'))
+    return queries
+
+
+def _srcset(name, variants, extension):
+    return ', '.join(f'{static(variant_name(name, width, extension))} {width}w' for width in variants['widths'])
+
+
+@register.simple_tag
+def responsive_picture(name, alt, sizes='100vw', loading='lazy'):
+    """
+    Zwraca element <picture> z wariantami obrazu w nowoczesnych formatach i kilku szerokościach (srcset),
+    z których przeglądarka wybiera najmniejszy wystarczający dla szerokości sizes. Bez wygenerowanych
+    wariantów zwraca zwykły element <img> z oryginałem.
+    """
+    variants = load_manifest().get(name)
+    if variants is None:
+        return format_html('<img src="{}" alt="{}" loading="{}">', static(name), alt, loading)
+
+    *modern, (fallback_extension, _) = variants['formats']
+    sources = format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', (
+        (mime_type, _srcset(name, variants, extension), sizes) for extension, mime_type in modern
+    ))
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" '
+        'loading="{}" decoding="async"></picture>',
+        sources, static(variant_name(name, variants['widths'][-1], fallback_extension)),
+        _srcset(name, variants, fallback_extension), sizes, variants['width'], variants['height'],
+        alt, loading,
+    )
+
+
+@register.simple_tag
+def responsive_background(selector, name):
+    """
+    Zwraca element <style> zastępujący tło elementów selector (ustawione w style.css) wariantem obrazu
+    dopasowanym do szerokości okna, w najlepszym formacie obsługiwanym przez przeglądarkę (image-set).
+    Przeglądarki bez image-set z type() pobierają wariant JPEG. Musi być umieszczony po style.css.
+    """
+    variants = load_manifest().get(name)
+    if variants is None:
+        return ''
+
+    *_, (fallback_extension, _) = variants['formats']
+    rules = []
+    for index, width in enumerate(variants['widths']):
+        candidates = ', '.join(f'url("{static(variant_name(name, width, extension))}") type("{mime_type}")'
+                               for extension, mime_type in variants['formats'])
+        rule = (f'{selector} {{ background-image: url("{static(variant_name(name, width, fallback_extension))}"); '
+                f'background-image: image-set({candidates}); }}')
+        if index:  # Od najmniejszego wariantu; kolejne dla okien szerszych od poprzedniego wariantu
+            rule = f'@media (min-width: {variants["widths"][index - 1] + 1}px) {{ {rule} }}'
+        rules.append(rule)
+    return format_html('<style>{}</style>', mark_safe('\n'.join(rules)))
+
+
+@register.simple_tag
+def preload_background(name):
+    """
+    Zwraca elementy <link rel="preload"> dla tła widocznego od razu po załadowaniu strony: po jednym dla każdej
+    szerokości okna, w najlepszym formacie wariantów (przeglądarki go nieobsługujące pomijają wskazówkę),
+    tak aby obraz był pobierany równolegle z arkuszem stylów, a nie dopiero po jego przetworzeniu.
+    """
+    variants = load_manifest().get(name)
+    if variants is None:
+        return ''
+
+    extension, mime_type = variants['formats'][0]
+    return format_html_join(
+        '\n', '<link rel="preload" as="image" href="{}" type="{}" media="{}" fetchpriority="high">',
+        ((static(variant_name(name, width, extension)), mime_type, media)
+          for width, media in _media_queries(variants['widths'])),
+    )
@@ -1,3 +1,396 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from datetime import date, time as day_time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from . import catalog
+from .cache import get_page_cache_version, invalidate_page_cache
+from .export_jobs import claim_job
+from .models import Category, Donation, EmailVerificationToken, ExportJob, Institution, SearchRefreshJob
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page
+from .search import run_search_refresh_job, search_donations
+from .throttle import SlidingWindowThrottle
+from .tokens import activation_tokens
+from .views import PROFILE_DONATION_ORDERING
+
+THROTTLE_TEST_RATES = {
+    'login_ip': (100, 300),
+    'login_email': (3, 300),
+    'register_ip': (100, 3600),
+    'register_email': (3, 3600),
+}
+
+
+class SlowReadCache:
+    """
+    Cache z opóźnioną odpowiedzią na odczyt, poszerzające okno pomiędzy odczytem i zapisem liczników (jak cache sieciowy).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def get(self, *args, **kwargs):
+        value = self.backend.get(*args, **kwargs)
+        time.sleep(0.01)
+        return value
+
+    def get_many(self, *args, **kwargs):
+        value = self.backend.get_many(*args, **kwargs)
+        time.sleep(0.01)
+        return value
+
+
+@override_settings(THROTTLE_ENABLED=True, THROTTLE_RATES=THROTTLE_TEST_RATES)
+class SlidingWindowThrottleTests(TestCase):
+    """
+    Testy ogranicznika liczby prób logowania i rejestracji.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rejects_attempts_over_limit_until_window_passes(self):
+        throttle = SlidingWindowThrottle('login_email')
+        self.assertEqual([throttle.hit('jan@example.com', now=1000 + i) for i in range(3)], [0, 0, 0])
+        # Najstarszy przedział okna (od 990 s) wypada z okna po 1290 s
+        self.assertEqual(throttle.hit('jan@example.com', now=1010), 280)
+        self.assertEqual(throttle.hit('JAN@example.com', now=1100), 190)  # Klucz bez rozróżniania wielkości liter
+        self.assertEqual(throttle.hit('anna@example.com', now=1100), 0)
+        self.assertEqual(throttle.hit('jan@example.com', now=1301), 0)
+
+    def test_concurrent_attempts_are_counted_atomically(self):
+        throttle = SlidingWindowThrottle('login_email')
+        results = []
+        barrier = threading.Barrier(20)
+
+        def attempt():
+            barrier.wait()
+            results.append(throttle.hit('jan@example.com', now=1000))
+
+        threads = [threading.Thread(target=attempt) for _ in range(20)]
+        with mock.patch('donations.throttle.cache', SlowReadCache(cache)):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(results.count(0), 3)
+
+    @mock.patch('donations.views.authenticate', return_value=None)
+    def test_login_returns_429_without_checking_password(self, authenticate):
+        for _ in range(3):
+            response = self.client.post(reverse('donations:login'), {'email': 'jan@example.com', 'password': 'x'})
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(reverse('donations:login'), {'email': 'jan@example.com', 'password': 'x'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(authenticate.call_count, 3)
+
+
+class BulkUpdateDonationsTests(TestCase):
+    """
+    Testy widoku zbiorczej zmiany oznaczenia "zabrane przez użytkownika".
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('jan@example.com', 'jan@example.com', 'haslo')
+        other = User.objects.create_user('anna@example.com', 'anna@example.com', 'haslo')
+        institution = Institution.objects.create(name='Fundacja', description='Opis')
+        self.donations = [
+            Donation.objects.create(quantity=1, institution=institution, address='Prosta 1',
+                                    phone_number='+48123456789', city='Warszawa', zip_code='00-001', pick_up_date=date(2024, 6, 1),
+                                    pick_up_time=day_time(12), user=owner, is_taken_by_user=taken)
+            for owner, taken in ((self.user, False), (self.user, True), (other, False))
+        ]
+        self.client.force_login(self.user)
+
+    def test_returns_only_changed_donations_of_user(self):
+        response = self.client.post(
+            reverse('donations:bulk_update_donations'),
+            json.dumps({'donation_ids': [donation.pk for donation in self.donations], 'is_taken_by_user': True}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['donation_ids'], [self.donations[0].pk])
+        taken = dict(Donation.objects.values_list('pk', 'is_taken_by_user'))
+        self.assertEqual([taken[donation.pk] for donation in self.donations], [True, True, False])
+
+
+@override_settings(THROTTLE_ENABLED=False, ACCOUNT_TOKEN_MODE='database')
+class RegisterTests(TestCase):
+    """
+    Testy ponownej rejestracji konta, które nie zostało aktywowane.
+    """
+
+    def register(self, password):
+        return self.client.post(reverse('donations:register'), {
+            'name': 'Jan', 'surname': 'Kowalski', 'email': 'jan@example.com',
+            'password': password, 'password2': password,
+        })
+
+    def test_reregistering_inactive_account_issues_new_token(self):
+        self.register('Trudne-haslo-1')
+        user = User.objects.get(username='jan@example.com')
+        EmailVerificationToken.objects.filter(user=user).delete()  # Wygasły token usunięty przez purge_tokens
+
+        response = self.register('Trudne-haslo-2')
+        self.assertRedirects(response, reverse('donations:login'), fetch_redirect_response=False)
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('Trudne-haslo-2'))
+        self.assertEqual(EmailVerificationToken.objects.filter(user=user).count(), 1)
+
+    def test_active_account_cannot_be_registered_again(self):
+        User.objects.create_user('jan@example.com', 'jan@example.com', 'Trudne-haslo-1')
+        response = self.register('Trudne-haslo-2')
+        self.assertContains(response, 'Email już istnieje')
+        self.assertTrue(User.objects.get(username='jan@example.com').check_password('Trudne-haslo-1'))
+
+
+class SearchDocumentTests(TestCase):
+    """
+    Testy dokumentu wyszukiwania darowizn.
+    """
+
+    def setUp(self):
+        self.institution = Institution.objects.create(name='Fundacja Pomocy', description='Opis')
+        self.donation = Donation.objects.create(
+            quantity=1, institution=self.institution, address='Ul. Prosta 1', phone_number='+48123456789',
+            city='Warszawa', zip_code='00-001', pick_up_date=date(2024, 6, 1), pick_up_time=day_time(12))
+
+    def test_query_does_not_match_across_fields(self):
+        donations = Donation.objects.all()
+        self.assertTrue(search_donations(donations, 'prosta 1').exists())
+        self.assertFalse(search_donations(donations, 'prosta 1 warszawa').exists())
+
+    def test_institution_rename_is_refreshed_by_queued_job(self):
+        self.institution.name = 'Fundacja Nadziei'
+        self.institution.save()
+        self.assertFalse(search_donations(Donation.objects.all(), 'nadziei').exists())  # Jeszcze nie przebudowano
+
+        job = SearchRefreshJob.objects.get(institution=self.institution)
+        self.assertEqual(run_search_refresh_job(job), 1)
+        self.assertTrue(search_donations(Donation.objects.all(), 'nadziei').exists())
+        self.assertFalse(SearchRefreshJob.objects.exists())
+
+
+class ClaimExportJobTests(TestCase):
+    """
+    Testy pobierania zadań eksportu przez worker.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('admin@example.com', 'admin@example.com', 'haslo')
+
+    @override_settings(EXPORT_JOB_TIMEOUT=600)
+    def test_reclaims_only_job_without_recent_heartbeat(self):
+        started_at = timezone.now() - timedelta(hours=3)  # Długi eksport z aktualnym sygnałem życia
+        running = ExportJob.objects.create(model_label='donations.donation', export_format='csv',
+                                           created_by=self.user, status=ExportJob.RUNNING, started_at=started_at,
+                                           heartbeat_at=timezone.now() - timedelta(minutes=5))
+        self.assertIsNone(claim_job())
+
+        ExportJob.objects.filter(pk=running.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=11))
+        job = claim_job()
+        self.assertEqual(job.pk, running.pk)
+        self.assertEqual(job.status, ExportJob.RUNNING)
+        self.assertGreater(job.heartbeat_at, timezone.now() - timedelta(minutes=1))
+
+
+class XlsxExportActionTests(TestCase):
+    """
+    Testy akcji panelu administracyjnego eksportującej zaznaczone obiekty do pliku XLSX.
+    """
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'haslo'))
+        self.institutions = Institution.objects.bulk_create(
+            [Institution(name=f'Fundacja {number}', description='Opis') for number in range(3)])
+
+    def export(self):
+        return self.client.post(reverse('admin:donations_institution_changelist'), {
+            'action': 'export_as_xlsx',
+            '_selected_action': [institution.pk for institution in self.institutions],
+        })
+
+    @mock.patch('donations.admin.XLSX_SYNC_MAX_ROWS', 2)
+    def test_large_export_is_queued_in_background(self):
+        response = self.export()
+        self.assertEqual(response.status_code, 302)
+        job = ExportJob.objects.get()
+        self.assertEqual((job.export_format, job.status), ('xlsx', ExportJob.PENDING))
+
+    @mock.patch('donations.admin.XLSX_SYNC_MAX_ROWS', 3)
+    def test_small_export_is_sent_in_response(self):
+        response = self.export()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertFalse(ExportJob.objects.exists())
+
+
+class AuthenticationBackendTests(TestCase):
+    """
+    Testy uwierzytelniania z cache obiektu użytkownika.
+    """
+
+    def test_session_created_by_model_backend_stays_valid(self):
+        user = User.objects.create_user('jan@example.com', 'jan@example.com', 'haslo')
+        self.client.force_login(user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(self.client.get(reverse('donations:user_profile')).status_code, 200)
+
+
+class PageCacheVersionTests(TestCase):
+    """
+    Testy wersji stron publicznych zapisanych w cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_repeated_invalidation_does_not_move_last_modified_into_future(self):
+        version, _ = get_page_cache_version()
+        for _ in range(5):
+            invalidate_page_cache()
+        new_version, last_modified = get_page_cache_version()
+        self.assertEqual(new_version, version + 5)
+        self.assertLessEqual(last_modified, time.time())
+
+
+@override_settings(ACCOUNT_TOKEN_MODE='signed')
+class SignedActivationTests(TestCase):
+    """
+    Testy podpisanych linków aktywacji konta.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('jan@example.com', 'jan@example.com', 'haslo', is_active=False)
+
+    def activate(self, token):
+        uidb64 = urlsafe_base64_encode(force_bytes(self.user.pk))
+        self.client.get(reverse('donations:activate', kwargs={'uidb64': uidb64, 'token': token}))
+        self.user.refresh_from_db()
+        return self.user.is_active
+
+    def test_used_link_does_not_reactivate_deactivated_account(self):
+        token = activation_tokens.make_token(self.user)
+        self.assertTrue(self.activate(token))
+        self.client.login(username='jan@example.com', password='haslo')
+        self.client.logout()
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)  # Dezaktywacja przez administratora
+        self.user.refresh_from_db()
+        self.assertFalse(activation_tokens.check_token(self.user, token))
+        self.assertFalse(self.activate(token))
+
+
+class CatalogTests(TestCase):
+    """
+    Testy katalogu instytucji i kategorii formularza darowizny.
+    """
+
+    def setUp(self):
+        cache.clear()
+        catalog._local_catalog.update(version=None, catalog=None, search_index=None)
+
+    def test_catalog_is_rebuilt_after_cache_flush(self):
+        catalog.get_catalog()
+        Institution.objects.bulk_create([Institution(name='Fundacja', description='Opis')])  # Bez sygnałów
+        cache.clear()  # Usunięcie wersji katalogu z cache (np. restart memcached)
+        time.sleep(0.002)
+        self.assertEqual([institution['name'] for institution in catalog.get_catalog()['institutions']],
+                         ['Fundacja'])
+
+    def create_institution(self, name, categories):
+        institution = Institution.objects.create(name=name, description='Opis')
+        institution.categories.set(categories)
+        return institution
+
+    def test_search_returns_institutions_with_all_categories(self):
+        clothes, toys, books = (Category.objects.create(name=name) for name in ('Ubrania', 'Zabawki', 'Książki'))
+        self.create_institution('Fundacja A', [clothes, toys, books])
+        self.create_institution('Fundacja B', [clothes, books])
+        self.create_institution('Fundacja C', [toys, books])
+        self.create_institution('Fundacja D', [clothes, toys])
+
+        def names(category_ids):
+            return [institution['name'] for institution in catalog.search_institutions(category_ids)]
+
+        self.assertEqual(names([books.pk, clothes.pk]), ['Fundacja A', 'Fundacja B'])
+        self.assertEqual(names([toys.pk, books.pk, clothes.pk]), ['Fundacja A'])
+        self.assertEqual(names([clothes.pk, clothes.pk]), ['Fundacja A', 'Fundacja B', 'Fundacja D'])
+        self.assertEqual(names([clothes.pk, 0]), [])
+
+    def test_prefix_search_ignores_letter_case(self):
+        clothes, toys = Category.objects.create(name='Ubrania'), Category.objects.create(name='Zabawki')
+        self.create_institution('fundacja Zielona', [clothes])
+        self.create_institution('FUNDUSZ Pomocy', [clothes, toys])
+        self.create_institution('Straße der Hoffnung', [toys])
+        self.create_institution('Stowarzyszenie Fundacji', [clothes, toys])
+
+        def names(prefix, category_ids=()):
+            return [institution['name'] for institution in catalog.search_institutions(category_ids, prefix)]
+
+        self.assertEqual(names('Fund'), ['fundacja Zielona', 'FUNDUSZ Pomocy'])
+        self.assertEqual(names('FUNDA'), ['fundacja Zielona'])
+        self.assertEqual(names('fund', [toys.pk]), ['FUNDUSZ Pomocy'])
+        self.assertEqual(names('STRASSE'), ['Straße der Hoffnung'])
+        self.assertEqual(names('x'), [])
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Testy paginacji kursorowej listy darowizn w profilu użytkownika.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('jan@example.com', 'jan@example.com', 'haslo')
+        institution = Institution.objects.create(name='Fundacja', description='Opis')
+        # Wiele darowizn z tym samym kluczem sortowania poza id (rozstrzyga kolejność)
+        Donation.objects.bulk_create([
+            Donation(quantity=1, institution=institution, address='Prosta 1', phone_number='+48123456789',
+                     city='Warszawa', zip_code='00-001', pick_up_date=date(2024, 6, 1 + number % 2),
+                     pick_up_time=day_time(12), user=self.user, is_taken_by_user=number % 3 == 0)
+            for number in range(11)
+        ])
+        self.queryset = Donation.objects.filter(user=self.user)
+        self.ordered = list(self.queryset.order_by(*PROFILE_DONATION_ORDERING))
+
+    def test_next_and_previous_cursors_walk_all_pages_across_ties(self):
+        pages, page = [], keyset_page(self.queryset, PROFILE_DONATION_ORDERING, 3)
+        for _ in self.ordered:  # Ograniczenie liczby stron, gdyby kursor nie przesuwał się dalej
+            pages.append(page['object_list'])
+            if not page['has_next']:
+                break
+            page = keyset_page(self.queryset, PROFILE_DONATION_ORDERING, 3, after=page['next_cursor'])
+        self.assertEqual([len(rows) for rows in pages], [3, 3, 3, 2])
+        self.assertEqual([donation for rows in pages for donation in rows], self.ordered)
+
+        for rows in reversed(pages[:-1]):
+            page = keyset_page(self.queryset, PROFILE_DONATION_ORDERING, 3, before=page['previous_cursor'])
+            self.assertEqual(page['object_list'], rows)
+        self.assertFalse(page['has_previous'])
+
+    def test_tampered_cursor_is_rejected(self):
+        cursor = keyset_page(self.queryset, PROFILE_DONATION_ORDERING, 3)['next_cursor']
+        for tampered in (cursor[:-2], 'nie-kursor', encode_cursor([False, 'jutro', '12:00', 1]),
+                         encode_cursor([False, '2024-06-01'])):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(tampered, PROFILE_DONATION_ORDERING, Donation)
+
+    def test_profile_with_tampered_cursor_shows_first_page(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('donations:user_profile'), {'after': 'nie-kursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['donations']['object_list']), self.ordered[:8])
+        self.assertIsNone(response.context['donations']['previous_url'])
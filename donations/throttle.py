@@ -0,0 +1,141 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Liczba przedziałów, na które dzielone jest okno licznika (dokładność przesuwania okna)
+THROTTLE_BUCKETS = 10
+
+# Maksymalna liczba liczników przechowywanych w pamięci procesu
+THROTTLE_LOCAL_MAX_ENTRIES = 10000
+
+
+def _retry_after(counts, bucket, bucket_seconds, now):
+    """
+    Zwraca liczbę sekund do wypadnięcia z okna najstarszego niepustego przedziału (counts - liczniki
+    przedziałów okna od najstarszego do przedziału bucket).
+    """
+    for offset, count in enumerate(counts):
+        if count:
+            oldest = bucket - THROTTLE_BUCKETS + 1 + offset
+            return max(1, math.ceil((oldest + THROTTLE_BUCKETS) * bucket_seconds - now))
+    return 1
+
+
+class SlidingWindowThrottle:
+    """
+    Ogranicznik liczby prób w przesuwanym oknie czasu (THROTTLE_RATES[scope] - para: limit, okno w sekundach).
+    Okno dzielone jest na THROTTLE_BUCKETS przedziałów, z osobnym licznikiem każdego przedziału we wspólnym
+    cache, zwiększanym atomowo (cache.incr), więc równoczesne próby nie nadpisują sobie liczników. Klucz, który
+    w tym procesie przekroczył już limit, jest odrzucany bez odwołania do cache aż do zwolnienia miejsca w oknie.
+
+    Atrybuty:
+        scope (str): Nazwa ogranicznika w THROTTLE_RATES i w licznikach statystyk.
+    """
+
+    def __init__(self, scope):
+        self.scope = scope
+        self._blocked = OrderedDict()  # Klucz cache -> czas, do którego klucz jest odrzucany w tym procesie
+        self._lock = threading.Lock()
+
+    def _block(self, cache_key, until):
+        with self._lock:
+            self._blocked[cache_key] = until
+            self._blocked.move_to_end(cache_key)
+            if len(self._blocked) > THROTTLE_LOCAL_MAX_ENTRIES:
+                self._blocked.popitem(last=False)
+
+    def hit(self, key, now=None):
+        """
+        Rejestruje próbę dla klucza (np. adresu IP lub emaila). Zwraca 0, jeśli próba jest dozwolona,
+        a w przeciwnym razie liczbę sekund, po których można spróbować ponownie (odrzucone próby nie są liczone).
+        """
+        limit, window = settings.THROTTLE_RATES[self.scope]
+        bucket_seconds = window / THROTTLE_BUCKETS
+        now = time.time() if now is None else now
+        bucket = int(now // bucket_seconds)
+        cache_key = f'donations:throttle:{self.scope}:{hashlib.md5(key.lower().encode()).hexdigest()}'
+
+        blocked_until = self._blocked.get(cache_key)
+        if blocked_until is not None and now < blocked_until:  # Limit przekroczony w tym procesie - bez cache
+            return max(1, math.ceil(blocked_until - now))
+
+        bucket_keys = [f'{cache_key}:{index}' for index in range(bucket - THROTTLE_BUCKETS + 1, bucket + 1)]
+        stored = cache.get_many(bucket_keys)
+        counts = [stored.get(bucket_key, 0) for bucket_key in bucket_keys]
+        if sum(counts) < limit:
+            # Atomowe zwiększenie licznika bieżącego przedziału; add tworzy licznik, jeśli go nie ma
+            timeout = math.ceil(window + bucket_seconds)
+            cache.add(bucket_keys[-1], 0, timeout)
+            try:
+                counts[-1] = cache.incr(bucket_keys[-1])
+            except ValueError:  # Licznik usunięty z cache pomiędzy add a incr
+                cache.set(bucket_keys[-1], 1, timeout)
+                counts[-1] = 1
+            if sum(counts) <= limit:
+                return 0
+            try:
+                cache.decr(bucket_keys[-1])  # Limit przekroczony przez równoczesne próby - odrzucona nie jest liczona
+            except ValueError:
+                pass
+            counts[-1] -= 1
+
+        retry_after = _retry_after(counts, bucket, bucket_seconds, now)
+        self._block(cache_key, now + retry_after)
+        return retry_after
+
+
+def _record(scope, outcome):
+    """
+    Zwiększa licznik statystyk ogranicznika (outcome: 'allowed' lub 'rejected') we wspólnym cache.
+    """
+    key = f'donations:throttle_stats:{scope}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def check_throttles(*checks):
+    """
+    Rejestruje próbę w kolejnych ogranicznikach (pary: ogranicznik, klucz; puste klucze są pomijane).
+    Zwraca 0, jeśli próba jest dozwolona, a w przeciwnym razie liczbę sekund do ponownej próby.
+    """
+    if not settings.THROTTLE_ENABLED:
+        return 0
+    for throttle, key in checks:
+        if not key:
+            continue
+        retry_after = throttle.hit(key)
+        _record(throttle.scope, 'rejected' if retry_after else 'allowed')
+        if retry_after:
+            return retry_after  # Kolejne ograniczniki nie są sprawdzane ani zwiększane
+    return 0
+
+
+def throttle_stats():
+    """
+    Zwraca liczniki dozwolonych i odrzuconych prób dla każdego ogranicznika z THROTTLE_RATES.
+    """
+    return {
+        scope: {outcome: cache.get(f'donations:throttle_stats:{scope}:{outcome}', 0)
+                for outcome in ('allowed', 'rejected')}
+        for scope in settings.THROTTLE_RATES
+    }
+
+
+def client_ip(request):
+    """
+    Zwraca adres IP klienta (REMOTE_ADDR; za serwerem proxy musi go ustawiać serwer aplikacji).
+    """
+    return request.META.get('REMOTE_ADDR', '')
+
+
+login_ip_throttle = SlidingWindowThrottle('login_ip')
+login_email_throttle = SlidingWindowThrottle('login_email')
+register_ip_throttle = SlidingWindowThrottle('register_ip')
+register_email_throttle = SlidingWindowThrottle('register_email')
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.signing import BadSignature, TimestampSigner
+
+# Tryby tokenów w linkach aktywacji konta i resetowania hasła (ustawienie ACCOUNT_TOKEN_MODE)
+TOKEN_MODE_DATABASE = 'database'
+TOKEN_MODE_SIGNED = 'signed'
+
+
+def signed_tokens_enabled():
+    """
+    Sprawdza, czy linki aktywacji konta i resetowania hasła zawierają podpisane tokeny zamiast tokenów z bazy danych.
+    """
+    return settings.ACCOUNT_TOKEN_MODE == TOKEN_MODE_SIGNED
+
+
+class SignedLinkTokenGenerator:
+    """
+    Generator bezstanowych tokenów linków: podpisu HMAC z czasem utworzenia, weryfikowanego bez zapytań
+    do tabel tokenów. Sól podpisu zawiera skrót hasła, stan aktywności i czas ostatniego logowania użytkownika,
+    więc aktywacja konta, zalogowanie lub zmiana hasła unieważnia wcześniej wysłane linki (token jest jednorazowy,
+    także po dezaktywacji konta przez administratora).
+
+    Atrybuty:
+        purpose (str): Przeznaczenie tokenu, oddzielające tokeny aktywacji od tokenów resetowania hasła.
+        timeout_setting (str): Nazwa ustawienia z czasem ważności tokenu w sekundach.
+    """
+
+    def __init__(self, purpose, timeout_setting):
+        self.purpose = purpose
+        self.timeout_setting = timeout_setting
+
+    def _signer(self, user):
+        # Jak w PasswordResetTokenGenerator: czas logowania bez mikrosekund (nie zmienia się po zapisie w bazie)
+        last_login = '' if user.last_login is None else user.last_login.replace(microsecond=0, tzinfo=None)
+        return TimestampSigner(
+            salt=f'donations.{self.purpose}:{user.pk}:{user.password}:{user.is_active}:{last_login}')
+
+    def make_token(self, user):
+        return self._signer(user).sign(str(user.pk))
+
+    def check_token(self, user, token):
+        try:
+            value = self._signer(user).unsign(token, max_age=getattr(settings, self.timeout_setting))
+        except BadSignature:  # Także SignatureExpired - token wygasł
+            return False
+        return value == str(user.pk)
+
+
+activation_tokens = SignedLinkTokenGenerator('activation', 'EMAIL_VERIFICATION_TIMEOUT')
+password_reset_tokens = SignedLinkTokenGenerator('password_reset', 'PASSWORD_RESET_TIMEOUT')
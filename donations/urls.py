@@ -5,12 +5,15 @@ app_name = 'donations'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('institutions/search/', views.institution_search, name='institution_search'),
+    path('institutions/<str:section>/', views.institution_section, name='institution_section'),
     path('add_donation/', views.add_donation, name='add_donation'),
     path('login/', views.login, name='login'),
     path('register/', views.register, name='register'),
     path('logout/', views.logout, name='logout'),
     path('form_success/', views.form_success, name='form_success'),
     path('user_profile/', views.user_profile, name='user_profile'),
+    path('user_profile/donations/bulk/', views.bulk_update_donations, name='bulk_update_donations'),
     path('edit_profile/', views.edit_profile, name='edit_profile'),
     path('change_password/', views.change_password, name='change_password'),
     path('activate/<uidb64>/<token>/', views.activate, name='activate'),
@@ -1,4 +1,5 @@
 # Importowanie potrzebnych bibliotek
+import hashlib
 import json
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
@@ -7,64 +8,195 @@ from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail, EmailMultiAlternatives
-from django.core.paginator import Paginator
-from django.db.models import Sum, Q
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.http import Http404, JsonResponse
 from django.shortcuts import redirect, get_object_or_404, render
 from django.contrib.sites.shortcuts import get_current_site
 from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.encoding import force_bytes, force_str
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.utils.http import urlencode, urlsafe_base64_encode, urlsafe_base64_decode
+from django.views.decorators.http import condition, require_POST, require_safe
 
-from charity_platform import settings
+from .bulk import update_returning
+from .cache import cache_anonymous_page
+from .catalog import get_catalog, get_catalog_version, search_institutions
 from .forms import ContactForm, ProblemReportForm
-from .models import EmailVerificationToken, PasswordResetToken, Institution, Category, Donation
+from .models import EmailVerificationToken, PasswordResetToken, Institution, Donation, \
+    PlatformStats
+from .outbox import queue_email
+from .pagination import InvalidCursor, keyset_page
+from .search import search_donations
+from .throttle import (check_throttles, client_ip, login_email_throttle, login_ip_throttle, register_email_throttle,
+                       register_ip_throttle)
+from .tokens import activation_tokens, password_reset_tokens, signed_tokens_enabled
+
+
+# Liczba instytucji wyświetlanych na jednej stronie sekcji
+INSTITUTIONS_PER_PAGE = 5
+
+# Mapowanie identyfikatorów sekcji strony głównej na typy instytucji
+INSTITUTION_SECTIONS = {
+    'foundations': Institution.FOUNDATION,
+    'ngos': Institution.NGO,
+    'local_collections': Institution.LOCAL_COLLECTION,
+}
+
+
+def _build_section(section, institutions, after=None, before=None, has_more=False):
+    """
+    Buduje kontekst jednej sekcji instytucji z linkami paginacji kursorowej (po nazwie instytucji).
+    """
+    if before is not None:
+        has_previous, has_next = has_more, True
+    else:
+        has_previous, has_next = after is not None, has_more
+    url = reverse('donations:institution_section', kwargs={'section': section})
+    return {
+        'id': section,
+        'institutions': institutions,
+        'previous_url': f"{url}?{urlencode({'before': institutions[0].name})}" if has_previous and institutions else None,
+        'next_url': f"{url}?{urlencode({'after': institutions[-1].name})}" if has_next and institutions else None,
+        'first_url': url if has_previous else None,
+    }
+
+
+def _first_institution_pages():
+    """
+    Pobiera pierwszą stronę instytucji każdego typu jednym zapytaniem z funkcją okna ROW_NUMBER().
+    Pobierany jest jeden dodatkowy wiersz na typ, aby ustalić, czy istnieje następna strona.
+    """
+    institutions = Institution.objects.annotate(
+        row_number=Window(RowNumber(), partition_by=F('type'), order_by=F('name').asc())
+    ).filter(row_number__lte=INSTITUTIONS_PER_PAGE + 1).order_by('type', 'name').prefetch_related('categories')
+
+    grouped = {institution_type: [] for institution_type in INSTITUTION_SECTIONS.values()}
+    for institution in institutions:
+        grouped.setdefault(institution.type, []).append(institution)
+
+    sections = {}
+    for section, institution_type in INSTITUTION_SECTIONS.items():
+        rows = grouped[institution_type]
+        sections[section] = _build_section(section, rows[:INSTITUTIONS_PER_PAGE],
+                                           has_more=len(rows) > INSTITUTIONS_PER_PAGE)
+    return sections
 
 
 # Widok dla strony głównej
+@cache_anonymous_page
 def index(request):
     """
     Widok strony głównej serwisu, który wyświetla główne statystyki oraz listę instytucji.
     Zlicza łączną liczbę worków z darowizn oraz liczbę wspieranych instytucji.
-    Umożliwia paginację dla listy instytucji w trzech kategoriach: fundacje, NGO i zbiórki lokalne.
+    Pierwsze strony list instytucji w trzech kategoriach (fundacje, NGO i zbiórki lokalne) są pobierane
+    jednym zapytaniem z funkcją okna; kolejne strony ładuje widok institution_section.
     """
-    total_bags = Donation.objects.aggregate(total_bags=Sum('quantity'))[
-                     'total_bags'] or 0  # Zliczenie łącznej ilości worków
-    supported_institutions = Institution.objects.count()  # Zliczenie liczby wspieranych instytucji
+    stats = PlatformStats.load()  # Pobranie liczników utrzymywanych przyrostowo przez sygnały
+    total_bags = stats.total_bags  # Łączna ilość worków
+    supported_institutions = stats.supported_institutions  # Liczba wspieranych instytucji
 
-    # Paginacja dla każdej sekcji instytucji
-    foundations = Institution.objects.filter(type=Institution.FOUNDATION)  # Pobranie listy fundacji
-    ngos = Institution.objects.filter(type=Institution.NGO)  # Pobranie listy NGO
-    local_collections = Institution.objects.filter(
-        type=Institution.LOCAL_COLLECTION)  # Pobranie listy lokalnych zbiórek
-
-    paginator_foundations = Paginator(foundations, 5)  # Paginacja dla fundacji (5 na stronę)
-    paginator_ngos = Paginator(ngos, 5)  # Paginacja dla NGO (5 na stronę)
-    paginator_local_collections = Paginator(local_collections, 5)  # Paginacja dla lokalnych zbiórek (5 na stronę)
-
-    page_number_foundations = request.GET.get('page_foundations')  # Numer strony dla fundacji
-    page_number_ngos = request.GET.get('page_ngos')  # Numer strony dla NGO
-    page_number_local_collections = request.GET.get('page_local_collections')  # Numer strony dla lokalnych zbiórek
-
-    page_obj_foundations = paginator_foundations.get_page(
-        page_number_foundations)  # Pobranie odpowiedniej strony dla fundacji
-    page_obj_ngos = paginator_ngos.get_page(page_number_ngos)  # Pobranie odpowiedniej strony dla NGO
-    page_obj_local_collections = paginator_local_collections.get_page(
-        page_number_local_collections)  # Pobranie odpowiedniej strony dla lokalnych zbiórek
+    sections = _first_institution_pages()  # Pierwsze strony wszystkich sekcji pobrane jednym zapytaniem
 
     context = {
         'total_bags': total_bags,  # Przekazanie do szablonu łącznej ilości worków
         'supported_institutions': supported_institutions,  # Przekazanie do szablonu liczby wspieranych instytucji
-        'page_obj_foundations': page_obj_foundations,  # Przekazanie do szablonu strony fundacji
-        'page_obj_ngos': page_obj_ngos,  # Przekazanie do szablonu strony NGO
-        'page_obj_local_collections': page_obj_local_collections,  # Przekazanie do szablonu strony lokalnych zbiórek
+        'section_foundations': sections['foundations'],  # Przekazanie do szablonu pierwszej strony fundacji
+        'section_ngos': sections['ngos'],  # Przekazanie do szablonu pierwszej strony NGO
+        'section_local_collections': sections['local_collections'],  # Przekazanie do szablonu pierwszej strony zbiórek
     }
 
     return render(request, 'index.html', context)  # Renderowanie strony głównej z danymi kontekstowymi
 
 
+# Widok fragmentu sekcji instytucji
+@cache_anonymous_page
+def institution_section(request, section):
+    """
+    Widok zwracający jedną sekcję listy instytucji strony głównej (używany przez index.js).
+    Stosuje paginację kursorową po nazwie instytucji zamiast COUNT i OFFSET, dzięki czemu zmiana
+    strony jednej sekcji nie przelicza statystyk ani pozostałych list.
+    """
+    institution_type = INSTITUTION_SECTIONS.get(section)
+    if institution_type is None:
+        raise Http404('Nieznana sekcja instytucji')
+
+    after = request.GET.get('after')  # Nazwa ostatniej instytucji poprzedniej strony
+    before = request.GET.get('before')  # Nazwa pierwszej instytucji następnej strony
+
+    institutions = Institution.objects.filter(type=institution_type).prefetch_related('categories')
+    if before is not None:
+        rows = list(institutions.filter(name__lt=before).order_by('-name')[:INSTITUTIONS_PER_PAGE + 1])
+        has_more = len(rows) > INSTITUTIONS_PER_PAGE
+        rows = rows[:INSTITUTIONS_PER_PAGE][::-1]
+    else:
+        if after is not None:
+            institutions = institutions.filter(name__gt=after)
+        rows = list(institutions.order_by('name')[:INSTITUTIONS_PER_PAGE + 1])
+        has_more = len(rows) > INSTITUTIONS_PER_PAGE
+        rows = rows[:INSTITUTIONS_PER_PAGE]
+
+    context = {'section': _build_section(section, rows, after=after, before=before, has_more=has_more)}
+    return render(request, 'institution_section.html', context)  # Renderowanie samej sekcji instytucji
+
+
+# Liczba instytucji zwracanych na jednej stronie wyszukiwania
+INSTITUTION_SEARCH_PAGE_SIZE = 20
+
+
+def _institution_search_params(request):
+    """
+    Odczytuje z parametrów URL identyfikatory wybranych kategorii, prefiks nazwy i numer strony.
+    """
+    category_ids = sorted({int(value) for value in request.GET.getlist('categories') if value.isdigit()})
+    prefix = request.GET.get('q', '').strip()
+    page = request.GET.get('page', '1')
+    page = int(page) if page.isdigit() and int(page) > 0 else 1
+    return category_ids, prefix, page
+
+
+def _institution_search_etag(request, *args, **kwargs):
+    """
+    Wylicza ETag wyszukiwania na podstawie wersji katalogu i parametrów zapytania.
+    """
+    category_ids, prefix, page = _institution_search_params(request)
+    params = hashlib.md5(f'{category_ids}|{prefix.casefold()}|{page}'.encode()).hexdigest()
+    return f'{get_catalog_version()}-{params}'
+
+
+# Widok wyszukiwania instytucji
+@require_safe
+@condition(etag_func=_institution_search_etag)
+def institution_search(request):
+    """
+    Widok zwracający w formacie JSON stronę instytucji obsługujących wszystkie wybrane kategorie,
+    opcjonalnie zawężonych do nazw zaczynających się od podanego prefiksu.
+    Korzysta z indeksu odwróconego przechowywanego w pamięci workera i obsługuje nagłówek If-None-Match.
+    """
+    category_ids, prefix, page = _institution_search_params(request)
+    institutions = search_institutions(category_ids, prefix)  # Wyszukiwanie w indeksie odwróconym
+
+    start = (page - 1) * INSTITUTION_SEARCH_PAGE_SIZE
+    results = institutions[start:start + INSTITUTION_SEARCH_PAGE_SIZE]
+    return JsonResponse({
+        'results': [
+            {
+                'id': institution['id'],
+                'name': institution['name'],
+                'description': institution['description'],
+                'category_ids': institution['category_ids'],
+            }
+            for institution in results
+        ],
+        'count': len(institutions),
+        'page': page,
+        'has_next': start + INSTITUTION_SEARCH_PAGE_SIZE < len(institutions),
+    })
+
+
 # Widok do dodania darowizny
 @login_required(login_url='donations:register')
 def add_donation(request):
@@ -114,11 +246,9 @@ def add_donation(request):
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)})  # Obsługa błędów i zwrócenie odpowiedzi JSON
 
-    categories = Category.objects.all()  # Pobranie wszystkich kategorii
-    institutions = Institution.objects.prefetch_related(
-        'categories').all()  # Pobranie wszystkich instytucji z powiązanymi kategoriami
+    catalog = get_catalog()  # Pobranie gotowego katalogu kategorii (bez zapytań w stanie ustalonym)
     return render(request, 'form.html',
-                  {'categories': categories, 'institutions': institutions})  # Renderowanie formularza z danymi
+                  {'categories': catalog['categories']})  # Renderowanie formularza; instytucje ładowane są z institution_search
 
 
 # Widok dla potwierdzenia formularza
@@ -140,6 +270,14 @@ def login(request):
         email = request.POST.get('email')  # Pobranie adresu email z formularza logowania
         password = request.POST.get('password')  # Pobranie hasła z formularza logowania
 
+        # Ograniczenie liczby prób z adresu IP i dla adresu email - przed kosztownym sprawdzaniem hasła
+        retry_after = check_throttles((login_ip_throttle, client_ip(request)), (login_email_throttle, email))
+        if retry_after:
+            errors = {'email': f'Zbyt wiele prób logowania. Spróbuj ponownie za {retry_after} s.'}
+            response = render(request, 'login.html', {'errors': errors}, status=429)
+            response['Retry-After'] = retry_after
+            return response
+
         user = authenticate(request, username=email, password=password)  # Uwierzytelnienie użytkownika
         if user is not None:
             auth_login(request, user)  # Zalogowanie użytkownika
@@ -155,6 +293,7 @@ def register(request):
     """
     Widok rejestracji nowego użytkownika. Umożliwia tworzenie nowych kont użytkowników.
     Sprawdza poprawność danych rejestracyjnych i zapisuje użytkownika do bazy danych.
+    Ponowna rejestracja nieaktywowanego konta zastępuje jego dane i wysyła nowy link aktywacyjny.
     """
     if request.method == 'POST':
         name = request.POST.get('name')  # Pobranie imienia z formularza rejestracji
@@ -163,6 +302,14 @@ def register(request):
         password = request.POST.get('password')  # Pobranie hasła z formularza rejestracji
         password2 = request.POST.get('password2')  # Pobranie potwierdzenia hasła z formularza rejestracji
 
+        # Ograniczenie liczby rejestracji z adresu IP i dla adresu email - przed walidacją i haszowaniem hasła
+        retry_after = check_throttles((register_ip_throttle, client_ip(request)), (register_email_throttle, email))
+        if retry_after:
+            errors = {'email': [f'Zbyt wiele prób rejestracji. Spróbuj ponownie za {retry_after} s.']}
+            response = render(request, 'register.html', {'errors': errors}, status=429)
+            response['Retry-After'] = retry_after
+            return response
+
         errors = {}
         if not name:
             errors['name'] = ['Imię jest wymagane']  # Błąd braku imienia
@@ -178,49 +325,66 @@ def register(request):
             validate_password(password)  # Walidacja hasła
         except ValidationError as e:
             errors['password'] = list(e.messages)  # Błędy walidacji hasła
-        if User.objects.filter(username=email).exists():
+        # Konto, które nigdy nie zostało aktywowane (np. po wygaśnięciu linku), można zarejestrować ponownie
+        existing = User.objects.filter(username=email).first() if email else None
+        if existing is not None and (existing.is_active or existing.last_login is not None):
             errors['email'] = ['Email już istnieje']  # Błąd istnienia użytkownika z takim emailem
 
         if errors:
             return render(request, 'register.html', {'errors': errors})  # Renderowanie strony rejestracji z błędami
         else:
-            user = User.objects.create_user(username=email, password=password, first_name=name, last_name=surname,
-                                            email=email)
-            user.is_active = False  # Ustawienie konta jako nieaktywne
-            user.save()
-
-            # Tworzenie tokenu weryfikacyjnego
-            token = EmailVerificationToken.objects.create(user=user)
-
-            # Wysyłanie emaila weryfikacyjnego
-            current_site = get_current_site(request)
-            mail_subject = 'Aktywuj swoje konto'
-            message = render_to_string('email_verification.html', {
-                'user': user,
-                'domain': current_site.domain,
-                'uidb64': urlsafe_base64_encode(force_bytes(user.pk)),
-                'token': token.token,
-            })
-            plain_message = (
-                f"Cześć {user.first_name},\n\nDziękujemy za zarejestrowanie się na naszej stronie. "
-                f"Proszę kliknij poniższy link, aby aktywować swoje konto:\n\n"
-                f"http://{current_site.domain}{reverse('donations:activate', kwargs={'uidb64': urlsafe_base64_encode(force_bytes(user.pk)), 'token': token.token})}\n\n"
-                "Jeśli nie rejestrowałeś się na naszej stronie, zignoruj tę wiadomość."
-            )
-
-            email = EmailMultiAlternatives(mail_subject, plain_message, settings.DEFAULT_FROM_EMAIL, [email])
-            email.attach_alternative(message, "text/html")
-            email.send()
+            with transaction.atomic():
+                if existing is None:
+                    user = User.objects.create_user(username=email, password=password, first_name=name,
+                                                    last_name=surname, email=email, is_active=False)  # Konto nieaktywne
+                else:
+                    # Zastąpienie danych nieaktywowanego konta i unieważnienie wcześniej wysłanych linków
+                    user = existing
+                    user.first_name, user.last_name, user.email = name, surname, email
+                    user.set_password(password)  # Zmiana hasła unieważnia też podpisane tokeny
+                    user.save()
+                    EmailVerificationToken.objects.filter(user=user).delete()
+
+                # Tworzenie tokenu weryfikacyjnego (podpisanego lub zapisanego w bazie danych)
+                if signed_tokens_enabled():
+                    token = activation_tokens.make_token(user)
+                else:
+                    token = EmailVerificationToken.objects.create(user=user).token
+
+                # Zapisanie emaila weryfikacyjnego w skrzynce nadawczej
+                _queue_verification_email(request, user, token)
 
             return redirect('donations:login')  # Przekierowanie na stronę logowania po rejestracji
     return render(request, 'register.html')  # Renderowanie strony rejestracji
 
 
+def _queue_verification_email(request, user, token):
+    """
+    Zapisuje w skrzynce nadawczej email z linkiem aktywacyjnym konta.
+    """
+    current_site = get_current_site(request)
+    mail_subject = 'Aktywuj swoje konto'
+    message = render_to_string('email_verification.html', {
+        'user': user,
+        'domain': current_site.domain,
+        'uidb64': urlsafe_base64_encode(force_bytes(user.pk)),
+        'token': token,
+    })
+    plain_message = (
+        f"Cześć {user.first_name},\n\nDziękujemy za zarejestrowanie się na naszej stronie. "
+        f"Proszę kliknij poniższy link, aby aktywować swoje konto:\n\n"
+        f"http://{current_site.domain}{reverse('donations:activate', kwargs={'uidb64': urlsafe_base64_encode(force_bytes(user.pk)), 'token': token})}\n\n"
+        "Jeśli nie rejestrowałeś się na naszej stronie, zignoruj tę wiadomość."
+    )
+
+    queue_email(mail_subject, plain_message, [user.email], html_body=message)
+
+
 # Widok aktywacji konta
 def activate(request, uidb64, token):
     """
     Widok aktywacji konta użytkownika za pomocą emaila weryfikacyjnego.
-    Weryfikuje token i aktywuje konto użytkownika.
+    Weryfikuje token i aktywuje konto użytkownika, które nigdy nie było zalogowane.
     """
     try:
         uid = force_str(urlsafe_base64_decode(uidb64))
@@ -228,10 +392,19 @@ def activate(request, uidb64, token):
     except (TypeError, ValueError, OverflowError, User.DoesNotExist):
         user = None
 
-    if user is not None and EmailVerificationToken.objects.filter(user=user, token=token).exists():
-        user.is_active = True  # Aktywacja konta użytkownika
+    if user is None or user.last_login is not None:
+        valid = False  # Konto, które było już używane, może ponownie aktywować tylko administrator
+    elif signed_tokens_enabled():
+        valid = activation_tokens.check_token(user, token)  # Weryfikacja podpisu, bez zapytań do tabeli tokenów
+    else:
+        valid = EmailVerificationToken.objects.filter(
+            user=user, token=token, expires_at__gt=timezone.now()).exists()  # Tylko token, który nie wygasł
+
+    if valid:
+        user.is_active = True  # Aktywacja konta użytkownika (unieważnia też podpisany token)
         user.save()
-        EmailVerificationToken.objects.filter(user=user).delete()  # Usunięcie tokenu weryfikacyjnego
+        if not signed_tokens_enabled():
+            EmailVerificationToken.objects.filter(user=user).delete()  # Usunięcie tokenu weryfikacyjnego
         return redirect('donations:login')  # Przekierowanie na stronę logowania po aktywacji
     else:
         return render(request, 'activation_invalid.html')  # Renderowanie strony błędu aktywacji
@@ -246,6 +419,29 @@ def logout(request):
     return redirect('donations:index')  # Przekierowanie na stronę główną po wylogowaniu
 
 
+# Liczba darowizn wyświetlanych na jednej stronie profilu
+PROFILE_DONATIONS_PER_PAGE = 8
+
+# Klucz sortowania (i paginacji kursorowej) listy darowizn w profilu; ostatnie pole jest unikalne
+PROFILE_DONATION_ORDERING = ('is_taken_by_user', 'pick_up_date', 'pick_up_time', 'id')
+
+# Czas przechowywania w cache łącznej liczby darowizn w profilu (s)
+PROFILE_COUNT_TIMEOUT = 60
+
+
+def _cached_profile_donation_count(user, donations_list, params):
+    """
+    Zwraca łączną liczbę darowizn użytkownika dla danych filtrów, przechowywaną krótko w cache,
+    aby kolejne strony nie wykonywały zapytania COUNT.
+    """
+    key = f"donations:profile_count:{user.pk}:{hashlib.md5(urlencode(sorted(params.items())).encode()).hexdigest()}"
+    total = cache.get(key)
+    if total is None:
+        total = donations_list.count()
+        cache.set(key, total, PROFILE_COUNT_TIMEOUT)
+    return total
+
+
 # Widok profilu użytkownika
 @login_required
 def user_profile(request):
@@ -261,7 +457,7 @@ def user_profile(request):
             donation = get_object_or_404(Donation, id=donation_id, user=request.user)
 
             donation.is_taken_by_user = not donation.is_taken_by_user
-            donation.save()
+            donation.save(update_fields=['is_taken_by_user', 'updated_at'])  # Zapis tylko zmienianych pól
             return JsonResponse({'status': 'success', 'is_taken_by_user': donation.is_taken_by_user})
         except Donation.DoesNotExist:
             return JsonResponse({'status': 'error', 'message': 'Darowizna nie istnieje'}, status=400)
@@ -272,32 +468,39 @@ def user_profile(request):
         except Exception as e:
             return JsonResponse({'status': 'error', 'message': 'Wystąpił nieoczekiwany błąd'}, status=500)
 
-    donations_list = Donation.objects.filter(user=request.user)
+    donations_list = Donation.objects.filter(user=request.user).select_related(
+        'institution').prefetch_related('categories')  # Instytucje i kategorie pobierane bez zapytań N+1
 
     # Obsługa wyszukiwania i filtrowania
     search_query = request.GET.get('search', '')  # Pobranie zapytania wyszukiwania z parametrów URL
     filter_status = request.GET.get('status', '')  # Pobranie statusu filtra z parametrów URL
 
     if search_query:
-        donations_list = donations_list.filter(
-            Q(institution__name__icontains=search_query) |
-            Q(categories__name__icontains=search_query) |
-            Q(address__icontains=search_query) |
-            Q(city__icontains=search_query)
-        ).distinct()  # Filtrowanie darowizn na podstawie zapytania wyszukiwania
+        donations_list = search_donations(donations_list, search_query)  # Wyszukiwanie w dokumencie wyszukiwania
 
     if filter_status:
         donations_list = donations_list.filter(status=filter_status)  # Filtrowanie darowizn na podstawie statusu
 
-    donations_list = donations_list.order_by('is_taken_by_user', 'pick_up_date', 'pick_up_time')  # Sortowanie darowizn
-
-    paginator = Paginator(donations_list, 8)  # Paginacja listy darowizn (8 na stronę)
-    page_number = request.GET.get('page')  # Pobranie numeru strony z parametrów URL
-    donations = paginator.get_page(page_number)  # Pobranie odpowiedniej strony darowizn
+    try:
+        page = keyset_page(donations_list, PROFILE_DONATION_ORDERING, PROFILE_DONATIONS_PER_PAGE,
+                           after=request.GET.get('after'), before=request.GET.get('before'))  # Strona darowizn
+    except InvalidCursor:
+        page = keyset_page(donations_list, PROFILE_DONATION_ORDERING, PROFILE_DONATIONS_PER_PAGE)  # Pierwsza strona
+
+    params = {key: value for key, value in (('search', search_query), ('status', filter_status)) if value}
+    donations = {
+        'object_list': page['object_list'],
+        'total': _cached_profile_donation_count(request.user, donations_list, params),  # Łączna liczba (z cache)
+        'first_url': f"{request.path}?{urlencode(params)}" if page['has_previous'] else None,
+        'previous_url': f"{request.path}?{urlencode({**params, 'before': page['previous_cursor']})}"
+        if page['has_previous'] else None,
+        'next_url': f"{request.path}?{urlencode({**params, 'after': page['next_cursor']})}"
+        if page['has_next'] else None,
+    }
 
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        return render(request, 'user_profile.html',
-                      {'donations': donations})  # Renderowanie strony profilu z danymi darowizn
+        return render(request, 'donations_table.html',
+                      {'donations': donations})  # Renderowanie samej tabeli darowizn
 
     return render(request, 'user_profile.html', {
         'first_name': request.user.first_name,
@@ -311,6 +514,50 @@ def user_profile(request):
     })  # Renderowanie strony profilu z danymi użytkownika i darowizn
 
 
+# Maksymalna liczba darowizn aktualizowanych jednym żądaniem
+BULK_UPDATE_MAX_DONATIONS = 1000
+
+
+# Widok zbiorczej zmiany oznaczenia darowizn przez użytkownika
+@login_required
+@require_POST
+def bulk_update_donations(request):
+    """
+    Widok zbiorczo ustawiający oznaczenie "zabrane przez użytkownika" dla wielu darowizn.
+    Wykonuje jedno zapytanie UPDATE ograniczone do darowizn zalogowanego użytkownika
+    i zwraca identyfikatory faktycznie zmienionych darowizn wraz z nowym stanem.
+    """
+    try:
+        data = json.loads(request.body)
+        if not isinstance(data['donation_ids'], list):
+            raise TypeError('donation_ids')
+        donation_ids = {int(donation_id) for donation_id in data['donation_ids']}
+        is_taken_by_user = data['is_taken_by_user']
+    except (ValueError, TypeError, KeyError):
+        return JsonResponse({'status': 'error', 'message': 'Nieprawidłowe dane żądania'}, status=400)
+
+    if not isinstance(is_taken_by_user, bool) or not donation_ids:
+        return JsonResponse({'status': 'error', 'message': 'Nieprawidłowe dane żądania'}, status=400)
+    if len(donation_ids) > BULK_UPDATE_MAX_DONATIONS:
+        return JsonResponse({'status': 'error',
+                             'message': f'Można zmienić najwyżej {BULK_UPDATE_MAX_DONATIONS} darowizn naraz'},
+                            status=400)
+
+    # Jedno zapytanie UPDATE ... WHERE user_id = ... AND id IN (...) AND is_taken_by_user = <przeciwny stan>;
+    # darowizny już w docelowym stanie nie są zapisywane ani zwracane
+    updated_ids = update_returning(
+        Donation,
+        {'user': request.user.pk, 'id__in': donation_ids, 'is_taken_by_user': not is_taken_by_user},
+        is_taken_by_user=is_taken_by_user,
+        updated_at=timezone.now(),
+    )
+    return JsonResponse({
+        'status': 'success',
+        'is_taken_by_user': is_taken_by_user,
+        'donation_ids': sorted(updated_ids),
+    })
+
+
 # Widok edycji profilu
 @login_required
 def edit_profile(request):
@@ -360,7 +607,7 @@ def change_password(request):
 def password_reset_request(request):
     """
     Widok żądania resetowania hasła, umożliwiający użytkownikowi zainicjowanie procesu resetowania hasła.
-    Wysyła email z linkiem do resetowania hasła.
+    Zapisuje w skrzynce nadawczej email z linkiem do resetowania hasła (wysyłany przez polecenie send_outbox).
     """
     if request.method == "POST":
         # Pobranie adresu email z formularza
@@ -369,27 +616,17 @@ def password_reset_request(request):
         if User.objects.filter(email=email).exists():
             # Pobranie użytkownika na podstawie adresu email
             user = User.objects.get(email=email)
-            # Utworzenie tokenu do resetowania hasła
-            token = PasswordResetToken.objects.create(user=user)
-
-            # Pobranie bieżącej domeny
-            current_site = get_current_site(request)
-            # Temat wiadomości email
-            mail_subject = 'Reset your password'
-            # Renderowanie wiadomości email
-            message = render_to_string('password_reset_email.html', {
-                'user': user,
-                'domain': current_site.domain,
-                'uidb64': urlsafe_base64_encode(force_bytes(user.pk)),
-                'token': token.token,
-            })
-            # Treść wiadomości w formacie tekstowym
-            plain_message = f"Cześć {user.first_name},\n\nProszę kliknij poniższy link, aby zresetować swoje hasło:\n\nhttp://{current_site.domain}{reverse('donations:password_reset_confirm', kwargs={'uidb64': urlsafe_base64_encode(force_bytes(user.pk)), 'token': token.token})}\n\nJeśli nie prosiłeś o zresetowanie hasła, zignoruj tę wiadomość."
-
-            # Utworzenie i wysłanie wiadomości email
-            email = EmailMultiAlternatives(mail_subject, plain_message, settings.DEFAULT_FROM_EMAIL, [email])
-            email.attach_alternative(message, "text/html")
-            email.send()
+            with transaction.atomic():
+                if signed_tokens_enabled():
+                    # Podpisany token - bez zapisu w bazie danych
+                    token = password_reset_tokens.make_token(user)
+                else:
+                    # Usunięcie poprzednich tokenów - ważny jest tylko link z ostatniej wiadomości
+                    PasswordResetToken.objects.filter(user=user).delete()
+                    # Utworzenie tokenu do resetowania hasła
+                    token = PasswordResetToken.objects.create(user=user).token
+                # Zapisanie wiadomości z linkiem w skrzynce nadawczej
+                _queue_password_reset_email(request, user, token)
 
             # Powiadomienie użytkownika, że link do resetowania hasła został wysłany
             return render(request, 'password_reset.html',
@@ -401,6 +638,28 @@ def password_reset_request(request):
     return render(request, 'password_reset.html')
 
 
+def _queue_password_reset_email(request, user, token):
+    """
+    Zapisuje w skrzynce nadawczej email z linkiem do resetowania hasła.
+    """
+    # Pobranie bieżącej domeny
+    current_site = get_current_site(request)
+    # Temat wiadomości email
+    mail_subject = 'Reset your password'
+    # Renderowanie wiadomości email
+    message = render_to_string('password_reset_email.html', {
+        'user': user,
+        'domain': current_site.domain,
+        'uidb64': urlsafe_base64_encode(force_bytes(user.pk)),
+        'token': token,
+    })
+    # Treść wiadomości w formacie tekstowym
+    plain_message = f"Cześć {user.first_name},\n\nProszę kliknij poniższy link, aby zresetować swoje hasło:\n\nhttp://{current_site.domain}{reverse('donations:password_reset_confirm', kwargs={'uidb64': urlsafe_base64_encode(force_bytes(user.pk)), 'token': token})}\n\nJeśli nie prosiłeś o zresetowanie hasła, zignoruj tę wiadomość."
+
+    # Zapisanie wiadomości w skrzynce nadawczej
+    queue_email(mail_subject, plain_message, [user.email], html_body=message)
+
+
 # Widok potwierdzenia resetu hasła
 def password_reset_confirm(request, uidb64=None, token=None):
     """
@@ -429,13 +688,22 @@ def password_reset_confirm(request, uidb64=None, token=None):
         except (TypeError, ValueError, OverflowError, User.DoesNotExist):
             user = None
 
-        # Sprawdzenie, czy użytkownik i token istnieją
-        if user is not None and PasswordResetToken.objects.filter(user=user, token=token).exists():
-            # Ustawienie nowego hasła
+        # Sprawdzenie, czy użytkownik i token istnieją, a token nie wygasł
+        if user is None:
+            valid = False
+        elif signed_tokens_enabled():
+            # Weryfikacja podpisu, bez zapytań do tabeli tokenów
+            valid = password_reset_tokens.check_token(user, token)
+        else:
+            valid = PasswordResetToken.objects.filter(user=user, token=token, expires_at__gt=timezone.now()).exists()
+
+        if valid:
+            # Ustawienie nowego hasła (zmiana skrótu hasła unieważnia też podpisany token)
             user.set_password(password1)
             user.save()
             # Usunięcie tokenu resetu hasła
-            PasswordResetToken.objects.filter(user=user).delete()
+            if not signed_tokens_enabled():
+                PasswordResetToken.objects.filter(user=user).delete()
             # Przekierowanie na stronę logowania po zmianie hasła
             return redirect('donations:login')
         else:
@@ -453,13 +721,15 @@ def contact(request):
     if request.method == 'POST':
         form = ContactForm(request.POST)  # Formularz kontaktowy
         if form.is_valid():
-            contact_message = form.save()  # Zapisanie wiadomości kontaktowej
-            # Wysłanie emaila administratorom
-            subject = f"Nowa wiadomość kontaktowa od {contact_message.name} {contact_message.surname}"
-            message = f"Imię: {contact_message.name}\nNazwisko: {contact_message.surname}\nEmail: {contact_message.email}\n\nWiadomość:\n{contact_message.message}"
-            admin_emails = [user.email for user in
-                            User.objects.filter(is_superuser=True)]  # Pobranie emaili administratorów
-            send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, admin_emails)  # Wysłanie emaila
+            with transaction.atomic():
+                contact_message = form.save()  # Zapisanie wiadomości kontaktowej
+                # Zapisanie emaila do administratorów w skrzynce nadawczej
+                subject = f"Nowa wiadomość kontaktowa od {contact_message.name} {contact_message.surname}"
+                message = f"Imię: {contact_message.name}\nNazwisko: {contact_message.surname}\nEmail: {contact_message.email}\n\nWiadomość:\n{contact_message.message}"
+                admin_emails = list(User.objects.filter(is_superuser=True).exclude(email='').values_list(
+                    'email', flat=True))  # Pobranie emaili administratorów
+                if admin_emails:
+                    queue_email(subject, message, admin_emails)
             messages.success(request, 'Twoja wiadomość została wysłana. Dziękujemy za kontakt!')
             return redirect('donations:index')  # Przekierowanie na stronę główną po wysłaniu wiadomości
         else:
@@ -472,6 +742,7 @@ def contact(request):
 
 
 # Widok polityki prywatności
+@cache_anonymous_page
 def privacy_policy(request):
     """
     Widok polityki prywatności, wyświetlający zasady ochrony danych osobowych.
@@ -480,6 +751,7 @@ def privacy_policy(request):
 
 
 # Widok warunków korzystania z usługi
+@cache_anonymous_page
 def terms_of_service(request):
     """
     Widok warunków korzystania z usługi, wyświetlający zasady korzystania z serwisu.